@@ -1,59 +1,120 @@
+import functools
 import os
-from crewai import Agent, LLM
+from typing import Callable, TypeVar
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def get_llm():
-    """
-    Factory function to get the LLM based on environment variables.
-    Checks for LLM_PROVIDER and MODEL_NAME.
-    """
-    provider = os.getenv("LLM_PROVIDER", "ollama").lower()
-    model = os.getenv("MODEL_NAME", "llama3")
-    
+T = TypeVar("T")
+
+
+@functools.lru_cache(maxsize=None)
+def _build_llm(provider: str, model: str, base_url: str | None):
+    # crewai takes seconds to import, so it is only loaded once an LLM is actually needed
+    from crewai import LLM
+
     if provider == "openai":
         return LLM(model=model, api_key=os.getenv("OPENAI_API_KEY"))
     elif provider == "gemini":
         api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
         return LLM(model=f"gemini/{model}", api_key=api_key)
-    elif provider == "ollama":
-        base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-        return LLM(model=f"ollama/{model}", base_url=base_url)
     else:
+        return LLM(model=f"ollama/{model}", base_url=base_url)
+
+
+def model_for(kind: str | None = None) -> str:
+    """
+    Model for a task type ('research', 'analysis' or 'cover_letter'): MODEL_NAME_<KIND> when set
+    (e.g. a small fast model for scoring, a larger one for cover letters), else MODEL_NAME.
+    """
+    default = os.getenv("MODEL_NAME", "llama3")
+    return (os.getenv(f"MODEL_NAME_{kind.upper()}") or default) if kind else default
+
+
+def _ollama_pool():
+    """The LLM endpoint pool, when the provider is Ollama and LLM_ENDPOINTS is set."""
+    if os.getenv("LLM_PROVIDER", "ollama").lower() in ("openai", "gemini"):
+        return None
+    from llm_pool import get_llm_pool
+
+    return get_llm_pool()
+
+
+def get_llm(kind: str | None = None):
+    """
+    Factory function to get the LLM based on environment variables.
+    Checks for LLM_PROVIDER and MODEL_NAME (or MODEL_NAME_<KIND> for a task type); the LLM is
+    built on first call and reused for the same provider/model. With an LLM pool the LLM points at
+    its first endpoint, and run_agent() moves each call to the least loaded one.
+    """
+    provider = os.getenv("LLM_PROVIDER", "ollama").lower()
+    model = model_for(kind)
+    base_url = None
+    if provider == "ollama":
+        pool = _ollama_pool()
+        base_url = pool.primary if pool is not None else os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+    elif provider not in ("openai", "gemini"):
         # Fallback to local Ollama if provider is unrecognized
-        return LLM(model=f"ollama/{model}", base_url="http://localhost:11434")
+        provider, base_url = "ollama", "http://localhost:11434"
+    return _build_llm(provider, model, base_url)
 
-llm = get_llm()
 
-def create_job_researcher(tools):
+def run_agent(agent, kind: str, fn: Callable[[], T]) -> T:
+    """
+    Run fn() (a crew kickoff of agent). With an LLM pool, agent.llm points at a leased endpoint
+    serving the kind's model for the duration of the call, failing over to another endpoint if
+    that one goes down; otherwise fn() runs as is.
+    """
+    pool = _ollama_pool()
+    if pool is None:
+        return fn()
+    home = agent.llm
+    model = model_for(kind)
+
+    def call(llm):
+        agent.llm = llm
+        try:
+            return fn()
+        finally:
+            agent.llm = home
+
+    return pool.run(model, lambda base_url: _build_llm("ollama", model, base_url), call)
+
+
+def create_job_researcher(tools, llm=None):
+    from crewai import Agent
+
     return Agent(
         role='Job Researcher',
         goal='Identify relevant software companies in target cities, navigate to their career pages, and extract specific job openings that match the user\'s CV.',
         backstory='You are a master of corporate OSINT and career page navigation. You don\'t just look at job boards; you find the sources. You know how to find software companies, startups, and tech giants, and you know exactly where to find their "Careers" or "Jobs" links to get the most up-to-date postings.',
         tools=tools,
-        llm=llm,
+        llm=llm or get_llm("research"),
         verbose=True,
         allow_delegation=False
     )
 
-def create_match_analyst(tools):
+def create_match_analyst(tools, llm=None):
+    from crewai import Agent
+
     return Agent(
         role='Match Analyst',
         goal='Compare job descriptions with the user\'s CV and score them from 0 to 100 based on fit (skills, experience, location, etc.).',
         backstory='You have a keen eye for detail and understand what recruiters look for. You can accurately assess whether a candidate is a good match for a role.',
         tools=tools,
-        llm=llm,
+        llm=llm or get_llm("analysis"),
         verbose=True,
         allow_delegation=False
     )
 
-def create_application_expert():
+def create_application_expert(llm=None):
+    from crewai import Agent
+
     return Agent(
         role='Application Expert',
         goal='Write highly tailored cover letters for high-scoring jobs and format all application details for final output.',
         backstory='You are a master of professional communication. You know how to highlight a candidate\'s strengths in a way that resonates with hiring managers.',
-        llm=llm,
+        llm=llm or get_llm("cover_letter"),
         verbose=True,
         allow_delegation=False
     )
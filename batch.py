@@ -0,0 +1,139 @@
+"""
+Batch mode: run the agent for many candidates at once.
+
+    profiles/
+        alice/cv.pdf, alice/conditions.txt
+        bob/cv.txt,   bob/conditions.txt
+
+Search queries of all profiles are merged and each runs once, every unique job page is
+scraped once (starting as soon as the first query returns), and the shared corpus is then fanned out to per-profile prefiltering,
+scoring and cover letters. Each profile gets its own job_applications.xlsx and checkpoint
+in its directory, so search/scrape cost grows with unique jobs rather than candidates x jobs.
+"""
+import os
+from typing import Iterable
+from checkpoint import Checkpoint, export_xlsx
+from cv_profile import get_cv_profile
+from politeness import interleave_by_site
+from tracing import span
+from urls import normalize_url
+
+OUTPUT_NAME = "job_applications.xlsx"
+CHECKPOINT_NAME = "job_applications.checkpoint.jsonl"
+
+
+def load_profiles(root: str) -> list[dict]:
+    """Every subdirectory of root holding a cv.txt or cv.pdf, with its CV profile and conditions."""
+    from main import load_conditions
+
+    profiles = []
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name)
+        if not os.path.isdir(path):
+            continue
+        cv_path = next((os.path.join(path, f) for f in ("cv.txt", "cv.pdf") if os.path.exists(os.path.join(path, f))), None)
+        if cv_path is None:
+            print(f"--- BATCH: skipping {name} (no cv.txt or cv.pdf) ---")
+            continue
+        cv = get_cv_profile(cv_path)
+        if "error" in cv:
+            print(f"--- BATCH: skipping {name}: {cv['error']} ---")
+            continue
+        conditions = load_conditions(os.path.join(path, "conditions.txt"))
+        profiles.append({"name": name, "dir": path, "cv": cv, "conditions": conditions})
+    return profiles
+
+
+def search_and_scrape(profiles: list[dict], max_per_query: int = 15) -> tuple[dict[str, list[dict]], dict[str, str]]:
+    """
+    Run the union of all profiles' search queries once and scrape every unique job page once,
+    starting on a query's jobs as soon as it returns. Returns ({profile name: its jobs},
+    {url: text or 'Error ...'}).
+    """
+    from tools import build_search_queries, iter_search_queries
+
+    queries_by_profile = {p["name"]: build_search_queries(p["conditions"]) for p in profiles}
+    all_queries = [q for queries in queries_by_profile.values() for q in queries]
+    found: dict[str, list[dict]] = {}
+
+    def unique_jobs():
+        seen = set()
+        for q, jobs in iter_search_queries(all_queries, max_per_query=max_per_query):
+            found[q] = jobs
+            for job in jobs:
+                key = normalize_url(job["url"])
+                if key not in seen:
+                    seen.add(key)
+                    yield job
+
+    pages = scrape_once(unique_jobs())
+    jobs_by_profile = {}
+    for name, queries in queries_by_profile.items():
+        jobs, seen = [], set()
+        for q in queries:
+            for job in found.get(q.strip().replace('"', "").strip(), []):
+                key = normalize_url(job["url"])
+                if key not in seen:
+                    seen.add(key)
+                    jobs.append(dict(job))
+        jobs_by_profile[name] = jobs
+    # Profiles may list the same posting under a differently decorated URL
+    by_key = {normalize_url(url): text for url, text in pages.items()}
+    for jobs in jobs_by_profile.values():
+        for job in jobs:
+            pages.setdefault(job["url"], by_key[normalize_url(job["url"])])
+    return jobs_by_profile, pages
+
+
+def scrape_once(jobs: Iterable[dict]) -> dict[str, str]:
+    """
+    Scrape every job's URL in parallel; returns {url: text or 'Error ...'}. jobs may be a generator:
+    scraping starts while it is still producing jobs.
+    """
+    from main import PIPELINE_QUEUE_SIZE, SCRAPE_WORKERS, _scrape_stage
+    from pipeline import Stage, run_pipeline
+
+    total = len(jobs) if isinstance(jobs, list) else None
+    if total is not None:
+        jobs = interleave_by_site(jobs)
+    items = ({"title": j.get("title", "N/A"), "company": j.get("company", "N/A"), "url": j["url"], "index": i, "total": total}
+             for i, j in enumerate(jobs))
+    scraped = run_pipeline(items, [Stage("scrape", _scrape_stage, SCRAPE_WORKERS)], queue_size=PIPELINE_QUEUE_SIZE)
+    pages = {}
+    for job, error in scraped:
+        pages[job["url"]] = job["desc"] if error is None else f"Error scraping URL: {error}"
+    return pages
+
+
+def run_batch(root: str, max_per_query: int = 15) -> dict[str, int]:
+    """Search and scrape once for every profile under root, then score and export per profile. Returns rows per profile."""
+    from main import _process_jobs
+
+    profiles = load_profiles(root)
+    if not profiles:
+        print(f"--- BATCH: no profiles found in {root} ---")
+        return {}
+    print(f"--- BATCH: {len(profiles)} profiles: {', '.join(p['name'] for p in profiles)} ---")
+
+    with span("batch.search_scrape", profiles=len(profiles)) as s:
+        jobs_by_profile, pages = search_and_scrape(profiles, max_per_query=max_per_query)
+        s.set(jobs=sum(len(j) for j in jobs_by_profile.values()), pages=len(pages))
+    total = sum(len(jobs) for jobs in jobs_by_profile.values())
+    unique = len({normalize_url(url) for url in pages})
+    print(f"--- BATCH: {unique} unique jobs scraped for {total} profile/job pairs ---")
+
+    counts = {}
+    for profile in profiles:
+        jobs = jobs_by_profile[profile["name"]]
+        print(f"--- BATCH: {profile['name']}: {len(jobs)} jobs ---")
+        if not jobs:
+            counts[profile["name"]] = 0
+            continue
+        checkpoint = Checkpoint(os.path.join(profile["dir"], CHECKPOINT_NAME))
+        checkpoint.start(jobs)
+        with span("batch.profile", profile=profile["name"], jobs=len(jobs)):
+            _process_jobs(jobs, profile["cv"], profile["conditions"], checkpoint=checkpoint, pages=pages)
+        output_file = os.path.join(profile["dir"], OUTPUT_NAME)
+        counts[profile["name"]] = export_xlsx(checkpoint.rows(), output_file)
+        print(f"--- BATCH: {profile['name']}: results saved to {output_file} ({counts[profile['name']]} rows) ---")
+    return counts
@@ -0,0 +1,269 @@
+"""
+Offline benchmark harness: runs scrape_url, run_job_search_loop and main.main() end to end
+against a fake DuckDuckGo provider, a local fixture site and a fake LLM endpoint, and writes
+per-span latency percentiles (from the pipeline's own tracing spans), jobs/minute and peak RSS
+to a JSON file.
+
+    python bench/benchmark.py                          # all scenarios at 10, 100, 1000 jobs
+    python bench/benchmark.py --scenario scrape --jobs 100 --llm-latency 0.2
+    python bench/benchmark.py --compare bench/results/a.json bench/results/b.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+SCENARIOS = ["scrape", "search", "main"]
+DEFAULT_SIZES = [10, 100, 1000]
+
+
+def stage_summary(trace_path: str) -> dict:
+    """Aggregate the run's tracing spans (see tracing.py) into per-span latency percentiles and totals."""
+    spans: dict[str, list[dict]] = {}
+    if os.path.exists(trace_path):
+        with open(trace_path, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                spans.setdefault(record["span"], []).append(record)
+    out = {}
+    for name, records in sorted(spans.items()):
+        ordered = sorted(r["ms"] / 1000 for r in records)
+        out[name] = {
+            "count": len(ordered),
+            "errors": sum(1 for r in records if "error" in r),
+            "total_s": round(sum(ordered), 4),
+            "p50_ms": round(_percentile(ordered, 50) * 1000, 2),
+            "p90_ms": round(_percentile(ordered, 90) * 1000, 2),
+            "p99_ms": round(_percentile(ordered, 99) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+        }
+        for key in ("bytes", "prompt_tokens", "completion_tokens"):
+            total = sum(r.get(key) or 0 for r in records)
+            if total:
+                out[name][key] = total
+        hits = sum(1 for r in records if r.get("cache") == "hit")
+        if hits or any(r.get("cache") == "miss" for r in records):
+            out[name]["cache_hits"] = hits
+    return out
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def _peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
+
+
+def _isolate(workdir: str):
+    """Point every on-disk store at workdir so runs start cold and never touch the user's files."""
+    import checkpoint
+    import corpus
+    import cv_profile
+    import dedup
+    import fetcher
+    import llm_cache
+    import scrape_cache
+    import url_store
+
+    url_store._store = url_store.VisitedURLStore(os.path.join(workdir, "visited_urls.sqlite"), legacy_csv=None)
+    scrape_cache._cache = scrape_cache.ScrapeCache(os.path.join(workdir, "scrape_cache.sqlite"))
+    llm_cache._cache = llm_cache.LLMCache(os.path.join(workdir, "llm_cache.sqlite"))
+    dedup._index = dedup.DedupIndex(os.path.join(workdir, "dedup_index.sqlite"))
+    fetcher._fetcher = fetcher.TieredFetcher(fetcher.DomainTiers(os.path.join(workdir, "domain_tiers.json")))
+    checkpoint.CHECKPOINT_FILE = os.path.join(workdir, "checkpoint.jsonl")
+    cv_profile.CV_PROFILE_DIR = os.path.join(workdir, "cv_profiles")
+    corpus._corpus = corpus.JobCorpus(os.path.join(workdir, "corpus.sqlite"))
+
+
+def run_scenario(scenario: str, jobs: int, args) -> dict:
+    """Run one scenario in this process and return its metrics."""
+    sys.path.insert(0, PROJECT_ROOT)
+    os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+    from fakes import FakeDDGS, FakeLLM, FixtureSite
+
+    workdir = tempfile.mkdtemp(prefix=f"bench-{scenario}-")
+    shutil.copy(os.path.join(BENCH_DIR, "fixtures", "cv.txt"), workdir)
+    shutil.copy(os.path.join(BENCH_DIR, "fixtures", "conditions.txt"), workdir)
+    trace_path = os.path.join(workdir, "trace.jsonl")
+    os.environ["TRACE"] = "true"
+    os.environ["TRACE_FILE"] = trace_path
+    os.environ["TRACE_SUMMARY"] = "false"
+    # Every fixture page lives on one local host; per-site politeness would only measure the rate limit
+    os.environ.setdefault("SCRAPE_DOMAIN_RATE", "1000")
+    os.environ.setdefault("SCRAPE_DOMAIN_BURST", "1000")
+    extra = {}
+    # main discovers exactly `jobs` postings on the fixture ATS boards, so the researcher fallback never runs
+    os.environ.setdefault("MAX_JOBS", str(jobs))
+    with FixtureSite(latency=args.page_latency, board_jobs=jobs) as site:
+        with FakeLLM(site, jobs, latency=args.llm_latency, per_1k_prompt_tokens=args.prefill_per_1k) as llm_server:
+            os.environ["LLM_PROVIDER"] = "ollama"
+            os.environ["MODEL_NAME"] = "fake"
+            os.environ["OLLAMA_BASE_URL"] = llm_server.base_url
+            import tools
+            import tracing
+            _isolate(workdir)
+            fake_ddgs = FakeDDGS(site, pool_size=jobs, latency=args.search_latency)
+            tools._ddgs = fake_ddgs
+
+            if scenario == "main":
+                import careers
+                careers.ATS_APIS["greenhouse"] = site.base_url + "/ats/greenhouse/{token}/jobs"
+                # crewai is imported lazily on the first kickoff; keep its multi-second import out of the
+                # measured run (bench/startup.py tracks import time)
+                import crewai  # noqa: F401
+
+            start = time.perf_counter()
+            if scenario == "scrape":
+                workers = int(os.getenv("SCRAPE_WORKERS", "4"))
+                with ThreadPoolExecutor(workers) as pool:
+                    texts = list(pool.map(tools.scrape_url, [site.job_url(n) for n in range(jobs)]))
+                extra["errors"] = sum(1 for t in texts if t.startswith("Error"))
+            elif scenario == "search":
+                queries = [f"Backend Engineer Stockholm {i} jobs" for i in range(jobs // 10 + 5)]
+                found = tools.run_job_search_loop(queries, min_results=jobs, max_per_query=20)
+                extra["found"] = len(found)
+                extra["ddgs_calls"] = fake_ddgs.calls
+            elif scenario == "main":
+                import main
+                main.OUTPUT_FILE = os.path.join(workdir, "job_applications.xlsx")
+                main.CHECKPOINT_FILE = os.path.join(workdir, "checkpoint.jsonl")
+                cwd = os.getcwd()
+                os.chdir(workdir)
+                try:
+                    main.main()
+                finally:
+                    os.chdir(cwd)
+                extra["discovered"] = len(main.Checkpoint(main.CHECKPOINT_FILE).jobs())
+                extra["llm_calls"] = llm_server.calls
+                extra["llm_prompt_tokens"] = llm_server.prompt_tokens
+            else:
+                raise ValueError(f"unknown scenario {scenario}")
+            wall = time.perf_counter() - start
+            tracing.get_tracer().close()
+
+    stages = stage_summary(trace_path)
+    shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "scenario": scenario,
+        "jobs": jobs,
+        "wall_s": round(wall, 3),
+        "jobs_per_min": round(jobs / wall * 60, 1) if wall else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "stages": stages,
+        **extra,
+    }
+
+
+def _run_child(scenario: str, jobs: int, args) -> dict:
+    """Each scenario runs in a fresh interpreter so peak RSS and imports are measured per scenario."""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+        out_path = tmp.name
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", "--scenario", scenario, "--jobs", str(jobs),
+           "--child-out", out_path, "--llm-latency", str(args.llm_latency), "--prefill-per-1k", str(args.prefill_per_1k),
+           "--page-latency", str(args.page_latency), "--search-latency", str(args.search_latency)]
+    proc = subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=not args.verbose, text=True)
+    try:
+        if proc.returncode != 0:
+            tail = (proc.stderr or "")[-2000:] if not args.verbose else ""
+            return {"scenario": scenario, "jobs": jobs, "error": f"exit code {proc.returncode}", "stderr": tail}
+        with open(out_path, encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.unlink(out_path)
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    except Exception:
+        return ""
+
+
+def _print_table(results: list[dict]):
+    print(f"{'scenario':<8} {'jobs':>5} {'wall s':>9} {'jobs/min':>10} {'RSS MB':>8}  stages (p50 / p90 ms)")
+    for r in results:
+        if "error" in r:
+            print(f"{r['scenario']:<8} {r['jobs']:>5}  ERROR: {r['error']}")
+            continue
+        stages = ", ".join(f"{k} {v['p50_ms']:.0f}/{v['p90_ms']:.0f}" for k, v in r["stages"].items())
+        print(f"{r['scenario']:<8} {r['jobs']:>5} {r['wall_s']:>9.2f} {r['jobs_per_min']:>10.1f} {r['peak_rss_mb']:>8.1f}  {stages}")
+
+
+def compare(old_path: str, new_path: str):
+    with open(old_path, encoding="utf-8") as f:
+        old = {(r["scenario"], r["jobs"]): r for r in json.load(f)["results"]}
+    with open(new_path, encoding="utf-8") as f:
+        new = {(r["scenario"], r["jobs"]): r for r in json.load(f)["results"]}
+    print(f"{'scenario':<8} {'jobs':>5} {'old jobs/min':>13} {'new jobs/min':>13} {'change':>8}")
+    for key in sorted(set(old) & set(new)):
+        a, b = old[key].get("jobs_per_min"), new[key].get("jobs_per_min")
+        if not a or not b:
+            continue
+        print(f"{key[0]:<8} {key[1]:>5} {a:>13.1f} {b:>13.1f} {100 * (b - a) / a:>7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append", help="Scenario(s) to run (default: all)")
+    parser.add_argument("--jobs", type=int, action="append", help="Job count(s) (default: 10, 100, 1000)")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Fake LLM seconds per call")
+    parser.add_argument("--prefill-per-1k", type=float, default=0.0, help="Extra fake LLM seconds per 1k prompt tokens")
+    parser.add_argument("--page-latency", type=float, default=0.0, help="Fixture site seconds per page")
+    parser.add_argument("--search-latency", type=float, default=0.0, help="Fake DDGS seconds per query")
+    parser.add_argument("--out", help="Results file (default: bench/results/<timestamp>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two results files and exit")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own output")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--child-out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.child:
+        result = run_scenario(args.scenario[0], args.jobs[0], args)
+        with open(args.child_out, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        return
+
+    results = []
+    for scenario in args.scenario or SCENARIOS:
+        for jobs in args.jobs or DEFAULT_SIZES:
+            print(f"--- BENCH: {scenario} x {jobs} jobs ---")
+            results.append(_run_child(scenario, jobs, args))
+    _print_table(results)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out = args.out or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {k: getattr(args, k) for k in ("llm_latency", "prefill_per_1k", "page_latency", "search_latency")},
+            "results": results,
+        }, f, indent=2)
+    print(f"--- BENCH: results written to {out} ---")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""Local stand-ins for DuckDuckGo, job pages and the LLM endpoint used by the benchmark harness."""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+PAGE_TEMPLATES = ["greenhouse_jsonld.html", "indeed_board.html", "company_careers.html"]
+
+_TITLES = ["Senior Backend Engineer", "Team Lead Backend", "Java Developer", "Platform Engineer",
+           "Frontend Developer", "Data Engineer", "Site Reliability Engineer", "Engineering Manager"]
+_COMPANIES = ["Klarnaish", "Spotifyish", "Northvolt Labs", "Acme Payments", "Fjord Cloud", "Sthlm Analytics",
+              "Nordic Retail Tech", "Oresund Systems", "Baltic Bytes", "Vasa Health"]
+_SENTENCES = [
+    "You will design and operate Java services built on Spring Boot.",
+    "Our event backbone runs on Kafka with hundreds of topics.",
+    "We store money movements in PostgreSQL and cache hot paths in Redis.",
+    "Everything ships as Docker images to Kubernetes on AWS.",
+    "You will mentor engineers and lead technical design reviews.",
+    "Experience with Terraform and infrastructure as code is a plus.",
+    "The frontend is React with TypeScript and a design system in Storybook.",
+    "You will own CSS architecture and accessibility of our web app.",
+    "Data pipelines are written in Python with Airflow and dbt on Snowflake.",
+    "We practice trunk-based development with continuous delivery.",
+    "On-call is shared across the team with a generous compensation.",
+    "You have at least five years of backend experience in a product company.",
+    "Fluent English is required; Swedish is a merit.",
+    "We offer hybrid work from our Stockholm office near Slussen.",
+    "Benefits include pension, wellness allowance and parental leave top-up.",
+    "You will work closely with product managers and designers in small teams.",
+    "Observability is built on OpenTelemetry, Prometheus and Grafana.",
+    "We are migrating a PHP Laravel monolith into Kotlin services.",
+    "Machine learning models are served behind gRPC APIs.",
+    "Security and compliance matter: we are PCI-DSS certified.",
+    "The role reports to the Head of Engineering.",
+    "You enjoy pairing, code review and writing clear documentation.",
+    "Our mobile apps are native Swift and Kotlin.",
+    "We run a Node.js BFF layer in front of the core services.",
+]
+
+
+def job_fields(n: int) -> dict:
+    """Deterministic, mostly unique title/company/description for fixture job n."""
+    rng = random.Random(n)
+    sentences = rng.sample(_SENTENCES, 8)
+    paragraphs = [" ".join(sentences[i:i + 2]) + f" Reference {n}-{i}." for i in range(0, 8, 2)]
+    return {
+        "title": rng.choice(_TITLES),
+        "company": rng.choice(_COMPANIES),
+        "city": "Stockholm",
+        "paragraphs": paragraphs,
+    }
+
+
+def render_job_page(n: int) -> str:
+    fields = job_fields(n)
+    template_name = PAGE_TEMPLATES[n % len(PAGE_TEMPLATES)]
+    with open(os.path.join(FIXTURES_DIR, template_name), encoding="utf-8") as f:
+        template = Template(f.read())
+    description_html = "\n".join(f"<p>{p}</p>" for p in fields["paragraphs"])
+    return template.safe_substitute(
+        title=fields["title"], company=fields["company"], city=fields["city"],
+        description_html=description_html,
+        title_json=json.dumps(fields["title"]), company_json=json.dumps(fields["company"]),
+        city_json=json.dumps(fields["city"]), description_json=json.dumps(description_html),
+    )
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _Server:
+    def __init__(self, handler):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FixtureSite(_Server):
+    """
+    Serves /jobs/<n> as one of the recorded page templates filled with job n's fields, and
+    /ats/greenhouse/fixture-<k>/jobs as a Greenhouse board API listing every BOARDS-th fixture job.
+    """
+
+    BOARDS = 4
+
+    def __init__(self, latency: float = 0.0, board_jobs: int = 0):
+        latency_s = latency
+        site = self
+
+        class Handler(_QuietHandler):
+            def do_GET(self):
+                m = re.match(r"^/ats/greenhouse/fixture-(\d+)/jobs", self.path)
+                if m:
+                    body = json.dumps({"jobs": site.board_listing(int(m.group(1)), board_jobs)})
+                    self._send(200, body.encode("utf-8"), "application/json")
+                    return
+                m = re.match(r"^/jobs/(\d+)", self.path)
+                if not m:
+                    self._send(404, b"not found", "text/plain")
+                    return
+                if latency_s:
+                    time.sleep(latency_s)
+                self._send(200, render_job_page(int(m.group(1))).encode("utf-8"), "text/html; charset=utf-8")
+
+        super().__init__(Handler)
+
+    def job_url(self, n: int) -> str:
+        return f"{self.base_url}/jobs/{n}"
+
+    def board_listing(self, board: int, board_jobs: int) -> list[dict]:
+        """
+        Greenhouse-style jobs of board: fixture jobs under a wanted title (the page keeps its own),
+        each followed by three listings the title filter has to drop.
+        """
+        jobs = []
+        for n in range(board, board_jobs, self.BOARDS):
+            fields = job_fields(n)
+            jobs.append({"title": "Senior Backend Engineer", "company_name": fields["company"],
+                         "absolute_url": self.job_url(n), "location": {"name": "Stockholm, Sweden"}})
+            for i, title in enumerate(["Frontend Developer", "Engineering Manager", "Data Analyst"]):
+                jobs.append({"title": title, "company_name": fields["company"],
+                             "absolute_url": f"{self.base_url}/openings/{n}-{i}", "location": {"name": "Stockholm"}})
+        return jobs
+
+    def board_urls(self) -> list[str]:
+        return [f"https://boards.greenhouse.io/fixture-{k}" for k in range(self.BOARDS)]
+
+
+class FakeDDGS:
+    """
+    Drop-in for duckduckgo_search.DDGS.text(): each query returns a deterministic slice of
+    the fixture site's jobs, after `latency` seconds. Career-page discovery searches
+    (careers.py) get the fixture Greenhouse boards for Greenhouse site: queries and nothing otherwise.
+    """
+
+    def __init__(self, site: FixtureSite, pool_size: int, latency: float = 0.0):
+        self.site = site
+        self.pool_size = max(1, pool_size)
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def text(self, query: str, max_results: int = 20) -> list[dict]:
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if self.latency:
+            time.sleep(self.latency)
+        if query.startswith("site:boards.greenhouse.io"):
+            return [{"href": url, "title": "Jobs", "body": ""} for url in self.site.board_urls()]
+        if query.startswith("site:") or "companies in" in query or "startups" in query:
+            return []
+        start = (int(hashlib.md5(query.encode()).hexdigest(), 16) + call * max_results) % self.pool_size
+        results = []
+        for k in range(min(max_results, self.pool_size)):
+            n = (start + k) % self.pool_size
+            fields = job_fields(n)
+            results.append({
+                "href": self.site.job_url(n),
+                "title": f"{fields['title']} at {fields['company']}",
+                "body": fields["paragraphs"][0],
+            })
+        return results
+
+
+class FakeLLM(_Server):
+    """
+    OpenAI-compatible /v1/chat/completions endpoint (what crewai uses for ollama/* models).
+    Replies in the formats the agents are asked for, after `latency` seconds plus
+    `per_1k_prompt_tokens` seconds of simulated prefill.
+    """
+
+    def __init__(self, site: FixtureSite, job_count: int, latency: float = 0.05, per_1k_prompt_tokens: float = 0.0):
+        fake = self
+        self.site = site
+        self.job_count = job_count
+        self.latency = latency
+        self.per_1k_prompt_tokens = per_1k_prompt_tokens
+        self.calls = 0
+        self.prompt_tokens = 0
+        self._lock = threading.Lock()
+
+        class Handler(_QuietHandler):
+            def do_GET(self):
+                # Health checks (/api/tags on Ollama, /v1/models on OpenAI-compatible servers)
+                self._send(200, json.dumps({"models": [{"name": "fake"}], "data": [{"id": "fake"}]}).encode(),
+                           "application/json")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+                reply = fake.reply(prompt)
+                prompt_tokens, completion_tokens = len(prompt) // 4, len(reply) // 4
+                with fake._lock:
+                    fake.calls += 1
+                    fake.prompt_tokens += prompt_tokens
+                time.sleep(fake.latency + fake.per_1k_prompt_tokens * prompt_tokens / 1000)
+                body = {
+                    "id": f"chatcmpl-{fake.calls}", "object": "chat.completion", "created": int(time.time()),
+                    "model": request.get("model", "fake"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": reply}}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens},
+                }
+                self._send(200, json.dumps(body).encode(), "application/json")
+
+        super().__init__(Handler)
+
+    @staticmethod
+    def _score(text: str) -> int:
+        return 40 + int(hashlib.md5(text.encode()).hexdigest(), 16) % 60
+
+    def reply(self, prompt: str) -> str:
+        if "=== Job " in prompt and "EACH of the" in prompt:
+            blocks = re.split(r"=== Job (\d+) ===", prompt)[1:]
+            lines = [f"Job {n}: Score: {self._score(body[:400])} | Category: Backend Engineering | Tech Stack: Java, Kafka"
+                     for n, body in zip(blocks[0::2], blocks[1::2])]
+            return "Thought: I now know the final answer\nFinal Answer: " + "\n".join(lines)
+        if "Score this job fit" in prompt:
+            return f"Thought: I now know the final answer\nFinal Answer: Score: {self._score(prompt[:400])} | Category: Backend Engineering | Tech Stack: Java, Kafka"
+        if "cover letter" in prompt.lower():
+            return ("Thought: I now know the final answer\nFinal Answer: Dear Hiring Manager,\n\n"
+                    "I am excited to apply. My nine years of backend work with Java and Kafka match your needs.\n\n"
+                    "Kind regards,\nAlex Example")
+        # Researcher: hand back the fixture jobs as the final list
+        lines = []
+        for n in range(self.job_count):
+            fields = job_fields(n)
+            lines.append(f"{n + 1}. Title: {fields['title']}\nCompany: {fields['company']}\nURL: {self.site.job_url(n)}")
+        return "Thought: I now know the final answer\nFinal Answer:\n" + "\n".join(lines)
@@ -0,0 +1,75 @@
+"""
+Startup regression check: imports each entry point in a fresh interpreter, fails if it takes
+longer than its budget or pulls in a dependency that only later stages should load.
+
+    python bench/startup.py                 # exit code 1 on regression
+    python bench/startup.py --budget-scale 2 --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that cost hundreds of milliseconds to seconds to import
+HEAVY = ["crewai", "litellm", "playwright", "playwright_stealth", "duckduckgo_search", "pypdf", "pandas",
+         "openpyxl", "numpy", "lxml", "requests"]
+
+# (entry point, seconds budget, heavy modules it may load)
+CHECKS = [
+    ("cli", 0.5, []),
+    ("checkpoint", 0.5, []),
+    ("agents", 0.5, []),
+    ("tasks", 0.5, []),
+    ("tools", 1.0, ["lxml", "requests"]),
+    ("main", 1.0, ["lxml", "requests"]),
+]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": sorted({{m.split('.')[0] for m in sys.modules}})}}))
+"""
+
+
+def probe(module: str) -> dict:
+    proc = subprocess.run([sys.executable, "-c", _PROBE.format(module=module)], cwd=PROJECT_ROOT,
+                          capture_output=True, text=True, env={**os.environ, "TRACE": "false"})
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    # The import itself may print; the probe's JSON is the last line
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="Imports per entry point (the median is compared)")
+    parser.add_argument("--budget-scale", type=float, default=float(os.getenv("STARTUP_BUDGET_SCALE", "1")),
+                        help="Multiply every budget (slow CI machines)")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'entry point':<12} {'median s':>9} {'budget s':>9}  heavy modules loaded")
+    for module, budget, allowed in CHECKS:
+        runs = [probe(module) for _ in range(max(1, args.runs))]
+        seconds = statistics.median(r["seconds"] for r in runs)
+        loaded = [m for m in HEAVY if m in runs[-1]["modules"]]
+        unexpected = [m for m in loaded if m not in allowed]
+        limit = budget * args.budget_scale
+        print(f"{module:<12} {seconds:>9.3f} {limit:>9.2f}  {', '.join(loaded) or '-'}")
+        if seconds > limit:
+            failures.append(f"import {module} took {seconds:.2f}s (budget {limit:.2f}s)")
+        if unexpected:
+            failures.append(f"import {module} loaded {', '.join(unexpected)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+import asyncio
+import atexit
+import os
+import threading
+from tracing import span
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
+
+# How many pages may load at the same time
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "4"))
+# Recycle a context/page after this many navigations
+BROWSER_PAGE_MAX_USES = int(os.getenv("BROWSER_PAGE_MAX_USES", "25"))
+# Skip images, fonts and media: we only read page.content()
+BROWSER_BLOCK_RESOURCES = os.getenv("BROWSER_BLOCK_RESOURCES", "true").lower() in ("1", "true", "yes")
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+
+class _Slot:
+    """One warm browser context with a single page and its use counter."""
+
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+
+
+class BrowserPool:
+    """
+    Long-lived headless Chromium shared by every scrape in the process.
+    Playwright runs on its own event loop thread, so synchronous callers from any
+    thread can call fetch_html() and up to max_pages navigations run at once.
+    """
+
+    def __init__(self, max_pages: int = BROWSER_MAX_PAGES, max_uses: int = BROWSER_PAGE_MAX_USES,
+                 block_resources: bool = BROWSER_BLOCK_RESOURCES):
+        self.max_pages = max(1, max_pages)
+        self.max_uses = max(1, max_uses)
+        self.block_resources = block_resources
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._playwright = None
+        self._browser = None
+        self._semaphore = None
+        self._launch_lock = None
+        self._idle: list[_Slot] = []
+        self._stealth = None
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=loop.run_forever, name="browser-pool", daemon=True)
+            self._thread.start()
+            self._loop = loop
+
+    async def _ensure_browser(self):
+        async with self._launch_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return
+            # First launch, or Chromium crashed: drop every slot that belonged to the old browser
+            self._idle.clear()
+            if self._playwright is None:
+                # Imported here: plain-HTTP scrapes never need Playwright
+                from playwright.async_api import async_playwright
+                from playwright_stealth import Stealth
+                self._stealth = Stealth()
+                self._playwright = await async_playwright().start()
+            print("--- BROWSER: Launching shared Chromium ---")
+            with span("browser.launch"):
+                self._browser = await self._playwright.chromium.launch(headless=True)
+
+    async def _block_route(self, route):
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _acquire(self) -> _Slot:
+        await self._ensure_browser()
+        while self._idle:
+            slot = self._idle.pop()
+            if not slot.page.is_closed():
+                return slot
+            await self._discard(slot)
+        with span("browser.new_page"):
+            context = await self._browser.new_context(user_agent=USER_AGENT)
+            if self.block_resources:
+                await context.route("**/*", self._block_route)
+            page = await context.new_page()
+            await self._stealth.apply_stealth_async(page)
+        return _Slot(context, page)
+
+    async def _discard(self, slot: _Slot):
+        try:
+            await slot.context.close()
+        except Exception:
+            pass
+
+    async def _release(self, slot: _Slot, broken: bool):
+        slot.uses += 1
+        if broken or slot.uses >= self.max_uses or slot.page.is_closed():
+            await self._discard(slot)
+        else:
+            self._idle.append(slot)
+
+    async def _settle(self, page, wait_selector: str | None, wait_ms: int):
+        """Wait until the network is idle or wait_selector appears, whichever is first, at most wait_ms."""
+        waits = [asyncio.ensure_future(page.wait_for_load_state("networkidle", timeout=wait_ms))]
+        if wait_selector:
+            waits.append(asyncio.ensure_future(page.wait_for_selector(wait_selector, state="attached", timeout=wait_ms)))
+        done, pending = await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in waits:
+            if task.done() and not task.cancelled():
+                # Timeouts just mean the page never went quiet; read whatever has rendered
+                task.exception()
+
+    async def _fetch(self, url: str, timeout_ms: int, wait_ms: int, wait_selector: str | None) -> str:
+        if self._semaphore is None:
+            # Created lazily so they bind to the pool's own event loop
+            self._semaphore = asyncio.Semaphore(self.max_pages)
+            self._launch_lock = asyncio.Lock()
+        async with self._semaphore:
+            slot = await self._acquire()
+            broken = False
+            try:
+                with span("browser.goto", url=url):
+                    await slot.page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
+                if wait_ms:
+                    with span("browser.settle", url=url):
+                        await self._settle(slot.page, wait_selector, wait_ms)
+                return await slot.page.content()
+            except Exception:
+                # A failed navigation can leave the page in a bad state; don't hand it out again
+                broken = True
+                raise
+            finally:
+                await self._release(slot, broken)
+
+    def fetch_html(self, url: str, timeout_ms: int = 30000, wait_ms: int = 5000, wait_selector: str | None = None) -> str:
+        """
+        Load url in a pooled page and return its HTML. After DOMContentLoaded it waits for network idle
+        or wait_selector (whichever comes first, capped at wait_ms). Raises on navigation errors.
+        """
+        self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(self._fetch(url, timeout_ms, wait_ms, wait_selector), self._loop)
+        return future.result()
+
+    async def _shutdown(self):
+        for slot in self._idle:
+            await self._discard(slot)
+        self._idle.clear()
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def close(self):
+        if self._loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=30)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+        self._thread = None
+        self._semaphore = None
+        self._launch_lock = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Return the process-wide browser pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close)
+        return _pool
@@ -0,0 +1,392 @@
+"""
+Deterministic job discovery: company career pages and ATS job boards, no LLM.
+
+Seeds are ATS boards found by `site:` searches, company websites found by searching for tech
+companies in the target cities, and the optional companies.txt (one company website or board
+URL per line). Company websites are followed to their careers page until a known ATS is found;
+boards are then read in bulk through the ATS's public JSON (or RSS) listing:
+
+    Greenhouse, Lever, Workable, Teamtailor, Ashby, SmartRecruiters
+
+Listings are matched against the titles and cities in conditions.txt. Careers pages without a
+known ATS contribute their links whose text matches a wanted title.
+"""
+import json
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypedDict
+from urllib.parse import urljoin, urlsplit
+from tracing import span
+from urls import normalize_url
+
+COMPANIES_FILE = os.getenv("COMPANIES_FILE", "companies.txt")
+# Company websites crawled for a careers page per run (ATS boards found by search don't count)
+CAREERS_MAX_COMPANIES = int(os.getenv("CAREERS_MAX_COMPANIES", "40"))
+# Careers links followed per company website
+CAREERS_MAX_LINKS = int(os.getenv("CAREERS_MAX_LINKS", "2"))
+CAREERS_WORKERS = int(os.getenv("CAREERS_WORKERS", os.getenv("SCRAPE_WORKERS", "4")))
+
+
+class JobRecord(TypedDict):
+    title: str
+    company: str
+    url: str
+
+
+# (platform, pattern capturing the board token), matched against URLs and page HTML
+ATS_PATTERNS = [
+    ("greenhouse", re.compile(r"(?:boards|job-boards)(?:\.eu)?\.greenhouse\.io/(?:embed/job_board(?:/js)?\?for=)?([A-Za-z0-9_-]+)", re.I)),
+    ("greenhouse", re.compile(r"boards-api\.greenhouse\.io/v1/boards/([A-Za-z0-9_-]+)", re.I)),
+    ("lever", re.compile(r"jobs\.(?:eu\.)?lever\.co/([A-Za-z0-9_.-]+)", re.I)),
+    ("workable", re.compile(r"apply\.workable\.com/(?!api/|j/)([A-Za-z0-9_-]+)", re.I)),
+    ("teamtailor", re.compile(r"([A-Za-z0-9-]+)\.teamtailor\.com", re.I)),
+    ("ashby", re.compile(r"jobs\.ashbyhq\.com/([A-Za-z0-9_.%-]+)", re.I)),
+    ("smartrecruiters", re.compile(r"(?:jobs|careers)\.smartrecruiters\.com/([A-Za-z0-9_-]+)", re.I)),
+]
+# Path segments / subdomains the patterns above can catch that are not boards
+_NOT_BOARDS = {"embed", "api", "v1", "www", "app", "assets", "scripts", "cdn", "career", "careers", "jobs", "static",
+               "images", "j", "oneclick-ui", "sr-jobs", "search", "privacy", "legal"}
+
+# Public listing endpoints per platform; {token} is the board
+ATS_APIS = {
+    "greenhouse": "https://boards-api.greenhouse.io/v1/boards/{token}/jobs",
+    "lever": "https://api.lever.co/v0/postings/{token}?mode=json",
+    "workable": "https://apply.workable.com/api/v1/widget/accounts/{token}",
+    "teamtailor": "https://{token}.teamtailor.com/jobs.rss",
+    "ashby": "https://api.ashbyhq.com/posting-api/job-board/{token}",
+    "smartrecruiters": "https://api.smartrecruiters.com/v1/companies/{token}/postings?limit=100",
+}
+# Search domains for finding boards directly
+ATS_SEARCH_SITES = ["boards.greenhouse.io", "jobs.lever.co", "apply.workable.com", "teamtailor.com",
+                    "jobs.ashbyhq.com", "jobs.smartrecruiters.com"]
+
+_CAREERS_LINK = re.compile(r"career|karri[aä]r|\bjobs?\b|join[- ]us|work[- ](?:with|at)[- ]us|vacanc|openings|lediga[- ]tj", re.I)
+# Title words that say nothing about the role itself
+_SENIORITY = {"senior", "sr", "junior", "jr", "lead", "staff", "principal", "mid", "head", "of", "and", "the", "ii", "iii"}
+# Interchangeable words for "someone who builds software"
+_GENERIC = {"engineer", "developer", "programmer", "utvecklare"}
+
+
+def find_boards(text: str) -> set[tuple[str, str]]:
+    """Every (platform, token) ATS board referenced in text (a URL or a page's HTML)."""
+    boards = set()
+    for platform, pattern in ATS_PATTERNS:
+        for m in pattern.finditer(text):
+            token = m.group(1).strip(".").lower()
+            if token and token not in _NOT_BOARDS:
+                boards.add((platform, token))
+    return boards
+
+
+def _company_name(token: str) -> str:
+    return " ".join(p.capitalize() for p in re.split(r"[-_.]+", token) if p)
+
+
+def _words(text: str) -> set[str]:
+    return set(re.findall(r"[a-zåäöéü0-9+#.]+", text.lower()))
+
+
+class TitleMatcher:
+    """
+    Does a listing match the wanted titles and places? A title matches when it contains every
+    distinctive word of a wanted title ('Senior Backend Engineer' -> backend + engineer/developer).
+    A location matches when it names a wanted city, says remote (if remote is wanted) or is empty.
+    """
+
+    def __init__(self, conditions: dict):
+        from tools import _split_field
+
+        self.titles = []
+        for title in _split_field(conditions.get("job_titles", "")) or ["Software Engineer"]:
+            words = _words(title) - _SENIORITY
+            self.titles.append((words - _GENERIC, bool(words & _GENERIC)))
+        cities = [c.strip() for c in re.split(r";|/|\bor\b", conditions.get("city", ""), flags=re.I) if c.strip()]
+        self.cities = [c.split(",")[0].strip().lower() for c in cities if c.split(",")[0].strip().lower() != "remote"]
+        self.remote = "remote" in (conditions.get("work_condition", "") + conditions.get("city", "")).lower()
+
+    def title_ok(self, title: str) -> bool:
+        words = _words(title)
+        for distinctive, generic in self.titles:
+            if distinctive <= words and (not generic or words & _GENERIC):
+                return True
+        return False
+
+    def location_ok(self, location: str) -> bool:
+        location = (location or "").lower()
+        if not location or not self.cities:
+            return True
+        if self.remote and "remote" in location:
+            return True
+        return any(city in location for city in self.cities)
+
+
+def _get(url: str, accept: str) -> str | None:
+    """Body of url fetched politely with the shared HTTP session, or None on any failure."""
+    from fetcher import HTTP_TIMEOUT, BlockedError, get_fetcher, response_text
+    from politeness import get_scheduler
+
+    try:
+        with get_scheduler().slot(url):
+            resp = get_fetcher().session.get(url, headers={"Accept": accept}, timeout=HTTP_TIMEOUT)
+            if resp.status_code == 429:
+                raise BlockedError(url, "HTTP 429")
+    except Exception as e:
+        print(f"--- CAREERS: {url}: {type(e).__name__}: {e} ---")
+        return None
+    return response_text(resp) if resp.status_code == 200 else None
+
+
+def _get_json(url: str):
+    body = _get(url, "application/json")
+    try:
+        return json.loads(body) if body else None
+    except ValueError:
+        return None
+
+
+def fetch_board(platform: str, token: str) -> list[tuple[JobRecord, str]]:
+    """[(record, location)] of every open job on an ATS board (empty if the board can't be read)."""
+    url = ATS_APIS[platform].format(token=token)
+    company = _company_name(token)
+    listings = []
+    with span("careers.board", platform=platform, token=token) as s:
+        if platform == "teamtailor":
+            body = _get(url, "application/rss+xml, application/xml")
+            try:
+                channel = ET.fromstring(body).find("channel") if body else None
+            except ET.ParseError:
+                channel = None
+            if channel is not None:
+                for item in channel.findall("item"):
+                    location = " ".join(" ".join(e.itertext()) for e in item if "location" in e.tag.lower() or e.tag.endswith("city"))
+                    listings.append(({"title": item.findtext("title", ""), "company": company,
+                                      "url": item.findtext("link", "")}, location))
+        else:
+            data = _get_json(url)
+            if platform == "greenhouse" and isinstance(data, dict):
+                for j in data.get("jobs", []):
+                    listings.append(({"title": j.get("title", ""), "company": j.get("company_name") or company,
+                                      "url": j.get("absolute_url", "")}, (j.get("location") or {}).get("name", "")))
+            elif platform == "lever" and isinstance(data, list):
+                for j in data:
+                    categories = j.get("categories") or {}
+                    location = " ".join([categories.get("location") or ""] + (categories.get("allLocations") or []))
+                    listings.append(({"title": j.get("text", ""), "company": company, "url": j.get("hostedUrl", "")},
+                                     f"{location} {j.get('workplaceType', '')}"))
+            elif platform == "workable" and isinstance(data, dict):
+                company = data.get("name") or company
+                for j in data.get("jobs", []):
+                    location = " ".join(str(j.get(k) or "") for k in ("city", "state", "country"))
+                    if j.get("telecommuting"):
+                        location += " remote"
+                    listings.append(({"title": j.get("title", ""), "company": company,
+                                      "url": j.get("url") or j.get("shortlink", "")}, location))
+            elif platform == "ashby" and isinstance(data, dict):
+                for j in data.get("jobs", []):
+                    location = f"{j.get('location', '')} {'remote' if j.get('isRemote') else ''}"
+                    listings.append(({"title": j.get("title", ""), "company": company, "url": j.get("jobUrl", "")}, location))
+            elif platform == "smartrecruiters" and isinstance(data, dict):
+                for j in data.get("content", []):
+                    loc = j.get("location") or {}
+                    location = f"{loc.get('city', '')} {loc.get('country', '')} {'remote' if loc.get('remote') else ''}"
+                    listings.append(({"title": j.get("name", ""), "company": (j.get("company") or {}).get("name") or company,
+                                      "url": f"https://jobs.smartrecruiters.com/{token}/{j.get('id', '')}"}, location))
+        s.set(jobs=len(listings))
+    return [(r, loc) for r, loc in listings if r["title"] and r["url"]]
+
+
+def careers_links(html: str, base_url: str, limit: int = CAREERS_MAX_LINKS) -> list[str]:
+    """Links of a company page that look like its careers / jobs page, most likely first."""
+    import lxml.html
+
+    try:
+        doc = lxml.html.fromstring(html)
+    except (ValueError, lxml.etree.ParserError):
+        return []
+    found = []
+    for a in doc.iter("a"):
+        href = (a.get("href") or "").strip()
+        if not href or href.startswith(("#", "mailto:", "tel:", "javascript:")):
+            continue
+        text = " ".join(a.text_content().split())
+        if _CAREERS_LINK.search(href) or _CAREERS_LINK.search(text):
+            url = urljoin(base_url, href)
+            if url not in found:
+                found.append(url)
+    # Links to an ATS first, then the site's own careers pages
+    found.sort(key=lambda u: not find_boards(u))
+    return found[:limit]
+
+
+def _page_listings(html: str, page_url: str, company: str) -> list[tuple[JobRecord, str]]:
+    """Links on a careers page without a known ATS, titled by their text; the matcher decides which are jobs."""
+    import lxml.html
+
+    try:
+        doc = lxml.html.fromstring(html)
+    except (ValueError, lxml.etree.ParserError):
+        return []
+    host = urlsplit(page_url).hostname
+    listings = []
+    for a in doc.iter("a"):
+        href = (a.get("href") or "").strip()
+        text = " ".join(a.text_content().split())
+        if not href or not 5 <= len(text) <= 100:
+            continue
+        url = urljoin(page_url, href)
+        if urlsplit(url).hostname == host and urlsplit(url).path.count("/") >= 2:
+            listings.append(({"title": text, "company": company, "url": url}, ""))
+    return listings
+
+
+def _site_name(html: str, url: str) -> str:
+    m = re.search(r"<meta[^>]+property=[\"']og:site_name[\"'][^>]+content=[\"']([^\"']+)", html or "", re.I)
+    if m:
+        return m.group(1).strip()
+    host = (urlsplit(url).hostname or "").removeprefix("www.")
+    return _company_name(host.split(".")[0])
+
+
+def crawl_company(site_url: str) -> tuple[set[tuple[str, str]], list[tuple[JobRecord, str]]]:
+    """
+    Follow a company website to its careers page. Returns the ATS boards it links to, or, when there
+    are none, the links of its careers pages as listings.
+    """
+    from fetcher import get_fetcher
+    from politeness import get_scheduler
+
+    def fetch(url: str) -> str:
+        try:
+            with get_scheduler().slot(url):
+                return get_fetcher().fetch_html(url)[0]
+        except Exception as e:
+            print(f"--- CAREERS: {url}: {type(e).__name__}: {e} ---")
+            return ""
+
+    with span("careers.company", url=site_url) as s:
+        html = fetch(site_url)
+        boards = find_boards(html)
+        listings = []
+        if not boards:
+            company = _site_name(html, site_url)
+            for link in careers_links(html, site_url):
+                boards |= find_boards(link)
+                if boards:
+                    break
+                page = fetch(link)
+                boards |= find_boards(page)
+                if boards:
+                    break
+                listings.extend(_page_listings(page, link, company))
+        s.set(boards=len(boards), links=len(listings))
+    return boards, ([] if boards else listings)
+
+
+def _search_seeds(conditions: dict) -> tuple[set[tuple[str, str]], list[str]]:
+    """ATS boards found by site: searches, and company websites found by searching for companies in the cities."""
+    from tools import SEARCH_WORKERS, _run_job_search
+
+    matcher = TitleMatcher(conditions)
+    cities = matcher.cities or ["remote"]
+    queries = [f"site:{site} {city}" for city in cities for site in ATS_SEARCH_SITES]
+    company_queries = [q for city in cities for q in (f"software companies in {city}", f"tech startups {city} careers")]
+
+    def search(q: str) -> list[dict]:
+        print(f"--- CAREERS SEARCH: {q} ---")
+        return _run_job_search(20, lambda urls: urls, q)[0]
+
+    with ThreadPoolExecutor(max_workers=max(1, SEARCH_WORKERS), thread_name_prefix="careers-search") as pool:
+        results = list(pool.map(search, queries + company_queries))
+    boards, sites, seen_hosts = set(), [], set()
+    for found in results:
+        for r in found:
+            url_boards = find_boards(r["url"])
+            if url_boards:
+                boards |= url_boards
+                continue
+            parts = urlsplit(r["url"])
+            host = (parts.hostname or "").removeprefix("www.")
+            if host and host not in seen_hosts:
+                seen_hosts.add(host)
+                sites.append(f"{parts.scheme}://{parts.netloc}/")
+    return boards, sites
+
+
+def _file_seeds(path: str) -> tuple[set[tuple[str, str]], list[str]]:
+    boards, sites = set(), []
+    if not os.path.exists(path):
+        return boards, sites
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            url = line if "://" in line else f"https://{line}"
+            url_boards = find_boards(url)
+            if url_boards:
+                boards |= url_boards
+            else:
+                sites.append(url)
+    return boards, sites
+
+
+def discover_jobs(conditions: dict, min_results: int = 10, companies_file: str = COMPANIES_FILE) -> list[JobRecord]:
+    """
+    Jobs matching conditions from ATS boards and company career pages, without the visited ones;
+    new URLs are recorded in the visited URL store. Company websites are only crawled while the
+    boards found so far yield fewer than min_results jobs.
+    """
+    from url_store import get_visited_store
+
+    matcher = TitleMatcher(conditions)
+    visited = get_visited_store()
+    jobs: list[JobRecord] = []
+    seen: set[str] = set()
+    lock = threading.Lock()
+    done_boards: set[tuple[str, str]] = set()
+
+    def collect(listings: list[tuple[JobRecord, str]]):
+        """Keep a board's or careers page's matching listings, checked against the visited store in one query."""
+        matched = []
+        with lock:
+            for record, location in listings:
+                key = normalize_url(record["url"])
+                if key in seen or not matcher.title_ok(record["title"]) or not matcher.location_ok(location):
+                    continue
+                seen.add(key)
+                matched.append(record)
+        new = set(visited.filter_new([r["url"] for r in matched])) if matched else set()
+        with lock:
+            jobs.extend({"title": r["title"].strip(), "company": r["company"].strip(), "url": r["url"]}
+                        for r in matched if r["url"] in new)
+
+    def read_boards(boards: set[tuple[str, str]]):
+        boards = sorted(boards - done_boards)
+        done_boards.update(boards)
+        with ThreadPoolExecutor(max_workers=max(1, CAREERS_WORKERS), thread_name_prefix="careers") as pool:
+            for listings in pool.map(lambda b: fetch_board(*b), boards):
+                collect(listings)
+
+    with span("careers.discover") as s:
+        boards, sites = _file_seeds(companies_file)
+        search_boards, search_sites = _search_seeds(conditions)
+        boards |= search_boards
+        sites += [u for u in search_sites if u not in sites]
+        print(f"--- CAREERS: {len(boards)} ATS boards and {len(sites)} company websites to check ---")
+        read_boards(boards)
+        if len(jobs) < min_results and sites:
+            sites = sites[:CAREERS_MAX_COMPANIES]
+            found_boards = set()
+            with ThreadPoolExecutor(max_workers=max(1, CAREERS_WORKERS), thread_name_prefix="careers") as pool:
+                for site_boards, listings in pool.map(crawl_company, sites):
+                    found_boards |= site_boards
+                    collect(listings)
+            read_boards(found_boards)
+        s.set(boards=len(done_boards), jobs=len(jobs))
+    if jobs:
+        visited.add_many([j["url"] for j in jobs])
+    print(f"--- CAREERS: {len(jobs)} new matching jobs from {len(done_boards)} ATS boards ---")
+    return jobs
@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+import time
+from typing import Iterator
+
+_PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+CHECKPOINT_FILE = os.path.join(_PROJECT_ROOT, "job_applications.checkpoint.jsonl")
+
+
+class Checkpoint:
+    """
+    Append-only JSONL log of a run. The first record holds the discovered job list, and jobs
+    that stream in later (search results) append further "jobs" records ahead of their results;
+    every finished job then appends one result record with its Excel row, so a crash
+    loses at most the jobs that were in flight.
+
+        {"type": "jobs", "jobs": [{"title", "company", "url"}, ...]}
+        {"type": "result", "index": 3, "url": "...", "status": "done" | "failed" | "blocked" | "duplicate", "row": {...} | null}
+    """
+
+    def __init__(self, path: str = CHECKPOINT_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path) and os.path.getsize(self.path) > 0
+
+    def _records(self) -> Iterator[tuple[int, dict]]:
+        """(byte offset, record) for every readable line; a torn last line from a crash is skipped."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                try:
+                    yield offset, json.loads(line)
+                except ValueError:
+                    continue
+
+    def _append(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def start(self, jobs: list[dict]):
+        """Begin a fresh run: truncate the log and record the job list."""
+        with self._lock:
+            open(self.path, "w", encoding="utf-8").close()
+        self.extend(jobs)
+
+    def extend(self, jobs: list[dict]):
+        """Append jobs to the run's job list; they take the next indexes."""
+        self._append({"type": "jobs", "ts": time.time(),
+                      "jobs": [{k: j.get(k, "N/A") for k in ("title", "company", "url")} for j in jobs]})
+
+    def jobs(self) -> list[dict]:
+        """Job list of the run in the log (empty if there is none)."""
+        jobs = []
+        for _, record in self._records():
+            if record.get("type") == "jobs":
+                jobs.extend(record.get("jobs", []))
+        return jobs
+
+    def record(self, index: int, url: str, status: str, row: dict | None):
+        self._append({"type": "result", "ts": time.time(), "index": index, "url": url, "status": status, "row": row})
+
+    def completed(self) -> set[int]:
+        """Indexes of jobs whose latest result is 'done' or 'duplicate' (collapsed into another job)."""
+        latest = {}
+        for _, record in self._records():
+            if record.get("type") == "result":
+                latest[record["index"]] = record.get("status")
+        return {i for i, status in latest.items() if status in ("done", "duplicate")}
+
+    def rows(self) -> Iterator[dict]:
+        """
+        Latest row per job in job-list order. Only byte offsets are kept in memory;
+        rows are read back one at a time.
+        """
+        offsets = {}
+        for offset, record in self._records():
+            if record.get("type") == "result":
+                offsets[record["index"]] = offset
+        with open(self.path, "rb") as f:
+            for index in sorted(offsets):
+                f.seek(offsets[index])
+                row = json.loads(f.readline()).get("row")
+                if row is not None:
+                    yield row
+
+
+def export_xlsx(rows: Iterator[dict], output_file: str) -> int:
+    """Stream rows into output_file with openpyxl's write-only mode. Returns the number of rows written."""
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    columns = None
+    count = 0
+    for row in rows:
+        if columns is None:
+            columns = list(row.keys())
+            ws.append(columns)
+        values = [row.get(col, "") for col in columns]
+        ws.append([ILLEGAL_CHARACTERS_RE.sub("", v) if isinstance(v, str) else v for v in values])
+        count += 1
+    if columns is None:
+        ws.append([])
+    wb.save(output_file)
+    return count
@@ -0,0 +1,275 @@
+"""
+Run single steps of the job agent; each subcommand only loads what it needs.
+
+    python cli.py discover --out jobs.jsonl              # ATS boards and career pages, no LLM
+    python cli.py search --min 40 --out jobs.jsonl       # DDGS searches from conditions.txt
+    python cli.py scrape --jobs jobs.jsonl --out pages.jsonl
+    python cli.py analyze --jobs jobs.jsonl              # scrape, score and write cover letters into the checkpoint
+    python cli.py export --out job_applications.xlsx     # Excel from the checkpoint, no crewai import
+    python cli.py batch profiles/                        # every candidate in profiles/, shared search and scrape
+    python cli.py watch --interval 30                    # re-search and re-check, analyze only new/changed postings
+    python cli.py corpus search "kafka kubernetes" --city Stockholm --since 90   # past postings, no network/LLM
+"""
+import argparse
+import json
+import os
+import sys
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _read_jobs(path: str) -> list[dict]:
+    """Jobs from a JSON lines file (as written by `search`); a line may also be a bare URL."""
+    jobs = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                job = json.loads(line)
+                jobs.append({"title": job.get("title", "N/A"), "company": job.get("company", "N/A"), "url": job.get("url", "")})
+            else:
+                jobs.append({"title": "N/A", "company": "N/A", "url": line})
+    return jobs
+
+
+def _write_lines(records, out: str | None):
+    f = open(out, "w", encoding="utf-8") if out else sys.stdout
+    try:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+    finally:
+        if out:
+            f.close()
+
+
+def cmd_discover(args) -> int:
+    from careers import discover_jobs
+    from main import load_conditions
+
+    jobs = discover_jobs(load_conditions(args.conditions), min_results=args.min, companies_file=args.companies)
+    _write_lines(jobs, args.out)
+    return 0 if jobs else 1
+
+
+def cmd_search(args) -> int:
+    from main import load_conditions
+    from tools import build_search_queries, run_job_search_loop
+
+    queries = build_search_queries(load_conditions(args.conditions))
+    jobs = run_job_search_loop(queries, min_results=args.min, max_per_query=args.per_query)
+    _write_lines(jobs, args.out)
+    return 0 if jobs else 1
+
+
+def cmd_scrape(args) -> int:
+    from concurrent.futures import ThreadPoolExecutor
+    from main import SCRAPE_WORKERS
+    from tools import scrape_url
+
+    urls = list(args.urls)
+    if args.jobs:
+        urls += [job["url"] for job in _read_jobs(args.jobs)]
+    if not urls:
+        print("Nothing to scrape: pass URLs or --jobs FILE", file=sys.stderr)
+        return 2
+    with ThreadPoolExecutor(max_workers=SCRAPE_WORKERS) as pool:
+        texts = pool.map(scrape_url, urls)
+        _write_lines(({"url": url, "text": text} for url, text in zip(urls, texts)), args.out)
+    return 0
+
+
+def cmd_analyze(args) -> int:
+    from checkpoint import Checkpoint
+    from main import CHECKPOINT_FILE, _process_jobs, load_conditions, load_cv
+
+    cv = load_cv()
+    if "error" in cv:
+        print(cv["error"], file=sys.stderr)
+        return 2
+    conditions = load_conditions(args.conditions)
+    checkpoint = Checkpoint(args.checkpoint or CHECKPOINT_FILE)
+    if args.jobs:
+        jobs, done = _read_jobs(args.jobs), set()
+        checkpoint.start(jobs)
+    elif checkpoint.exists():
+        jobs, done = checkpoint.jobs(), checkpoint.completed()
+        print(f"--- Resuming: {len(done)}/{len(jobs)} jobs already completed in {os.path.basename(checkpoint.path)} ---")
+    else:
+        print("No jobs: pass --jobs FILE (from `cli.py search`) or run main.py first", file=sys.stderr)
+        return 2
+    _process_jobs(jobs, cv, conditions, checkpoint=checkpoint, skip=done)
+    print(f"--- Checkpoint updated: {checkpoint.path} (run `cli.py export` for Excel) ---")
+    return 0
+
+
+def cmd_export(args) -> int:
+    from checkpoint import CHECKPOINT_FILE, Checkpoint, export_xlsx
+
+    checkpoint = Checkpoint(args.checkpoint or CHECKPOINT_FILE)
+    if not checkpoint.exists():
+        print(f"No checkpoint at {checkpoint.path}", file=sys.stderr)
+        return 2
+    out = args.out or os.path.join(os.path.dirname(os.path.abspath(__file__)), "job_applications.xlsx")
+    count = export_xlsx(checkpoint.rows(), out)
+    print(f"--- Results saved to {out} ({count} rows) ---")
+    return 0
+
+
+def cmd_batch(args) -> int:
+    from batch import run_batch
+
+    counts = run_batch(args.profiles, max_per_query=args.per_query)
+    return 0 if counts else 1
+
+
+def cmd_watch(args) -> int:
+    from watch import run_watch
+
+    run_watch(output_file=args.out, interval_minutes=args.interval, once=args.once, max_per_query=args.per_query)
+    return 0
+
+
+def _corpus_filters(args) -> dict:
+    profile = None
+    if args.cv:
+        from corpus import profile_key
+        from cv_profile import format_profile, get_cv_profile
+
+        cv = get_cv_profile(args.cv)
+        if "error" in cv:
+            raise SystemExit(cv["error"])
+        profile = profile_key(format_profile(cv))
+    return {"city": args.city, "company": args.company, "category": args.category, "tech": args.tech,
+            "min_score": args.min_score, "since_days": args.since, "profile": profile}
+
+
+def cmd_corpus(args) -> int:
+    from corpus import JobCorpus, rescore
+
+    corpus = JobCorpus()
+    if args.action == "stats":
+        for key, value in corpus.stats().items():
+            print(f"{key}: {value}")
+        return 0
+    if args.action == "facets":
+        for field, counts in corpus.facets(args.query, limit=args.limit, **_corpus_filters(args)).items():
+            print(f"{field}:")
+            for value, count in counts:
+                print(f"  {count:5d}  {value}")
+        return 0
+    filters = _corpus_filters(args)
+    results = corpus.search(args.query, limit=args.limit or None, **filters)
+    if args.action == "search":
+        _write_lines(results, args.out)
+        return 0 if results else 1
+
+    from checkpoint import export_xlsx
+    from main import load_conditions, load_cv
+
+    rows = list(corpus.rows([r["url"] for r in results], profile=filters["profile"]))
+    if args.rescore:
+        cv = load_cv()
+        if "error" in cv:
+            print(cv["error"], file=sys.stderr)
+            return 2
+        exported = rescore(rows, cv["text"], load_conditions(args.conditions))
+    else:
+        exported = [row for row, _ in rows]
+    out = args.out or "corpus_export.xlsx"
+    count = export_xlsx(iter(exported), out)
+    print(f"--- Results saved to {out} ({count} rows) ---")
+    return 0 if count else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trace", nargs="?", const="", metavar="FILE",
+                        help="Record timing spans as JSON lines (default file: .cache/trace.jsonl)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("discover", help="Find jobs on ATS boards and company career pages matching conditions.txt")
+    p.add_argument("--conditions", default="conditions.txt")
+    p.add_argument("--companies", default=os.getenv("COMPANIES_FILE", "companies.txt"),
+                   help="Company websites or ATS board URLs, one per line")
+    p.add_argument("--min", type=int, default=int(os.getenv("MAX_JOBS", "10")),
+                   help="Crawl company websites until this many jobs are found")
+    p.add_argument("--out", help="JSON lines file (default: stdout)")
+    p.set_defaults(func=cmd_discover)
+
+    p = sub.add_parser("search", help="Search job boards for the titles/cities in conditions.txt")
+    p.add_argument("--conditions", default="conditions.txt")
+    p.add_argument("--min", type=int, default=int(os.getenv("MAX_JOBS", "10")), help="Stop once this many new jobs are found")
+    p.add_argument("--per-query", type=int, default=15, help="Results kept per search query")
+    p.add_argument("--out", help="JSON lines file (default: stdout)")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("scrape", help="Fetch and extract job pages")
+    p.add_argument("urls", nargs="*", help="Job posting URLs")
+    p.add_argument("--jobs", help="JSON lines file of jobs (from `search`) or one URL per line")
+    p.add_argument("--out", help="JSON lines file (default: stdout)")
+    p.set_defaults(func=cmd_scrape)
+
+    p = sub.add_parser("analyze", help="Scrape, score and write cover letters for jobs, recording rows in the checkpoint")
+    p.add_argument("--jobs", help="JSON lines file of jobs (default: continue the checkpoint's job list)")
+    p.add_argument("--conditions", default="conditions.txt")
+    p.add_argument("--checkpoint", help="Checkpoint file (default: job_applications.checkpoint.jsonl)")
+    p.set_defaults(func=cmd_analyze)
+
+    p = sub.add_parser("export", help="Write the checkpoint's rows to Excel")
+    p.add_argument("--checkpoint", help="Checkpoint file (default: job_applications.checkpoint.jsonl)")
+    p.add_argument("--out", help="Excel file (default: job_applications.xlsx)")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("batch", help="Search, scrape, analyze and export for every profile directory, sharing search and scrape")
+    p.add_argument("profiles", help="Directory with one subdirectory (cv.txt/cv.pdf + conditions.txt) per candidate")
+    p.add_argument("--per-query", type=int, default=15, help="Results kept per search query")
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser("watch", help="Search and re-check known postings on an interval; only new or changed ones are analyzed")
+    p.add_argument("--interval", type=float, default=float(os.getenv("WATCH_INTERVAL_MINUTES", "60")), help="Minutes between cycles")
+    p.add_argument("--once", action="store_true", help="Run a single cycle and exit (for cron)")
+    p.add_argument("--per-query", type=int, default=15, help="Results kept per search query")
+    p.add_argument("--out", help="Excel file (default: job_applications.xlsx)")
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("corpus", help="Search, facet, re-score and re-export postings of past runs (no network or LLM)")
+    p.add_argument("action", choices=["search", "facets", "export", "stats"])
+    p.add_argument("query", nargs="?", help='Full-text query: words must all appear; "phrases", OR, NOT and prefix* work')
+    p.add_argument("--city", help="Location contains this")
+    p.add_argument("--company", help="Company contains this")
+    p.add_argument("--category", help="Analyst category contains this")
+    p.add_argument("--tech", help="Analyst tech stack contains this")
+    p.add_argument("--min-score", type=int, help="Analyst score at least this")
+    p.add_argument("--since", type=float, metavar="DAYS", help="Seen within the last DAYS days")
+    p.add_argument("--cv", metavar="FILE",
+                   help="Use the analyses made for this CV, e.g. one batch profile's (default: each posting's latest)")
+    p.add_argument("--limit", type=int, default=20, help="Results (search/export, 0 = all) or values per facet")
+    p.add_argument("--rescore", action="store_true",
+                   help="export: recompute Prefilter Score against the current CV and conditions, best first")
+    p.add_argument("--conditions", default="conditions.txt")
+    p.add_argument("--out", help="search: JSON lines file (default: stdout); export: Excel file (default: corpus_export.xlsx)")
+    p.set_defaults(func=cmd_corpus)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.trace is not None:
+        from tracing import enable_tracing
+        enable_tracing(args.trace or None)
+    code = args.func(args)
+    from tracing import TRACE_SUMMARY, get_tracer
+    tracer = get_tracer()
+    if tracer is not None:
+        tracer.flush()
+        if TRACE_SUMMARY:
+            print(tracer.format_summary(), file=sys.stderr)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
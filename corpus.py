@@ -0,0 +1,328 @@
+"""
+Searchable corpus of every posting the agent has scraped and analyzed.
+
+Each posting's cleaned text, title/company/location and first-seen / last-seen dates are kept in
+.cache/corpus.sqlite and indexed with SQLite FTS5; its analysis (score, category, tech stack),
+prefilter score and Excel row are kept per CV profile, so batch runs for several candidates don't
+overwrite each other. Past runs can be searched, re-scored against another CV or conditions.txt and
+re-exported without network or LLM calls:
+
+    python cli.py corpus search "kafka kubernetes" --city Stockholm --since 90
+    python cli.py corpus facets kafka
+    python cli.py corpus export "kafka OR kotlin" --rescore --out kafka_jobs.xlsx
+    python cli.py corpus search kafka --cv profiles/alice/cv.pdf --min-score 70
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterator
+from scrape_cache import content_hash
+from urls import normalize_url
+
+_PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+CORPUS_FILE = os.path.join(_PROJECT_ROOT, ".cache", "corpus.sqlite")
+
+CORPUS_ENABLED = os.getenv("CORPUS", "true").lower() in ("1", "true", "yes")
+
+FACET_FIELDS = ("category", "company", "location")
+_FACET_COLUMNS = {"category": "a.category", "company": "p.company", "location": "p.location"}
+# bm25 weights of the indexed columns: title, company, location, tech_stack, category, text
+_BM25_WEIGHTS = (5.0, 2.0, 1.0, 3.0, 1.0, 1.0)
+_FTS_OPERATORS = {"AND", "OR", "NOT"}
+
+
+def _header(text: str, label: str) -> str:
+    """Value of a 'Label: value' header line of scraped text (see extract.format_job_record)."""
+    m = re.search(rf"^{label}:\s*(.+)$", text or "", re.M)
+    return m.group(1).strip() if m else ""
+
+
+def profile_key(cv_profile: str) -> str:
+    """Key of the analyses made for a CV profile (cv_profile.format_profile text)."""
+    return content_hash(cv_profile or "")[:16]
+
+
+def fts_query(query: str) -> str:
+    """
+    FTS5 MATCH expression for a user query: every word must appear (prefix match with a
+    trailing '*'), "quoted phrases" stay phrases and upper-case OR / NOT / AND are operators.
+    """
+    parts = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query or ""):
+        if phrase.strip():
+            parts.append('"' + phrase.replace('"', "") + '"')
+        elif word in _FTS_OPERATORS:
+            parts.append(word)
+        elif word:
+            prefix = word.endswith("*")
+            word = word.rstrip("*").replace('"', "")
+            if word:
+                parts.append(f'"{word}"' + ("*" if prefix else ""))
+    # A dangling operator is a syntax error in FTS5
+    while parts and parts[-1] in _FTS_OPERATORS:
+        parts.pop()
+    while parts and parts[0] in _FTS_OPERATORS:
+        parts.pop(0)
+    return " ".join(parts)
+
+
+class JobCorpus:
+    """
+    SQLite table of postings keyed by normalized URL, with an external-content FTS5 index over
+    title, company, location, tech stack, category and text kept in sync by triggers, and a child
+    table of analyses keyed by posting and CV profile (profile_key). A posting's category and tech
+    stack columns hold its latest analysis so they stay searchable; queries read the analysis of
+    the requested profile, or the latest one.
+    """
+
+    def __init__(self, path: str = CORPUS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " id INTEGER PRIMARY KEY, url TEXT NOT NULL UNIQUE, raw_url TEXT NOT NULL, title TEXT, company TEXT,"
+            " location TEXT, text TEXT NOT NULL, content_hash TEXT NOT NULL, category TEXT, tech_stack TEXT,"
+            " first_seen REAL NOT NULL, last_seen REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS postings_last_seen ON postings(last_seen);"
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            " posting_id INTEGER NOT NULL, profile TEXT NOT NULL, score INTEGER, category TEXT, tech_stack TEXT,"
+            " prefilter_score REAL, row TEXT, analyzed_at REAL, updated_at REAL NOT NULL,"
+            " PRIMARY KEY (posting_id, profile));"
+            "CREATE VIRTUAL TABLE IF NOT EXISTS postings_fts USING fts5("
+            " title, company, location, tech_stack, category, text,"
+            " content='postings', content_rowid='id', tokenize=\"unicode61 remove_diacritics 2 tokenchars '+#'\");"
+            "CREATE TRIGGER IF NOT EXISTS postings_ai AFTER INSERT ON postings BEGIN"
+            " INSERT INTO postings_fts (rowid, title, company, location, tech_stack, category, text)"
+            " VALUES (new.id, new.title, new.company, new.location, new.tech_stack, new.category, new.text); END;"
+            "CREATE TRIGGER IF NOT EXISTS postings_ad AFTER DELETE ON postings BEGIN"
+            " INSERT INTO postings_fts (postings_fts, rowid, title, company, location, tech_stack, category, text)"
+            " VALUES ('delete', old.id, old.title, old.company, old.location, old.tech_stack, old.category, old.text); END;"
+            "CREATE TRIGGER IF NOT EXISTS postings_au AFTER UPDATE OF title, company, location, tech_stack, category, text"
+            " ON postings BEGIN"
+            " INSERT INTO postings_fts (postings_fts, rowid, title, company, location, tech_stack, category, text)"
+            " VALUES ('delete', old.id, old.title, old.company, old.location, old.tech_stack, old.category, old.text);"
+            " INSERT INTO postings_fts (rowid, title, company, location, tech_stack, category, text)"
+            " VALUES (new.id, new.title, new.company, new.location, new.tech_stack, new.category, new.text); END;"
+        )
+        if "row" in {r[1] for r in self._conn.execute("PRAGMA table_info(postings)")}:
+            # Corpora from before per-profile analyses: keep their one analysis under an unknown profile
+            self._conn.execute(
+                "INSERT OR IGNORE INTO analyses (posting_id, profile, score, category, tech_stack, prefilter_score,"
+                " row, analyzed_at, updated_at) SELECT id, '', score, category, tech_stack, prefilter_score, row,"
+                " analyzed_at, last_seen FROM postings WHERE row IS NOT NULL OR prefilter_score IS NOT NULL"
+            )
+        self._conn.commit()
+
+    def record(self, job: dict, row: dict | None = None):
+        """
+        Store a scraped pipeline job (title, company, url, desc and, once analyzed, score /
+        category / tech_stack / prefilter_score) with its Excel row, under the analyses of the
+        job's cv_profile. Text replaces the stored one and first_seen is kept; the profile's
+        analysis is replaced, but never by none.
+        """
+        text = job.get("desc") or ""
+        if not text or text.startswith("Error"):
+            return
+        analyzed = "score" in job
+        category, tech_stack = (job.get("category"), job.get("tech_stack")) if analyzed else (None, None)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO postings (url, raw_url, title, company, location, text, content_hash, category,"
+                " tech_stack, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(url) DO UPDATE SET raw_url = excluded.raw_url, title = excluded.title,"
+                " company = excluded.company, location = excluded.location, text = excluded.text,"
+                " content_hash = excluded.content_hash, category = COALESCE(excluded.category, postings.category),"
+                " tech_stack = COALESCE(excluded.tech_stack, postings.tech_stack), last_seen = excluded.last_seen",
+                (normalize_url(job["url"]), job["url"], job.get("title"), job.get("company"),
+                 _header(text, "Location"), text, content_hash(text), category, tech_stack, now, now),
+            )
+            (posting_id,) = self._conn.execute("SELECT id FROM postings WHERE url = ?",
+                                               (normalize_url(job["url"]),)).fetchone()
+            self._conn.execute(
+                "INSERT INTO analyses (posting_id, profile, score, category, tech_stack, prefilter_score, row,"
+                " analyzed_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(posting_id, profile) DO UPDATE SET score = COALESCE(excluded.score, analyses.score),"
+                " category = COALESCE(excluded.category, analyses.category),"
+                " tech_stack = COALESCE(excluded.tech_stack, analyses.tech_stack),"
+                " prefilter_score = COALESCE(excluded.prefilter_score, analyses.prefilter_score),"
+                " row = COALESCE(excluded.row, analyses.row),"
+                " analyzed_at = COALESCE(excluded.analyzed_at, analyses.analyzed_at), updated_at = excluded.updated_at",
+                (posting_id, profile_key(job.get("cv_profile", "")), job["score"] if analyzed else None, category,
+                 tech_stack, job.get("prefilter_score"), json.dumps(row, ensure_ascii=False) if row is not None else None,
+                 now if analyzed else None, now),
+            )
+            self._conn.commit()
+
+    def touch(self, urls: list[str]):
+        """Mark postings as seen again now (e.g. re-checked unchanged by watch mode)."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany("UPDATE postings SET last_seen = ? WHERE url = ?",
+                                   [(now, normalize_url(u)) for u in urls])
+            self._conn.commit()
+
+    @staticmethod
+    def _analysis_join(profile: str | None) -> tuple[str, list]:
+        """LEFT JOIN of analyses a: the given profile's analysis of posting p, or its latest one."""
+        if profile:
+            return " LEFT JOIN analyses a ON a.posting_id = p.id AND a.profile = ?", [profile]
+        return (" LEFT JOIN analyses a ON a.rowid = (SELECT rowid FROM analyses WHERE posting_id = p.id"
+                " ORDER BY updated_at DESC LIMIT 1)"), []
+
+    def _from_where(self, query: str | None, city: str | None, company: str | None, category: str | None,
+               tech: str | None, min_score: int | None, since_days: float | None,
+               profile: str | None = None) -> tuple[str, list]:
+        """
+        FROM and WHERE clauses (and their parameters) selecting postings p with their analysis a
+        (see _analysis_join); the index is only joined for a query.
+        """
+        clauses, params = [], []
+        match = fts_query(query) if query else ""
+        source = " FROM postings p"
+        if match:
+            source = " FROM postings_fts JOIN postings p ON p.id = postings_fts.rowid"
+        join, params = self._analysis_join(profile)
+        source += join
+        if match:
+            clauses.append("postings_fts MATCH ?")
+            params.append(match)
+        for column, value in (("p.location", city), ("p.company", company), ("a.category", category), ("a.tech_stack", tech)):
+            if value:
+                clauses.append(f"{column} LIKE ?")
+                params.append(f"%{value}%")
+        if min_score is not None:
+            clauses.append("a.score >= ?")
+            params.append(min_score)
+        if since_days is not None:
+            clauses.append("p.last_seen >= ?")
+            params.append(time.time() - since_days * 86400)
+        return source + ((" WHERE " + " AND ".join(clauses)) if clauses else ""), params
+
+    def search(self, query: str | None = None, city: str | None = None, company: str | None = None,
+               category: str | None = None, tech: str | None = None, min_score: int | None = None,
+               since_days: float | None = None, limit: int | None = 20, profile: str | None = None) -> list[dict]:
+        """
+        Postings matching the full-text query and every given facet (substring match on location,
+        company, category and tech stack; analyst score at least min_score; seen within since_days),
+        best bm25 rank first, or most recently seen first without a query. Each result has the
+        stored fields plus a 'snippet' of the matching text and its 'rank' (lower is better).
+        Analysis fields are those made for profile (a profile_key), or the latest ones without it.
+        """
+        where, params = self._from_where(query, city, company, category, tech, min_score, since_days, profile)
+        ranked = bool(query and fts_query(query))
+        rank = f"bm25(postings_fts, {', '.join(map(str, _BM25_WEIGHTS))})" if ranked else "0"
+        snippet = "snippet(postings_fts, 5, '[', ']', ' ... ', 16)" if ranked else "''"
+        sql = (
+            f"SELECT p.raw_url, p.title, p.company, p.location, a.score, a.category, a.tech_stack, a.prefilter_score,"
+            f" p.first_seen, p.last_seen, {snippet}, {rank} AS rank{where}"
+            f" ORDER BY {'rank' if ranked else 'p.last_seen DESC'}"
+        )
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        keys = ("url", "title", "company", "location", "score", "category", "tech_stack", "prefilter_score",
+                "first_seen", "last_seen", "snippet", "rank")
+        results = []
+        for r in rows:
+            result = dict(zip(keys, r))
+            for key in ("first_seen", "last_seen"):
+                result[key] = time.strftime("%Y-%m-%d", time.localtime(result[key]))
+            result["snippet"] = " ".join(result["snippet"].split())
+            result["rank"] = round(result["rank"], 4)
+            results.append(result)
+        return results
+
+    def facets(self, query: str | None = None, fields: tuple[str, ...] = FACET_FIELDS, limit: int = 10,
+               **filters) -> dict[str, list[tuple[str, int]]]:
+        """Most common values of each field among the postings search() would return, with their counts."""
+        where, params = self._from_where(query, filters.get("city"), filters.get("company"), filters.get("category"),
+                                    filters.get("tech"), filters.get("min_score"), filters.get("since_days"),
+                                    filters.get("profile"))
+        counts = {}
+        with self._lock:
+            for field in fields:
+                if field not in FACET_FIELDS:
+                    raise ValueError(f"Unknown facet {field!r} (one of {', '.join(FACET_FIELDS)})")
+                counts[field] = self._conn.execute(
+                    f"SELECT COALESCE(NULLIF({_FACET_COLUMNS[field]}, ''), 'N/A') AS value, COUNT(*) AS n{where}"
+                    f" GROUP BY value ORDER BY n DESC, value LIMIT ?", (*params, limit),
+                ).fetchall()
+        return counts
+
+    def rows(self, urls: list[str], profile: str | None = None) -> Iterator[tuple[dict, str]]:
+        """
+        (Excel row, text) of each stored posting in urls, in that order, from profile's analysis (or
+        the latest one); postings without a row get a minimal one.
+        """
+        join, join_params = self._analysis_join(profile)
+        for url in urls:
+            with self._lock:
+                r = self._conn.execute(
+                    "SELECT p.raw_url, p.title, p.company, p.text, a.score, a.category, a.tech_stack, a.prefilter_score,"
+                    f" a.row FROM postings p{join} WHERE p.url = ?", (*join_params, normalize_url(url)),
+                ).fetchone()
+            if r is None:
+                continue
+            raw_url, title, company, text, score, category, tech_stack, prefilter_score, row = r
+            if row is not None:
+                yield json.loads(row), text
+                continue
+            yield {
+                "Job Title": title or "N/A", "Company": company or "N/A", "URL": raw_url, "Source URLs": raw_url,
+                "Summary": f"Score: {score}. {category}. Tech: {tech_stack}" if score is not None else "Not analyzed",
+                "Category": category or "N/A", "Tech Stack": tech_stack or "N/A", "Cover Letter": "N/A",
+                "Prefilter Score": prefilter_score if prefilter_score is not None else "N/A",
+            }, text
+
+    def stats(self) -> dict:
+        with self._lock:
+            total, first, last = self._conn.execute(
+                "SELECT COUNT(*), MIN(first_seen), MAX(last_seen) FROM postings"
+            ).fetchone()
+            analyzed, profiles = self._conn.execute(
+                "SELECT COUNT(DISTINCT CASE WHEN analyzed_at IS NOT NULL THEN posting_id END), COUNT(DISTINCT profile)"
+                " FROM analyses"
+            ).fetchone()
+        day = lambda t: time.strftime("%Y-%m-%d", time.localtime(t)) if t else "-"
+        return {"postings": total, "analyzed": analyzed, "profiles": profiles, "first_seen": day(first),
+                "last_seen": day(last), "path": self.path}
+
+
+def rescore(rows: list[tuple[dict, str]], cv_content: str, conditions: dict) -> list[dict]:
+    """
+    Excel rows with 'Prefilter Score' recomputed for another CV / conditions from the stored
+    text (keyword prefilter, no LLM), best match first.
+    """
+    from prefilter import score_descriptions
+
+    if not rows:
+        return []
+    scores = score_descriptions([text for _, text in rows], cv_content, conditions)
+    rescored = []
+    for (row, _), score in zip(rows, scores):
+        rescored.append({**row, "Prefilter Score": round(float(score), 1)})
+    rescored.sort(key=lambda r: r["Prefilter Score"], reverse=True)
+    return rescored
+
+
+_corpus = None
+_corpus_lock = threading.Lock()
+
+
+def get_corpus() -> JobCorpus | None:
+    """Return the process-wide corpus, or None when CORPUS is disabled."""
+    global _corpus
+    if not CORPUS_ENABLED:
+        return None
+    with _corpus_lock:
+        if _corpus is None:
+            _corpus = JobCorpus()
+        return _corpus
@@ -0,0 +1,55 @@
+import os
+from crewai.tools import BaseTool
+from tools import _run_job_search, scrape_url
+from tracing import span
+from url_store import get_visited_store
+
+
+class JobSearchTool(BaseTool):
+    name: str = "Job Search Tool"
+    description: str = "Searches for job postings using DuckDuckGo. Handles duplicate prevention by checking the visited URL store."
+
+    def _run(self, query: str) -> str:
+        with span("tool", tool=self.name, query=query):
+            return self._search(query)
+
+    def _search(self, query: str) -> str:
+        max_results = 10
+        visited = get_visited_store()
+
+        search_query = query.strip().replace('"', "").strip()
+        if not search_query:
+            return "Error: empty search query. Provide a company name or search terms."
+
+        print(f"--- TOOL: Searching for: {search_query} ---")
+
+        results_found, err = _run_job_search(max_results, visited.filter_new, search_query)
+        if err:
+            print(f"--- TOOL ERROR: {err} ---")
+            return f"No job postings found. {err} Try again or use a different query (e.g. 'Software Engineer Stockholm jobs')."
+
+        if not results_found:
+            # Search succeeded but all URLs were already visited
+            print(f"--- TOOL: Search returned results but all were already among {len(visited)} visited URLs ---")
+            return (
+                "No new job postings (all results were already visited). "
+                "Try a different search query or delete visited_urls.sqlite to reset."
+            )
+
+        output_lines = []
+        for res in results_found:
+            output_lines.append(f"Title: {res['title']}\nURL: {res['url']}\nSnippet: {res['body']}\n---")
+        visited.add_many([res["url"] for res in results_found])
+
+        print(f"--- TOOL: Found {len(results_found)} new jobs, saved to {os.path.basename(visited.path)} ---")
+        return "\n".join(output_lines)
+
+
+class WebScraperTool(BaseTool):
+    name: str = "Web Scraper Tool"
+    description: str = "Scrapes the content of a job posting URL to extract detailed requirements."
+
+    def _run(self, url: str) -> str:
+        # Same cache and tiered fetcher as scrape_url, so the researcher doesn't launch Chromium per call
+        with span("tool", tool=self.name, url=url.strip()):
+            return scrape_url(url.strip())
@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+import re
+import time
+from collections import Counter
+
+_PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+CV_PROFILE_DIR = os.path.join(_PROJECT_ROOT, ".cache", "cv_profiles")
+# Size of the profile text sent with every analyst / cover-letter prompt (about 4 characters per token)
+CV_PROFILE_TOKENS = int(os.getenv("CV_PROFILE_TOKENS", "350"))
+# Bump when build_profile() changes so cached profiles are rebuilt
+PROFILE_VERSION = "2"
+
+# Canonical spelling -> pattern (matched case-insensitively on word boundaries)
+TECH_TERMS = {
+    "Java": r"java(?!\s*script)", "Kotlin": r"kotlin", "Scala": r"scala", "Python": r"python", "Go": r"golang|go(?=\s*(?:lang|,|/|\)))",
+    "Rust": r"rust", "C#": r"c#", ".NET": r"\.net|dotnet", "C++": r"c\+\+", "JavaScript": r"javascript",
+    "TypeScript": r"typescript", "Node.js": r"node\.?js", "PHP": r"php", "Ruby": r"ruby", "Rails": r"rails",
+    "Swift": r"swift", "Elixir": r"elixir", "Spring Boot": r"spring\s*boot", "Spring": r"spring(?!\s*boot)",
+    "Django": r"django", "Flask": r"flask", "FastAPI": r"fastapi", "Laravel": r"laravel", "React": r"react",
+    "Angular": r"angular", "Vue": r"vue(?:\.js)?", "GraphQL": r"graphql", "gRPC": r"grpc", "REST": r"rest(?:ful)?\s*apis?",
+    "Kafka": r"kafka", "RabbitMQ": r"rabbitmq", "PostgreSQL": r"postgres(?:ql)?", "MySQL": r"mysql",
+    "MongoDB": r"mongo(?:db)?", "Redis": r"redis", "Elasticsearch": r"elastic\s*search", "Cassandra": r"cassandra",
+    "DynamoDB": r"dynamodb", "Snowflake": r"snowflake", "Spark": r"spark", "Airflow": r"airflow", "dbt": r"dbt",
+    "Docker": r"docker", "Kubernetes": r"kubernetes|k8s", "Terraform": r"terraform", "Ansible": r"ansible",
+    "AWS": r"aws|amazon web services", "GCP": r"gcp|google cloud", "Azure": r"azure", "Linux": r"linux",
+    "CI/CD": r"ci/cd|continuous (?:integration|delivery)", "Jenkins": r"jenkins", "GitHub Actions": r"github actions",
+    "Prometheus": r"prometheus", "Grafana": r"grafana", "OpenTelemetry": r"opentelemetry",
+    "Microservices": r"micro-?services", "TDD": r"tdd|test-driven", "Machine Learning": r"machine learning|\bml\b",
+    "PyTorch": r"pytorch", "TensorFlow": r"tensorflow", "SQL": r"sql(?!ite)",
+}
+DOMAIN_TERMS = {
+    "payments": r"payments?", "fintech": r"fintech|financial services", "banking": r"bank(?:ing)?",
+    "insurance": r"insurance", "e-commerce": r"e-?commerce|online retail", "retail": r"retail",
+    "healthcare": r"health(?:care|tech)?|medical", "gaming": r"gaming|game studio", "telecom": r"telecom",
+    "logistics": r"logistics|supply chain", "automotive": r"automotive", "energy": r"energy|battery",
+    "media": r"media|video streaming|music streaming", "edtech": r"edtech|education technology|e-?learning", "security": r"security|cyber",
+    "SaaS": r"saas", "consulting": r"consult(?:ing|ancy)", "data platforms": r"data platform|data engineering",
+    "AI/ML": r"machine learning|artificial intelligence|\bai\b",
+}
+SPOKEN_LANGUAGES = ["English", "Swedish", "Norwegian", "Danish", "Finnish", "German", "Dutch", "French", "Spanish",
+                    "Italian", "Portuguese", "Polish", "Russian", "Ukrainian", "Turkish", "Arabic", "Persian", "Farsi",
+                    "Hindi", "Chinese", "Mandarin", "Japanese", "Korean"]
+
+_TECH_RE = {name: re.compile(rf"(?<![\w+#.])(?:{pattern})(?![\w+#])", re.I) for name, pattern in TECH_TERMS.items()}
+_DOMAIN_RE = {name: re.compile(rf"\b(?:{pattern})\b", re.I) for name, pattern in DOMAIN_TERMS.items()}
+_LANGUAGE_RE = re.compile(rf"\b({'|'.join(SPOKEN_LANGUAGES)})\b")
+_YEARS_RE = re.compile(r"(\d{1,2})\+?\s*(?:years|yrs)\b", re.I)
+_RANGE_RE = re.compile(r"\b((?:19|20)\d{2})\s*(?:-|–|—|to)\s*((?:19|20)\d{2}|present|now|current|today)\b", re.I)
+_HEADING_RE = re.compile(r"^\s*(summary|profile|about me|about|professional summary|experience|work experience|"
+                         r"employment|education|skills|technical skills|tech stack|languages|projects|certifications)\s*:?\s*$", re.I)
+_EXPERIENCE_SECTIONS = ("experience", "work experience", "employment")
+_SENIORITY = [
+    ("Principal/Staff", re.compile(r"\b(principal|staff engineer|architect|distinguished)\b", re.I)),
+    ("Lead", re.compile(r"\b(tech lead|team lead|lead engineer|engineering manager|head of|lead developer)\b", re.I)),
+    ("Senior", re.compile(r"\bsenior\b", re.I)),
+]
+
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha256(PROFILE_VERSION.encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _sections(text: str) -> dict[str, list[str]]:
+    """Lines grouped under the CV's headings ('' for anything before the first heading)."""
+    sections, current = {"": []}, ""
+    for line in text.splitlines():
+        m = _HEADING_RE.match(line)
+        if m:
+            current = m.group(1).lower()
+            sections.setdefault(current, [])
+        elif line.strip():
+            sections[current].append(line.strip())
+    return sections
+
+
+def _skills(text: str, sections: dict[str, list[str]]) -> list[str]:
+    """Known technologies ordered by how often the CV mentions them, then the Skills section's own entries."""
+    counts = Counter()
+    first_seen = {}
+    for name, pattern in _TECH_RE.items():
+        hits = pattern.findall(text)
+        if hits:
+            counts[name] = len(hits)
+            first_seen[name] = pattern.search(text).start()
+    skills = sorted(counts, key=lambda n: (-counts[n], first_seen[n]))
+    known = {s.lower() for s in skills}
+    for key in ("skills", "technical skills", "tech stack"):
+        for line in sections.get(key, []):
+            for item in re.split(r",|;|\||•|·", line):
+                item = item.strip(" .-*")
+                if item and len(item) <= 30 and item.lower() not in known:
+                    known.add(item.lower())
+                    skills.append(item)
+    return skills
+
+
+def _years(text: str, sections: dict[str, list[str]]) -> int:
+    """
+    Years of experience: an explicit 'N years', else the span of the date ranges in the experience
+    sections (the whole text only when there are none, so education dates don't count).
+    """
+    stated = max((int(n) for n in _YEARS_RE.findall(text) if int(n) < 50), default=0)
+    if stated:
+        return stated
+    experience = [line for key in _EXPERIENCE_SECTIONS for line in sections.get(key, [])]
+    this_year = time.localtime().tm_year
+    starts, ends = [], []
+    for start, end in _RANGE_RE.findall("\n".join(experience) if experience else text):
+        starts.append(int(start))
+        ends.append(this_year if not end.isdigit() else int(end))
+    return max(ends) - min(starts) if starts else 0
+
+
+def _seniority(text: str, years: int) -> str:
+    head = text[:3000]
+    for label, pattern in _SENIORITY:
+        if pattern.search(head):
+            return label
+    if years >= 5:
+        return "Senior"
+    return "Mid-level" if years >= 2 else "Junior"
+
+
+def _roles(sections: dict[str, list[str]], limit: int = 3) -> list[str]:
+    """Most recent 'YYYY - YYYY  Title, Company' lines, without the dates."""
+    roles = []
+    for line in (line for key in _EXPERIENCE_SECTIONS for line in sections.get(key, [])):
+        m = _RANGE_RE.search(line)
+        if not m:
+            continue
+        role = line[m.end():].strip(" :-|\t")
+        role = re.split(r"\.\s", role, maxsplit=1)[0]
+        if role:
+            roles.append(f"{role} ({m.group(1)}-{m.group(2).lower() if not m.group(2).isdigit() else m.group(2)})")
+        if len(roles) >= limit:
+            break
+    return roles
+
+
+def _summary(sections: dict[str, list[str]]) -> str:
+    for key in ("summary", "professional summary", "profile", "about me", "about"):
+        if sections.get(key):
+            return " ".join(sections[key])
+    # No summary heading: the opening lines after the name/contact header
+    lines = [l for l in sections.get("", []) if len(l) > 60]
+    return " ".join(lines[:4])
+
+
+def build_profile(cv_text: str) -> dict:
+    """Compact structured profile {skills, seniority, years, domains, languages, roles, summary} of a CV's text."""
+    sections = _sections(cv_text)
+    years = _years(cv_text, sections)
+    domain_counts = Counter({name: len(p.findall(cv_text)) for name, p in _DOMAIN_RE.items()})
+    languages = []
+    for lang in _LANGUAGE_RE.findall(cv_text):
+        if lang not in languages:
+            languages.append(lang)
+    return {
+        "skills": _skills(cv_text, sections),
+        "seniority": _seniority(cv_text, years),
+        "years": years,
+        "domains": [name for name, n in domain_counts.most_common() if n],
+        "languages": languages,
+        "roles": _roles(sections),
+        "summary": " ".join(_summary(sections).split()),
+    }
+
+
+def format_profile(profile: dict, max_tokens: int = CV_PROFILE_TOKENS) -> str:
+    """
+    Prompt text for a profile within roughly max_tokens: the structured lines first (skills
+    trimmed to fit), then as much of the summary as the budget leaves.
+    """
+    budget = max_tokens * 4
+    years = f" ({profile['years']}+ years)" if profile.get("years") else ""
+    lines = [f"Seniority: {profile.get('seniority', 'N/A')}{years}"]
+    if profile.get("roles"):
+        lines.append("Recent roles: " + "; ".join(profile["roles"]))
+    if profile.get("domains"):
+        lines.append("Domains: " + ", ".join(profile["domains"][:6]))
+    if profile.get("languages"):
+        lines.append("Languages: " + ", ".join(profile["languages"]))
+    skills_budget = max(120, budget // 3)
+    skills = ""
+    for skill in profile.get("skills", []):
+        candidate = f"{skills}, {skill}" if skills else skill
+        if len(candidate) > skills_budget:
+            break
+        skills = candidate
+    if skills:
+        lines.insert(1, f"Skills: {skills}")
+    text = "\n".join(lines)
+    room = budget - len(text) - len("\nSummary: ")
+    summary = profile.get("summary", "")
+    if summary and room > 80:
+        if len(summary) > room:
+            cut = summary[:room]
+            summary = cut[:cut.rfind(". ") + 1] if ". " in cut else cut.rsplit(" ", 1)[0] + "..."
+        text += f"\nSummary: {summary}"
+    return text
+
+
+def get_cv_profile(path: str, cache_dir: str | None = None) -> dict:
+    """
+    The CV's text and profile, cached in cache_dir per file hash so an unchanged CV is never
+    re-parsed. Returns {"error": message} when the file can't be read.
+    """
+    if not os.path.exists(path):
+        return {"error": f"Error: CV file not found at {path}"}
+    digest = file_hash(path)
+    cache_dir = cache_dir or CV_PROFILE_DIR
+    cache_path = os.path.join(cache_dir, f"{digest}.json")
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    from tools import read_cv
+
+    text = read_cv(path)
+    if text.startswith("Error"):
+        return {"error": text}
+    profile = {"hash": digest, "path": os.path.abspath(path), "text": text, **build_profile(text)}
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = cache_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(profile, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, cache_path)
+    return profile
+
+
+if __name__ == "__main__":
+    import sys
+
+    result = get_cv_profile(sys.argv[1] if len(sys.argv) > 1 else "cv.txt")
+    print(result.get("error") or format_profile(result))
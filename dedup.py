@@ -0,0 +1,183 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import numpy as np
+from urls import normalize_url
+
+_PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+DEDUP_INDEX_FILE = os.path.join(_PROJECT_ROOT, ".cache", "dedup_index.sqlite")
+
+DEDUP_ENABLED = os.getenv("DEDUP", "true").lower() in ("1", "true", "yes")
+# Estimated Jaccard similarity of word shingles above which two postings are the same job. Different
+# roles at one company sharing an "about us" / benefits section measure about 0.45-0.55.
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.6"))
+# Title word overlap (Jaccard) two postings also need, so different roles with boilerplate text stay apart
+DEDUP_TITLE_THRESHOLD = float(os.getenv("DEDUP_TITLE_THRESHOLD", "0.6"))
+
+NUM_PERM = 128
+BANDS = 32  # 32 bands x 4 rows: candidate pairs start showing up around 0.4 similarity
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+_PRIME = (1 << 31) - 1
+
+_rng = np.random.default_rng(1)
+_PERM_A = _rng.integers(1, _PRIME, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _PRIME, size=NUM_PERM, dtype=np.uint64)
+
+
+def _shingles(text: str) -> set[str]:
+    words = re.findall(r"\w+", (text or "").lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text: str) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint64 values) of the text's word shingles."""
+    shingles = _shingles(text)
+    if not shingles:
+        return np.full(NUM_PERM, _PRIME, dtype=np.uint64)
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in shingles),
+        dtype=np.uint64, count=len(shingles),
+    )
+    # (a * x + b) mod p for every permutation x shingle, then the minimum per permutation
+    return ((np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _PRIME).min(axis=1)
+
+
+def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(sig_a == sig_b))
+
+
+def _title_words(title: str) -> set[str]:
+    # Single characters are gender markers and separators: 'Backend Engineer (m/f/d)' == 'Backend Engineer'
+    return {w for w in re.findall(r"\w+", (title or "").lower()) if len(w) > 1}
+
+
+def title_similarity(a: str, b: str) -> float:
+    """Jaccard similarity of two titles' words (0 when either is empty)."""
+    wa, wb = _title_words(a), _title_words(b)
+    return len(wa & wb) / len(wa | wb) if wa and wb else 0.0
+
+
+def posting_text(job: dict) -> str:
+    """Text used for the signature: title and company followed by the scraped description."""
+    return f"{job.get('title', '')} {job.get('company', '')} {job.get('desc', '')}"
+
+
+class DedupIndex:
+    """
+    Persistent LSH index of posting signatures. Every URL maps to a canonical URL:
+    the first posting seen with near-identical content, in this run or an earlier one.
+    """
+
+    def __init__(self, path: str = DEDUP_INDEX_FILE, threshold: float = DEDUP_THRESHOLD,
+                 title_threshold: float = DEDUP_TITLE_THRESHOLD):
+        self.threshold = threshold
+        self.title_threshold = title_threshold
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " url TEXT PRIMARY KEY, raw_url TEXT NOT NULL, canonical TEXT NOT NULL,"
+            " signature BLOB NOT NULL, seen_at REAL NOT NULL)"
+        )
+        if "title" not in {r[1] for r in self._conn.execute("PRAGMA table_info(postings)")}:
+            # Indexes from before titles were compared; their postings never match a titled one
+            self._conn.execute("ALTER TABLE postings ADD COLUMN title TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS postings_canonical ON postings(canonical)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS bands (band TEXT NOT NULL, url TEXT NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS bands_band ON bands(band)")
+        self._conn.commit()
+
+    @staticmethod
+    def _band_keys(sig: np.ndarray) -> list[str]:
+        return [f"{b}:{hashlib.blake2b(sig[b * ROWS:(b + 1) * ROWS].tobytes(), digest_size=8).hexdigest()}"
+                for b in range(BANDS)]
+
+    def assign(self, url: str, text: str, title: str = "") -> str:
+        """
+        Index url's content and return its canonical URL (url itself if it's the first of its kind).
+        A posting only joins another one when both the content and the title are similar enough.
+        """
+        key = normalize_url(url)
+        sig = minhash(text)
+        bands = self._band_keys(sig)
+        with self._lock:
+            row = self._conn.execute("SELECT canonical FROM postings WHERE url = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE postings SET signature = ?, seen_at = ? WHERE url = ?",
+                                   (sig.tobytes(), time.time(), key))
+                self._conn.commit()
+                return row[0]
+            marks = ",".join("?" * len(bands))
+            candidates = self._conn.execute(
+                f"SELECT DISTINCT p.url, p.canonical, p.signature, p.title FROM bands b JOIN postings p ON p.url = b.url"
+                f" WHERE b.band IN ({marks})", bands,
+            ).fetchall()
+            canonical, best = url, self.threshold
+            for _, cand_canonical, cand_sig, cand_title in candidates:
+                if title_similarity(title, cand_title) < self.title_threshold:
+                    continue
+                score = similarity(sig, np.frombuffer(cand_sig, dtype=np.uint64))
+                if score >= best:
+                    canonical, best = cand_canonical, score
+            self._conn.execute(
+                "INSERT INTO postings (url, raw_url, canonical, signature, seen_at, title) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, url, canonical, sig.tobytes(), time.time(), title),
+            )
+            self._conn.executemany("INSERT INTO bands (band, url) VALUES (?, ?)", [(b, key) for b in bands])
+            self._conn.commit()
+        return canonical
+
+    def source_urls(self, canonical: str) -> list[str]:
+        """Every URL (original form) known to carry the posting identified by canonical."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT raw_url FROM postings WHERE canonical = ? ORDER BY seen_at", (canonical,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+
+def collapse_duplicates(jobs: list[dict], index: DedupIndex | None = None) -> tuple[list[dict], list[dict]]:
+    """
+    Collapse scraped jobs that carry the same posting to one canonical job each.
+    Returns (kept, duplicates); every kept job gets 'source_urls' listing all its URLs,
+    including ones seen in earlier runs, and every duplicate gets 'duplicate_of'.
+    """
+    index = index or get_dedup_index()
+    kept, duplicates, by_canonical = [], [], {}
+    for job in jobs:
+        canonical = index.assign(job.get("url", ""), posting_text(job), job.get("title", ""))
+        first = by_canonical.get(canonical)
+        if first is None:
+            by_canonical[canonical] = job
+            kept.append(job)
+        else:
+            job["duplicate_of"] = first.get("url", "")
+            duplicates.append(job)
+    for canonical, job in by_canonical.items():
+        urls = index.source_urls(canonical)
+        for extra in [job.get("url", "")] + [d.get("url", "") for d in duplicates if d["duplicate_of"] == job.get("url")]:
+            if extra and extra not in urls:
+                urls.append(extra)
+        job["source_urls"] = urls
+    return kept, duplicates
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_dedup_index() -> DedupIndex:
+    """Return the process-wide dedup index."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = DedupIndex()
+        return _index
@@ -0,0 +1,237 @@
+import html as html_lib
+import json
+import re
+import lxml.html
+from lxml import etree
+
+# Elements that never hold the job description
+_DROP_TAGS = ["script", "style", "noscript", "template", "svg", "iframe", "button", "input", "textarea",
+              "nav", "header", "footer", "aside", "select", "option"]
+# Unwrapped rather than dropped: ASP.NET WebForms pages wrap the whole body in <form id="aspnetForm">
+_UNWRAP_TAGS = ["form"]
+# class/id words of cookie banners, navigation and "similar jobs" rails, matched against whole
+# class tokens or their '-'/'_' separated parts ('cookie-banner', 'nav_menu'), never inside a word
+_BOILERPLATE = re.compile(
+    r"(?:^|[_-])(?:cookies?|consent|gdpr|banner|navbar|nav|navigation|menu|breadcrumbs?|footer|header|sidebar|"
+    r"related|similar|recommend(?:ed|ations?)?|share|social|signup|sign-in|login|modal|popup|newsletter|subscribe|"
+    r"ads?|adverts?|advertisement)(?:$|[_-])",
+    re.I,
+)
+_BLOCK_TAGS = {"p", "div", "section", "article", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6",
+               "tr", "table", "br", "main", "dd", "dt", "blockquote", "pre"}
+
+# Description containers of common job boards and ATS pages, most specific first
+ATS_CONTAINERS = [
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' description__text ')]",   # LinkedIn
+    "//*[contains(@class, 'jobs-description__content')]",                                # LinkedIn (logged in)
+    "//*[@id='jobDescriptionText']",                                                     # Indeed
+    "//*[contains(@class, 'job__description')]",                                         # Greenhouse (new)
+    "//*[@id='content' and ancestor::*[@id='app_body']]",                                # Greenhouse (classic)
+    "//*[@data-qa='job-description']",                                                   # Lever
+    "//*[@data-automation-id='jobPostingDescription']",                                  # Workday
+    "//*[@data-ui='job-description']",                                                   # Workable
+    "//*[@itemprop='description']",                                                      # SmartRecruiters / schema.org
+    "//*[contains(@class, 'job-description')]",
+]
+
+MIN_DESCRIPTION_CHARS = 200
+
+
+def _clean(text: str) -> str:
+    lines = [" ".join(line.split()) for line in (text or "").splitlines()]
+    out, blank = [], False
+    for line in lines:
+        if line:
+            out.append(line)
+            blank = False
+        elif not blank and out:
+            out.append("")
+            blank = True
+    return "\n".join(out).strip()
+
+
+def _node_text(el) -> str:
+    """Visible text of an element with line breaks between block elements."""
+    for sub in el.iter():
+        if isinstance(sub.tag, str) and sub.tag.lower() in _BLOCK_TAGS:
+            sub.tail = "\n" + (sub.tail or "")
+    return _clean(el.text_content())
+
+
+def _html_fragment_text(fragment: str) -> str:
+    """Text of an HTML snippet (JSON-LD descriptions are HTML-escaped markup)."""
+    if "&lt;" in fragment:
+        fragment = html_lib.unescape(fragment)
+    if "<" not in fragment:
+        return _clean(fragment)
+    try:
+        return _node_text(lxml.html.fragment_fromstring(fragment, create_parent="div"))
+    except (etree.ParserError, ValueError):
+        return _clean(re.sub(r"<[^>]+>", " ", fragment))
+
+
+def _parse(html: str):
+    # lxml refuses str input that carries an XML encoding declaration, so hand it bytes
+    data = html.encode("utf-8", "replace") if isinstance(html, str) else html
+    return lxml.html.fromstring(data, parser=lxml.html.HTMLParser(encoding="utf-8", remove_comments=True))
+
+
+def _iter_json_ld(tree):
+    for script in tree.xpath("//script[@type='application/ld+json']"):
+        try:
+            data = json.loads(script.text or "", strict=False)
+        except ValueError:
+            continue
+        stack = [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(item)
+            elif isinstance(item, dict):
+                yield item
+                if "@graph" in item:
+                    stack.append(item["@graph"])
+
+
+def _name(value) -> str:
+    if isinstance(value, dict):
+        return str(value.get("name") or "")
+    if isinstance(value, list):
+        return ", ".join(filter(None, (_name(v) for v in value)))
+    return str(value or "")
+
+
+def _location(value) -> str:
+    if isinstance(value, list):
+        return "; ".join(filter(None, (_location(v) for v in value)))
+    if isinstance(value, dict):
+        address = value.get("address", value)
+        if isinstance(address, dict):
+            parts = [address.get(k) for k in ("addressLocality", "addressRegion", "addressCountry")]
+            return ", ".join(_name(p) for p in parts if p)
+        return _name(address)
+    return str(value or "")
+
+
+def _from_json_ld(tree) -> dict | None:
+    for item in _iter_json_ld(tree):
+        types = item.get("@type")
+        types = types if isinstance(types, list) else [types]
+        if "JobPosting" not in types:
+            continue
+        location = _location(item.get("jobLocation"))
+        if not location and item.get("jobLocationType") == "TELECOMMUTE":
+            location = "Remote"
+        return {
+            "title": _clean(str(item.get("title") or "")),
+            "company": _clean(_name(item.get("hiringOrganization"))),
+            "location": _clean(location),
+            "description": _html_fragment_text(str(item.get("description") or "")),
+        }
+    return None
+
+
+def _meta(tree, *names: str) -> str:
+    for name in names:
+        values = tree.xpath(f"//meta[@property='{name}' or @name='{name}']/@content")
+        if values and values[0].strip():
+            return values[0].strip()
+    return ""
+
+
+def _is_boilerplate(el) -> bool:
+    if el.get("role", "") in ("navigation", "banner", "contentinfo", "dialog"):
+        return True
+    return any(_BOILERPLATE.search(token) for token in f"{el.get('class', '')} {el.get('id', '')}".split())
+
+
+def _strip_boilerplate(tree, keep: list) -> None:
+    """
+    Drop cookie banners, navigation and rails by class/id/role. The elements in keep (main, article,
+    the description block) and their ancestors are never dropped, so neither a page wrapper such as
+    class="site has-sticky-header" nor a description block class="job-header" takes the posting with it.
+    """
+    protected = {anc for node in keep for anc in node.iterancestors()} | set(keep)
+    for el in tree.xpath("//*[@class or @id or @role]"):
+        if el in protected or el.getparent() is None or el.tag in ("body", "main", "article"):
+            continue
+        if _is_boilerplate(el):
+            el.drop_tree()
+
+
+def _densest_block(tree):
+    """
+    Readability-style pick: every paragraph-like element scores its parent fully and its
+    grandparent by half (text length minus link text); the best-scoring block wins.
+    """
+    scores = {}
+    for el in tree.xpath("//p | //li | //pre | //td | //div[not(div or p or section or article or ul or ol)]"):
+        text = el.text_content()
+        length = len(text.strip())
+        if length < 25:
+            continue
+        link_len = sum(len(a.text_content()) for a in el.xpath(".//a"))
+        score = 1 + min(length, 1000) / 100 + text.count(",") - 3 * link_len / max(length, 1)
+        parent = el.getparent()
+        if parent is None:
+            continue
+        scores[parent] = scores.get(parent, 0) + score
+        grand = parent.getparent()
+        if grand is not None:
+            scores[grand] = scores.get(grand, 0) + score / 2
+    if not scores:
+        return None
+    return max(scores, key=scores.get)
+
+
+def extract_job(html: str) -> dict:
+    """
+    Pull a compact job record {title, company, location, description} out of a page:
+    JSON-LD JobPosting data first, then known board/ATS description containers, then
+    the densest text block after stripping navigation, cookie banners and "similar jobs".
+    """
+    try:
+        tree = _parse(html)
+    except (etree.ParserError, ValueError):
+        return {"title": "", "company": "", "location": "", "description": ""}
+
+    record = _from_json_ld(tree)
+    if record and len(record["description"]) >= MIN_DESCRIPTION_CHARS:
+        return record
+    record = record or {"title": "", "company": "", "location": "", "description": ""}
+    if not record["title"]:
+        h1 = tree.xpath("//h1")
+        record["title"] = _clean(h1[0].text_content()) if h1 else _meta(tree, "og:title") or _clean(tree.findtext(".//title") or "")
+    if not record["company"]:
+        record["company"] = _meta(tree, "og:site_name")
+
+    etree.strip_elements(tree, *_DROP_TAGS, with_tail=False)
+    etree.strip_tags(tree, *_UNWRAP_TAGS)
+    keep = tree.xpath("//main | //article") + [n for xpath in ATS_CONTAINERS for n in tree.xpath(xpath)[:1]]
+    block = _densest_block(tree)
+    if block is not None:
+        keep.append(block)
+    _strip_boilerplate(tree, keep)
+    for xpath in ATS_CONTAINERS:
+        nodes = tree.xpath(xpath)
+        if nodes:
+            text = _node_text(nodes[0])
+            if len(text) >= MIN_DESCRIPTION_CHARS:
+                record["description"] = text
+                return record
+
+    block = _densest_block(tree)
+    body = tree.find("body")
+    node = block if block is not None else (body if body is not None else tree)
+    record["description"] = _node_text(node)
+    return record
+
+
+def format_job_record(record: dict, max_chars: int = 5000) -> str:
+    """Compact text form used in prompts and the scrape cache."""
+    header = [f"{label}: {record[key]}" for key, label in
+              (("title", "Title"), ("company", "Company"), ("location", "Location")) if record.get(key)]
+    text = "\n".join(header)
+    if record.get("description"):
+        text = f"{text}\n\n{record['description']}" if text else record["description"]
+    return text[:max_chars]
@@ -0,0 +1,283 @@
+import json
+import os
+import re
+import threading
+from urllib.parse import urlsplit
+import lxml.html
+import requests
+from requests.adapters import HTTPAdapter
+from browser_pool import USER_AGENT, get_browser_pool
+from extract import ATS_CONTAINERS
+from tracing import span
+
+_PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+DOMAIN_TIERS_FILE = os.path.join(_PROJECT_ROOT, ".cache", "domain_tiers.json")
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+# Fewer visible characters than this in static HTML means the page needs a browser
+MIN_STATIC_TEXT = int(os.getenv("MIN_STATIC_TEXT", "600"))
+BROWSER_TIMEOUT = float(os.getenv("BROWSER_TIMEOUT", "30"))
+
+# Containers that hold the description on common boards / ATS pages; the browser stops waiting once one exists
+JOB_CONTENT_SELECTOR = ", ".join([
+    "script[type='application/ld+json']",
+    ".jobs-description", ".description__text",              # LinkedIn
+    "#jobDescriptionText",                                   # Indeed
+    "#content .job__description", "#app_body",               # Greenhouse
+    ".posting-page", ".section-wrapper.page-full-width",     # Lever
+    "[data-automation-id='jobPostingDescription']",          # Workday
+    "[data-ui='job-description']",                           # Workable
+])
+
+_JS_SHELL_MARKERS = re.compile(
+    r"enable javascript|javascript is (?:disabled|required)|you need to enable javascript|"
+    r"<div id=\"(?:root|app|__next)\"></div>|please turn on javascript",
+    re.I,
+)
+# Interstitials served instead of the page: bot checks, captchas, rate-limit and login walls. Only the
+# <title> and the interstitial's own markup count; body text of a real posting can mention any of these.
+_BLOCK_TITLE = re.compile(
+    r"<title[^>]*>\s*(?:just a moment|attention required|access denied|security check|are you a robot|"
+    r"robot check|captcha|too many requests|request blocked|pardon our interruption|verify you are human)\b",
+    re.I,
+)
+_BLOCK_MARKUP = re.compile(
+    r"""(?:id|class)\s*=\s*["'][^"']*\b(?:g-recaptcha|h-captcha|px-captcha|cf-chl-[\w-]*|challenge-(?:platform|form|running)|"""
+    r"""authwall)\b|/cdn-cgi/challenge-platform/|\bchallenges\.cloudflare\.com\b|\bcaptcha-delivery\.com\b|\bhcaptcha\.com\b""",
+    re.I,
+)
+_JOB_POSTING_LD = re.compile(r"""<script[^>]+application/ld\+json[^>]*>[^<]*["']@type["']\s*:\s*["']JobPosting["']""", re.I)
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_.:-]+)""", re.I)
+_SCRIPT_STYLE = re.compile(r"<(script|style|noscript)\b[^>]*>.*?</\1>", re.I | re.S)
+_TAGS = re.compile(r"<[^>]+>")
+
+TIER_HTTP = "http"
+TIER_BROWSER = "browser"
+
+
+def response_text(resp: requests.Response) -> str:
+    """
+    Body of resp as text. Without a charset in Content-Type, requests falls back to ISO-8859-1 for
+    text/* ('Göteborg' -> 'GÃ¶teborg'); use the page's <meta charset>, then UTF-8, then a guess.
+    """
+    if "charset=" in resp.headers.get("Content-Type", "").lower():
+        return resp.text
+    content = resp.content
+    m = _META_CHARSET.search(content[:4096])
+    for encoding in ([m.group(1).decode("ascii")] if m else []) + ["utf-8"]:
+        try:
+            return content.decode(encoding)
+        except (LookupError, UnicodeDecodeError):
+            continue
+    resp.encoding = resp.apparent_encoding
+    return resp.text
+
+
+def _visible_text_length(html: str) -> int:
+    text = _TAGS.sub(" ", _SCRIPT_STYLE.sub(" ", html))
+    return len(" ".join(text.split()))
+
+
+def looks_like_js_shell(html: str) -> bool:
+    """True when static HTML has no real content yet (client-rendered app, 'enable JavaScript' page)."""
+    if "JobPosting" in html and "application/ld+json" in html:
+        # The structured posting is already in the static HTML; extract.py reads it from there
+        return False
+    length = _visible_text_length(html)
+    if length < MIN_STATIC_TEXT:
+        return True
+    # A "please enable JavaScript" notice next to a little nav/footer text is still a shell
+    return length < 3 * MIN_STATIC_TEXT and bool(_JS_SHELL_MARKERS.search(html[:20000]))
+
+
+class BlockedError(Exception):
+    """The site answered with a captcha, bot check or rate limit instead of the page."""
+
+    def __init__(self, url: str, reason: str, retry_after: float | None = None):
+        super().__init__(f"{reason} ({url})")
+        self.url = url
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def _has_job_content(html: str) -> bool:
+    """True when html holds a JSON-LD JobPosting or one of the ATS description containers extract.py reads."""
+    if _JOB_POSTING_LD.search(html):
+        return True
+    try:
+        tree = lxml.html.fromstring(html)
+    except (ValueError, lxml.etree.ParserError):
+        return False
+    return any(tree.xpath(xpath) for xpath in ATS_CONTAINERS)
+
+
+def detect_block(html: str) -> str | None:
+    """
+    Why html is a block page rather than content, or None. Needs an interstitial <title> or captcha /
+    bot-check / login-wall markup on a page without a job posting (JSON-LD or an ATS description
+    container): a real posting can embed a reCAPTCHA in its application form. Pages only get here
+    after an HTTP 200 or a browser load; other statuses are handled by TieredFetcher.
+    """
+    m = _BLOCK_TITLE.search(html[:5000])
+    if m:
+        reason = " ".join(m.group(0).split(">", 1)[1].split())
+    else:
+        m = _BLOCK_MARKUP.search(html[:50000])
+        if not m:
+            return None
+        reason = m.group(0).split("=", 1)[-1].strip("\"' /").lower()
+    if _has_job_content(html):
+        return None
+    return f"block page: {reason}"
+
+
+def _retry_after(resp: requests.Response) -> float | None:
+    value = resp.headers.get("Retry-After", "")
+    return float(value) if value.strip().isdigit() else None
+
+
+class DomainTiers:
+    """
+    Remembers per domain how often plain HTTP was enough and how often it fell back to
+    the browser, persisted as JSON. A domain goes straight to the browser once fallbacks
+    clearly dominate.
+    """
+
+    def __init__(self, path: str = DOMAIN_TIERS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._stats = json.load(f)
+            except Exception:
+                self._stats = {}
+
+    def preferred(self, domain: str) -> str:
+        with self._lock:
+            stats = self._stats.get(domain)
+        if stats and stats.get("fallbacks", 0) >= 2 and stats.get("fallbacks", 0) > stats.get("http_ok", 0):
+            return TIER_BROWSER
+        return TIER_HTTP
+
+    def record(self, domain: str, tier: str, fell_back: bool = False):
+        with self._lock:
+            stats = self._stats.setdefault(domain, {"http_ok": 0, "fallbacks": 0, "browser": 0, "tier": tier})
+            if tier == TIER_HTTP:
+                stats["http_ok"] += 1
+            else:
+                stats["browser"] += 1
+                if fell_back:
+                    stats["fallbacks"] += 1
+            stats["tier"] = tier
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._stats, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+
+
+class TieredFetcher:
+    """
+    Fetch a page's HTML as cheaply as possible: a pooled keep-alive HTTP session first,
+    the shared headless browser when the static HTML is empty, blocked or a JS shell.
+    """
+
+    def __init__(self, tiers: DomainTiers | None = None):
+        self.tiers = tiers or DomainTiers()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Encoding": "gzip, deflate",
+            "Accept-Language": "en-US,en;q=0.9",
+        })
+
+    def _fetch_http(self, url: str, headers: dict | None = None) -> tuple[str | None, requests.Response | None]:
+        """(static HTML or None when it's unusable and the browser should try, the response or None on network errors)."""
+        with span("fetch.http", url=url, conditional=bool(headers)) as s:
+            try:
+                resp = self.session.get(url, headers=headers, timeout=HTTP_TIMEOUT, allow_redirects=True)
+            except requests.RequestException as e:
+                s.set(error=type(e).__name__)
+                return None, None
+            content_type = resp.headers.get("Content-Type", "")
+            s.set(status=resp.status_code, bytes=len(resp.content))
+            if resp.status_code != 200 or ("html" not in content_type and "xml" not in content_type):
+                return None, resp
+            html = response_text(resp)
+            shell = looks_like_js_shell(html)
+            s.set(js_shell=shell)
+            return (None if shell else html), resp
+
+    def _fetch_browser(self, url: str, domain: str, fell_back: bool) -> str:
+        with span("fetch.browser", url=url, fell_back=fell_back) as s:
+            html = get_browser_pool().fetch_html(url, timeout_ms=int(BROWSER_TIMEOUT * 1000), wait_ms=5000, wait_selector=JOB_CONTENT_SELECTOR)
+            s.set(bytes=len(html))
+        self.tiers.record(domain, TIER_BROWSER, fell_back=fell_back)
+        return html
+
+    def fetch_html(self, url: str) -> tuple[str, str]:
+        """
+        Return (html, tier) where tier is 'http' or 'browser'. Raises if the browser fails too,
+        and BlockedError when the site rate limits the request.
+        """
+        domain = (urlsplit(url).hostname or "").lower()
+        if self.tiers.preferred(domain) == TIER_HTTP:
+            html, resp = self._fetch_http(url)
+            if resp is not None and resp.status_code == 429:
+                # Rate limited: the browser would only be refused too
+                raise BlockedError(url, "HTTP 429", _retry_after(resp))
+            if html is not None:
+                self.tiers.record(domain, TIER_HTTP)
+                return html, TIER_HTTP
+            return self._fetch_browser(url, domain, fell_back=True), TIER_BROWSER
+        return self._fetch_browser(url, domain, fell_back=False), TIER_BROWSER
+
+    def fetch_conditional(self, url: str, etag: str | None = None,
+                          last_modified: str | None = None) -> tuple[str | None, str, dict]:
+        """
+        Re-fetch a known page with If-None-Match / If-Modified-Since. Returns (None, 'http', validators)
+        when the server answers 304 Not Modified, otherwise (html, tier, validators) like fetch_html.
+        validators holds the ETag / Last-Modified to send next time (empty after a browser fetch).
+        Raises requests.HTTPError on 404 / 410 so callers can tell a removed posting from a failed fetch.
+        """
+        domain = (urlsplit(url).hostname or "").lower()
+        if self.tiers.preferred(domain) == TIER_BROWSER:
+            return self._fetch_browser(url, domain, fell_back=False), TIER_BROWSER, {}
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        html, resp = self._fetch_http(url, headers or None)
+        if resp is not None and resp.status_code == 304:
+            self.tiers.record(domain, TIER_HTTP)
+            return None, TIER_HTTP, {"etag": resp.headers.get("ETag") or etag,
+                                     "last_modified": resp.headers.get("Last-Modified") or last_modified}
+        if resp is not None and resp.status_code in (404, 410):
+            resp.raise_for_status()
+        if resp is not None and resp.status_code == 429:
+            raise BlockedError(url, "HTTP 429", _retry_after(resp))
+        if html is not None:
+            self.tiers.record(domain, TIER_HTTP)
+            return html, TIER_HTTP, {"etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")}
+        return self._fetch_browser(url, domain, fell_back=True), TIER_BROWSER, {}
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher() -> TieredFetcher:
+    """Return the process-wide tiered fetcher."""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = TieredFetcher()
+        return _fetcher
@@ -0,0 +1,112 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+_PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+LLM_CACHE_FILE = os.path.join(_PROJECT_ROOT, ".cache", "llm_cache.sqlite")
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "true").lower() in ("1", "true", "yes")
+
+
+def model_id(llm) -> str:
+    """
+    Stable identifier of an LLM from agents.get_llm(): provider and model, e.g. 'ollama/llama3.2'.
+    The endpoint is left out so every machine of an LLM pool serving the model shares its entries.
+    """
+    model = getattr(llm, "model", None) or str(llm)
+    provider = getattr(llm, "provider", None)
+    if provider and not model.startswith(f"{provider}/"):
+        return f"{provider}/{model}"
+    return model
+
+
+def cache_key(kind: str, model: str, prompt_version: str, task_description: str, cv_content: str) -> str:
+    h = hashlib.sha256()
+    for part in (kind, model, prompt_version, task_description, cv_content):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class LLMCache:
+    """
+    Persistent cache of analyst / expert outputs. Rows remember the model and prompt
+    version they were produced with so they can be invalidated selectively.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_FILE):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, kind TEXT NOT NULL, model TEXT NOT NULL,"
+            " prompt_version TEXT NOT NULL, created_at REAL NOT NULL, output TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT output FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, kind: str, model: str, prompt_version: str, output: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, kind, model, prompt_version, created_at, output)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, model, prompt_version, time.time(), output),
+            )
+            self._conn.commit()
+
+    def invalidate(self, model: str | None = None, prompt_version: str | None = None, kind: str | None = None) -> int:
+        """Delete entries matching every given filter (all entries if none given). Returns rows deleted."""
+        clauses, params = [], []
+        for column, value in (("model", model), ("prompt_version", prompt_version), ("kind", kind)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            deleted = self._conn.execute(f"DELETE FROM responses{where}", params).rowcount
+            self._conn.commit()
+        return deleted
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = (100 * self.hits / total) if total else 0
+        return f"{self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)"
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache | None:
+    """Return the process-wide LLM cache, or None when LLM_CACHE is disabled."""
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Invalidate cached analyst / cover-letter responses.")
+    parser.add_argument("--model", help="Only entries produced by this model id (provider/model, e.g. ollama/llama3.2)")
+    parser.add_argument("--prompt-version", help="Only entries produced with this prompt version")
+    parser.add_argument("--kind", choices=["analysis", "cover_letter"], help="Only this kind of entry")
+    args = parser.parse_args()
+    removed = LLMCache().invalidate(model=args.model, prompt_version=args.prompt_version, kind=args.kind)
+    print(f"--- LLM cache: removed {removed} entries ---")
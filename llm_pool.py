@@ -0,0 +1,183 @@
+"""
+Pool of Ollama endpoints shared by all agents.
+
+    LLM_ENDPOINTS=http://gpu1:11434*4,http://gpu2:11434*2,http://localhost:11434
+
+Each entry is a base URL with an optional '*N' limit of concurrent requests (default
+LLM_ENDPOINT_CONCURRENCY). Every kickoff leases the least loaded healthy endpoint that has the
+task's model pulled (see agents.model_for), waiting while all of them are at their limit. An
+endpoint that stops answering is marked down, the kickoff moves to another one, and the endpoint
+is probed again (GET /api/tags) after LLM_HEALTH_INTERVAL seconds.
+"""
+import os
+import threading
+import time
+from typing import Callable, TypeVar
+from tracing import span
+
+LLM_ENDPOINT_CONCURRENCY = int(os.getenv("LLM_ENDPOINT_CONCURRENCY", "2"))
+LLM_HEALTH_INTERVAL = float(os.getenv("LLM_HEALTH_INTERVAL", "30"))
+LLM_HEALTH_TIMEOUT = float(os.getenv("LLM_HEALTH_TIMEOUT", "3"))
+
+T = TypeVar("T")
+
+
+class NoEndpointError(RuntimeError):
+    """No healthy endpoint of the pool serves the requested model."""
+
+
+def parse_endpoints(spec: str) -> list[tuple[str, int]]:
+    """[(base_url, max_concurrent)] from an LLM_ENDPOINTS value."""
+    endpoints = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        url, _, limit = entry.partition("*")
+        endpoints.append((url.strip().rstrip("/"), max(1, int(limit)) if limit.strip() else LLM_ENDPOINT_CONCURRENCY))
+    return endpoints
+
+
+def pool_capacity() -> int:
+    """Concurrent requests the configured pool accepts in total (0 without LLM_ENDPOINTS)."""
+    return sum(limit for _, limit in parse_endpoints(os.getenv("LLM_ENDPOINTS", "")))
+
+
+class Endpoint:
+    def __init__(self, base_url: str, limit: int):
+        self.base_url = base_url
+        self.limit = limit
+        self.in_flight = 0
+        self.healthy = True
+        self.models: set[str] | None = None  # None until the first health check
+        self.checked_at = 0.0
+        self.served = 0
+        self.failures = 0
+
+    def serves(self, model: str) -> bool:
+        if self.models is None:
+            return True
+        return model in self.models or f"{model}:latest" in self.models
+
+    def load(self) -> float:
+        return self.in_flight / self.limit
+
+
+class LLMPool:
+    """Least-loaded dispatch over Ollama endpoints with per-endpoint concurrency limits and failover."""
+
+    def __init__(self, endpoints: list[tuple[str, int]], health_interval: float = LLM_HEALTH_INTERVAL):
+        if not endpoints:
+            raise ValueError("LLM pool needs at least one endpoint")
+        self.endpoints = [Endpoint(url, limit) for url, limit in endpoints]
+        self.health_interval = health_interval
+        self._cond = threading.Condition()
+
+    @property
+    def primary(self) -> str:
+        return self.endpoints[0].base_url
+
+    def check(self, endpoint: Endpoint) -> bool:
+        """Probe endpoint's /api/tags, updating its health and pulled models. Returns whether it answered."""
+        import requests
+
+        try:
+            resp = requests.get(f"{endpoint.base_url}/api/tags", timeout=LLM_HEALTH_TIMEOUT)
+            resp.raise_for_status()
+            models = {m.get("name", "") for m in resp.json().get("models", [])}
+            healthy = True
+        except (requests.RequestException, ValueError):
+            models, healthy = endpoint.models, False
+        with self._cond:
+            if healthy and not endpoint.healthy:
+                print(f"--- LLM POOL: {endpoint.base_url} is back ---")
+            endpoint.healthy, endpoint.checked_at = healthy, time.time()
+            endpoint.models = models or None
+            self._cond.notify_all()
+        return healthy
+
+    def _refresh(self):
+        """Probe endpoints never checked, and down ones whose retry interval has passed."""
+        now = time.time()
+        with self._cond:
+            stale = [e for e in self.endpoints
+                     if e.checked_at == 0 or (not e.healthy and now - e.checked_at >= self.health_interval)]
+        for endpoint in stale:
+            self.check(endpoint)
+
+    def acquire(self, model: str, exclude: set[str] = frozenset()) -> Endpoint:
+        """
+        Reserve a slot on the least loaded healthy endpoint serving model, waiting while they are all busy.
+        Raises NoEndpointError when none is healthy or has the model.
+        """
+        with span("llm.acquire", model=model) as s:
+            start = time.perf_counter()
+            while True:
+                self._refresh()
+                with self._cond:
+                    candidates = [e for e in self.endpoints
+                                  if e.healthy and e.serves(model) and e.base_url not in exclude]
+                    if not candidates:
+                        raise NoEndpointError(f"No healthy LLM endpoint serves {model} "
+                                              f"({', '.join(e.base_url for e in self.endpoints)})")
+                    free = [e for e in candidates if e.in_flight < e.limit]
+                    if free:
+                        endpoint = min(free, key=lambda e: (e.load(), e.in_flight))
+                        endpoint.in_flight += 1
+                        s.set(endpoint=endpoint.base_url, wait_ms=round((time.perf_counter() - start) * 1000, 1))
+                        return endpoint
+                    # Wake up on a release, or re-probe down endpoints after a while
+                    self._cond.wait(timeout=self.health_interval)
+
+    def release(self, endpoint: Endpoint, failed: bool = False):
+        with self._cond:
+            endpoint.in_flight -= 1
+            if failed:
+                endpoint.failures += 1
+                endpoint.healthy = False
+                endpoint.checked_at = time.time()
+            else:
+                endpoint.served += 1
+            self._cond.notify_all()
+
+    def run(self, model: str, build_llm: Callable[[str], object], call: Callable[[object], T]) -> T:
+        """
+        call(llm) with an LLM for model on a leased endpoint (build_llm(base_url) makes it).
+        When the call fails and the endpoint no longer answers, it is marked down and the call
+        moves to the next endpoint; errors of a healthy endpoint are re-raised.
+        """
+        tried = set()
+        while True:
+            endpoint = self.acquire(model, exclude=tried)
+            try:
+                result = call(build_llm(endpoint.base_url))
+            except Exception as e:
+                if self.check(endpoint):
+                    self.release(endpoint)
+                    raise
+                self.release(endpoint, failed=True)
+                tried.add(endpoint.base_url)
+                print(f"--- LLM POOL: {endpoint.base_url} failed ({type(e).__name__}), retrying on another endpoint ---")
+                continue
+            self.release(endpoint)
+            return result
+
+    def stats(self) -> str:
+        with self._cond:
+            return ", ".join(f"{e.base_url}: {e.served} served, {e.failures} failed{'' if e.healthy else ' (down)'}"
+                             for e in self.endpoints)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_llm_pool() -> LLMPool | None:
+    """Return the process-wide pool, or None when LLM_ENDPOINTS is not set."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            endpoints = parse_endpoints(os.getenv("LLM_ENDPOINTS", ""))
+            if endpoints:
+                _pool = LLMPool(endpoints)
+        return _pool
@@ -1,11 +1,28 @@
+import argparse
 import os
 import re
 import sys
-import pandas as pd
-from crewai import Crew
-from tools import JobSearchTool, WebScraperTool, read_cv, run_job_search_loop, scrape_url
-from agents import create_match_analyst, create_application_expert, create_job_researcher
-from tasks import create_analyze_one_job_task, create_cover_letter_one_job_task, create_search_jobs_task
+import threading
+from typing import Iterable, Iterator
+from tools import BLOCKED_PREFIX, build_search_queries, iter_job_search, scrape_url
+from agents import create_match_analyst, create_application_expert, create_job_researcher, run_agent
+from tasks import (
+    create_analyze_jobs_batch_task,
+    create_analyze_one_job_task,
+    create_cover_letter_one_job_task,
+    create_search_jobs_task,
+    PROMPT_VERSION,
+)
+from llm_cache import cache_key, get_llm_cache, model_id
+from llm_pool import get_llm_pool, pool_capacity
+from pipeline import Stage, run_pipeline
+from politeness import interleave_by_site
+from checkpoint import CHECKPOINT_FILE, Checkpoint, export_xlsx
+from corpus import get_corpus
+from careers import discover_jobs
+from cv_profile import format_profile, get_cv_profile
+from tracing import TRACE_SUMMARY, enable_tracing, get_tracer, span
+from urls import normalize_url
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -18,7 +35,35 @@ if getattr(sys.stdout, "encoding", "").lower() in ("cp1252", "cp850", "ascii", "
 
 # Minimum jobs to search for (loop until we have at least this many)
 MIN_JOBS = int(os.getenv("MAX_JOBS", "10"))
+# Ask the LLM researcher agent for more jobs when careers.py discovers fewer than MIN_JOBS
+RESEARCHER_FALLBACK = os.getenv("RESEARCHER_FALLBACK", "true").lower() in ("1", "true", "yes")
+# Stream web search results into the scrape stage when careers.py discovers fewer than MIN_JOBS
+SEARCH_FALLBACK = os.getenv("SEARCH_FALLBACK", "true").lower() in ("1", "true", "yes")
 SCORE_THRESHOLD = 70
+OUTPUT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "job_applications.xlsx")
+# Per-stage worker counts for the scrape -> analyze -> cover letter pipeline
+SCRAPE_WORKERS = int(os.getenv("SCRAPE_WORKERS", os.getenv("BROWSER_MAX_PAGES", "4")))
+# With an LLM endpoint pool the LLM stages default to one worker per request slot it offers
+ANALYZE_WORKERS = int(os.getenv("ANALYZE_WORKERS", str(max(2, pool_capacity()))))
+COVER_WORKERS = int(os.getenv("COVER_WORKERS", str(max(1, pool_capacity()))))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+# Jobs scored per analyst call (CV sent once per batch); 1 = one call per job
+ANALYZE_BATCH_SIZE = int(os.getenv("ANALYZE_BATCH_SIZE", "4"))
+
+# CrewAI agents keep per-run executor state, so each pipeline worker thread gets its own
+_agents = threading.local()
+
+
+def _get_analyst():
+    if not hasattr(_agents, "analyst"):
+        _agents.analyst = create_match_analyst([])
+    return _agents.analyst
+
+
+def _get_expert():
+    if not hasattr(_agents, "expert"):
+        _agents.expert = create_application_expert()
+    return _agents.expert
 
 
 def _parse_analysis_output(raw: str) -> tuple[int, str, str]:
@@ -40,6 +85,22 @@ def _parse_analysis_output(raw: str) -> tuple[int, str, str]:
     return score, category, tech_stack
 
 
+def _parse_batch_analysis_output(raw: str, count: int) -> list[tuple[int, str, str] | None]:
+    """
+    Parse 'Job n: Score: N | Category: X | Tech Stack: Y' lines from a batch analysis.
+    Returns one (score, category, tech_stack) per job, or None where the job's line is missing or malformed.
+    """
+    parsed: list[tuple[int, str, str] | None] = [None] * count
+    for line in (raw or "").splitlines():
+        m = re.match(r"\W*Job\s*#?\s*(\d+)\W*\s*(.*)$", line.strip(), re.I)
+        if not m or not re.search(r"Score:\s*\d+", m.group(2), re.I):
+            continue
+        n = int(m.group(1))
+        if 1 <= n <= count and parsed[n - 1] is None:
+            parsed[n - 1] = _parse_analysis_output(m.group(2))
+    return parsed
+
+
 def _parse_search_output(raw: str) -> list[dict]:
     """Parse list of jobs from researcher output. Expects lines with Title, Company, URL."""
     jobs = []
@@ -79,20 +140,306 @@ def _parse_search_output(raw: str) -> list[dict]:
     return jobs
 
 
-def main():
-    print("--- Starting Job Search Automation Agent (loop mode) ---")
+def _job_row(job: dict, summary: str, category: str = "N/A", tech_stack: str = "N/A", cover_letter: str = "N/A") -> dict:
+    return {
+        "Job Title": job.get("title", "N/A"),
+        "Company": job.get("company", "N/A"),
+        "URL": job.get("url", ""),
+        "Source URLs": "\n".join(job.get("source_urls") or [job.get("url", "")]),
+        "Summary": summary,
+        "Category": category,
+        "Tech Stack": tech_stack,
+        "Cover Letter": cover_letter,
+        "Prefilter Score": job.get("prefilter_score", "N/A"),
+    }
 
-    # 1. Load CV and Conditions
+
+def _scrape_stage(job: dict) -> dict:
+    if "desc" in job:
+        # Already scraped (batch mode shares one scrape pass between profiles)
+        desc = job["desc"]
+    else:
+        title = job.get("title", "N/A")
+        safe_title = title.encode("ascii", "replace").decode() if isinstance(title, str) else str(title)
+        print(f"--- Job {job['index'] + 1}{'/' + str(job['total']) if job['total'] else ''}: {safe_title} ---")
+        desc = scrape_url(job.get("url", ""))
+    if desc.startswith(BLOCKED_PREFIX):
+        # A captcha or rate limit says nothing about the job: keep it out of analysis and retry it later
+        print(f"  Skip (blocked): {desc[len(BLOCKED_PREFIX) + 2:][:80]}")
+        job["row"] = _job_row(job, "Blocked by site (retried on the next --resume)")
+        job["blocked"] = True
+    elif desc.startswith("Error"):
+        print(f"  Skip (scrape failed): {desc[:80]}")
+        job["row"] = _job_row(job, "Scrape failed")
+        job["failed"] = True
+    job["desc"] = desc
+    return job
+
+
+def _record_usage(s, out):
+    """Copy a crew's token usage onto its span."""
+    usage = getattr(out, "token_usage", None)
+    if usage is not None:
+        s.set(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens,
+              cached_prompt_tokens=usage.cached_prompt_tokens, requests=usage.successful_requests)
+
+
+def _kickoff(agent, task, kind: str) -> str:
+    from crewai import Crew
+
+    with span("kickoff", agent=agent.role, prompt_chars=len(task.description)) as s:
+        out = run_agent(agent, kind, lambda: Crew(agents=[agent], tasks=[task], verbose=False).kickoff())
+        _record_usage(s, out)
+    return out.raw if hasattr(out, "raw") else str(out)
+
+
+def _cached_kickoff(kind: str, agent, task, cv_profile: str) -> str:
+    """Run a one-task crew, reusing a cached output for the same model, prompt version, task and CV profile."""
+    cache = get_llm_cache()
+    if cache is None:
+        return _kickoff(agent, task, kind)
+    model = model_id(agent.llm)
+    key = cache_key(kind, model, PROMPT_VERSION, task.description, cv_profile)
+    with span("llm_cache", kind=kind) as s:
+        cached = cache.get(key)
+        s.set(cache="miss" if cached is None else "hit")
+    if cached is not None:
+        return cached
+    raw = _kickoff(agent, task, kind)
+    cache.put(key, kind, model, PROMPT_VERSION, raw)
+    return raw
+
+
+def _analyze_one(job: dict, key: str | None = None) -> dict:
+    """Score one job with its own analyst call and store the reply under key in the LLM cache."""
+    analyst = _get_analyst()
+    analyze_task = create_analyze_one_job_task(
+        analyst, job.get("title", "N/A"), job.get("company", "N/A"), job.get("url", ""), job["desc"], job["cv_profile"]
+    )
+    raw_analysis = _kickoff(analyst, analyze_task, "analysis")
+    job["score"], job["category"], job["tech_stack"] = _parse_analysis_output(raw_analysis)
+    cache = get_llm_cache()
+    if key is not None and cache is not None:
+        cache.put(key, "analysis", model_id(analyst.llm), PROMPT_VERSION, raw_analysis)
+    return job
+
+
+def _analyze_stage(jobs: list[dict]) -> list[dict]:
+    """
+    Score a batch of scraped jobs in one analyst call; jobs missing from the reply are retried one by one.
+    The LLM cache is keyed per job (by its single-job task), so cached jobs never enter the batch prompt.
+    """
+    analyst = _get_analyst()
+    cache = get_llm_cache()
+    model = model_id(analyst.llm)
+    todo, keys = [], []
+    for job in jobs:
+        if "row" in job:
+            continue
+        key = None
+        if cache is not None:
+            single_task = create_analyze_one_job_task(
+                analyst, job.get("title", "N/A"), job.get("company", "N/A"), job.get("url", ""), job["desc"], job["cv_profile"]
+            )
+            key = cache_key("analysis", model, PROMPT_VERSION, single_task.description, job["cv_profile"])
+            with span("llm_cache", kind="analysis") as s:
+                cached = cache.get(key)
+                s.set(cache="miss" if cached is None else "hit")
+            if cached is not None:
+                job["score"], job["category"], job["tech_stack"] = _parse_analysis_output(cached)
+                continue
+        todo.append(job)
+        keys.append(key)
+    if len(todo) == 1:
+        _analyze_one(todo[0], keys[0])
+    elif todo:
+        batch_task = create_analyze_jobs_batch_task(analyst, todo, todo[0]["cv_profile"])
+        parsed = _parse_batch_analysis_output(_kickoff(analyst, batch_task, "analysis"), len(todo))
+        missing = sum(1 for p in parsed if p is None)
+        if missing:
+            print(f"  Batch analysis malformed for {missing}/{len(todo)} jobs, falling back to single-job scoring")
+        for job, key, result in zip(todo, keys, parsed):
+            if result is None:
+                _analyze_one(job, key)
+                continue
+            job["score"], job["category"], job["tech_stack"] = result
+            if key is not None:
+                score, category, tech_stack = result
+                cache.put(key, "analysis", model, PROMPT_VERSION, f"Score: {score} | Category: {category} | Tech Stack: {tech_stack}")
+    return jobs
+
+
+def _cover_stage(job: dict) -> dict:
+    if "row" in job:
+        return job
+    score, category, tech_stack = job["score"], job["category"], job["tech_stack"]
+    summary = f"Score: {score}. {category}. Tech: {tech_stack}"
+    cover_letter = "N/A"
+    if score >= SCORE_THRESHOLD:
+        expert = _get_expert()
+        cover_task = create_cover_letter_one_job_task(
+            expert, job.get("title", "N/A"), job.get("company", "N/A"), job["desc"], job["cv_profile"]
+        )
+        cover_letter = _cached_kickoff("cover_letter", expert, cover_task, job["cv_profile"])
+        cover_letter = (cover_letter or "").strip()[:8000]
+    job["row"] = _job_row(job, summary, category, tech_stack, cover_letter)
+    return job
+
+
+def _process_jobs(jobs: Iterable[dict], cv: dict, conditions: dict, checkpoint: Checkpoint | None = None,
+                  skip: set[int] = frozenset(), pages: dict[str, str] | None = None) -> list[dict]:
+    """
+    Scrape every job in parallel, collapse near-duplicate postings, drop obvious mismatches with the
+    keyword prefilter, then run the rest through the analyze/cover pipeline best match first.
+    Rows come back in input order (one per unique posting); a failing job becomes an error row.
+    Each finished row is appended to checkpoint right away; job indexes in skip are not processed.
+    Jobs whose URL is in pages reuse that scraped text instead of fetching the page again.
+    Scraped jobs and their analysis are kept in the searchable corpus (corpus.py).
+    jobs may be a generator (e.g. search results): scraping starts on the first jobs while it is
+    still producing more; only a list is reordered to spread fetches over sites.
+    """
+    from dedup import DEDUP_ENABLED, collapse_duplicates
+    from prefilter import PREFILTER_CUTOFF, score_descriptions
+
+    cv_profile = format_profile(cv)
+    total = len(jobs) if isinstance(jobs, list) else None
+
+    def make_items() -> Iterator[dict]:
+        for i, j in enumerate(jobs):
+            if i in skip:
+                continue
+            item = {"title": j.get("title", "N/A"), "company": j.get("company", "N/A"), "url": j.get("url", ""),
+                    "index": i, "total": total, "cv_profile": cv_profile}
+            if pages and item["url"] in pages:
+                item["desc"] = pages[item["url"]]
+            yield item
+
+    items = make_items()
+    if total is not None:
+        # Spread consecutive fetches over sites; rows are still reassembled by index
+        items = interleave_by_site(list(items))
+    rows: dict[int, dict] = {}
+    corpus = get_corpus()
+
+    def finish(job: dict, error: Exception | None = None):
+        if error is not None:
+            row, status = _job_row(job, f"Failed: {type(error).__name__}: {error}"[:500]), "failed"
+        elif "row" in job:
+            row, status = job["row"], ("blocked" if job.get("blocked") else "failed" if job.get("failed")
+                                       else "duplicate" if "duplicate_of" in job else "done")
+        else:
+            return
+        rows[job["index"]] = row
+        if checkpoint is not None:
+            checkpoint.record(job["index"], job.get("url", ""), status, row)
+        if status == "done" and corpus is not None:
+            corpus.record(job, row)
+
+    scraped = run_pipeline(items, [Stage("scrape", _scrape_stage, SCRAPE_WORKERS)],
+                           queue_size=PIPELINE_QUEUE_SIZE, on_result=finish)
+
+    candidates = [job for job, error in scraped if error is None and "row" not in job]
+    if DEDUP_ENABLED and candidates:
+        # The same posting on LinkedIn, Indeed and the careers page is analyzed once, listing every URL
+        candidates, duplicates = collapse_duplicates(candidates)
+        if duplicates:
+            print(f"--- Dedup: collapsed {len(duplicates)} duplicate postings ---")
+        for job in duplicates:
+            # Listed, not analyzed: the row points at the posting it was merged into
+            kept = next((k for k in candidates if k.get("url") == job["duplicate_of"]), {})
+            job["row"] = _job_row(job, f"Duplicate of \"{kept.get('title', 'N/A')}\" ({job['duplicate_of']}), "
+                                       f"see that row for the analysis")
+            finish(job)
+    if candidates:
+        scores = score_descriptions([f"{j['title']}\n{j['desc']}" for j in candidates], cv["text"], conditions)
+        for job, score in zip(candidates, scores):
+            job["prefilter_score"] = round(float(score), 1)
+        if PREFILTER_CUTOFF > 0:
+            for job in candidates:
+                if job["prefilter_score"] < PREFILTER_CUTOFF:
+                    job["row"] = _job_row(job, f"Skipped by prefilter (score {job['prefilter_score']} < {PREFILTER_CUTOFF:g})")
+                    finish(job)
+            candidates = [j for j in candidates if j["prefilter_score"] >= PREFILTER_CUTOFF]
+        print(f"--- Prefilter: {len(candidates)}/{len(scores)} scraped jobs go to the analyst ---")
+        candidates.sort(key=lambda j: j["prefilter_score"], reverse=True)
+
+    stages = [
+        Stage("analyze", _analyze_stage, ANALYZE_WORKERS, batch_size=ANALYZE_BATCH_SIZE),
+        Stage("cover", _cover_stage, COVER_WORKERS),
+    ]
+    run_pipeline(candidates, stages, queue_size=PIPELINE_QUEUE_SIZE, on_result=finish)
+    return [rows[i] for i in sorted(rows)]
+
+
+def _research_jobs(cv_profile: str, conditions: dict) -> list[dict]:
+    """Jobs found by the LLM researcher agent browsing with the search and scraper tools (the old discovery path)."""
+    from crewai import Crew
+    from crew_tools import JobSearchTool, WebScraperTool
+
+    researcher = create_job_researcher([JobSearchTool(), WebScraperTool()])
+    search_task = create_search_jobs_task(researcher, cv_profile, conditions)
+    crew_search = Crew(agents=[researcher], tasks=[search_task], verbose=True)
+    with span("kickoff", agent=researcher.role, prompt_chars=len(search_task.description)) as s:
+        out_search = run_agent(researcher, "research", crew_search.kickoff)
+        _record_usage(s, out_search)
+    raw_search = out_search.raw if hasattr(out_search, "raw") else str(out_search)
+    jobs = _parse_search_output(raw_search)
+    print(f"--- Researcher found {len(jobs)} potential jobs ---")
+    if not jobs:
+        print("Researcher output was:")
+        print(raw_search[:500])
+    return jobs
+
+
+def _with_fallbacks(jobs: list[dict], cv_profile: str, conditions: dict, checkpoint: Checkpoint) -> Iterator[dict]:
+    """
+    Yield the discovered jobs, then, while there are fewer than MIN_JOBS, new jobs from the web search
+    (as each query returns) and from the researcher agent. Every extra job is added to checkpoint's
+    job list before it is yielded, so --resume sees it.
+    """
+    yield from jobs
+    seen = {normalize_url(j["url"]) for j in jobs}
+    count = len(jobs)
+
+    def extra(found: Iterable[dict]) -> Iterator[dict]:
+        nonlocal count
+        for job in found:
+            key = normalize_url(job["url"])
+            if key in seen:
+                continue
+            seen.add(key)
+            checkpoint.extend([job])
+            count += 1
+            yield job
+
+    if count < MIN_JOBS and SEARCH_FALLBACK:
+        print(f"--- Discovery found {count}/{MIN_JOBS} jobs, searching the web for more ---")
+        results = iter_job_search(build_search_queries(conditions))
+        try:
+            for job in extra(results):
+                yield job
+                if count >= MIN_JOBS:
+                    break
+        finally:
+            results.close()
+    if count < MIN_JOBS and RESEARCHER_FALLBACK:
+        print(f"--- Found {count}/{MIN_JOBS} jobs, asking the researcher agent for more ---")
+        yield from extra(_research_jobs(cv_profile, conditions))
+
+
+def load_cv() -> dict:
+    """
+    Text and compact profile of cv.txt (or cv.pdf) in the working directory, built once per
+    file hash (see cv_profile.py); {"error": message} if the file can't be read.
+    """
     cv_path = "cv.txt"
     if not os.path.exists(cv_path):
         cv_path = "cv.pdf"
-    cv_content = read_cv(cv_path)
-    if "Error" in cv_content:
-        print(cv_content)
-        print("Please ensure cv.txt or cv.pdf exists in the project root.")
-        return
+    return get_cv_profile(cv_path)
+
 
-    conditions_path = "conditions.txt"
+def load_conditions(conditions_path: str = "conditions.txt") -> dict:
+    """Search preferences from conditions.txt, with defaults for anything missing."""
     conditions_data = {
         "city": "Remote",
         "job_titles": "Software Engineer",
@@ -121,79 +468,88 @@ def main():
                         conditions_data["other"] = val
     else:
         print("Warning: conditions.txt not found. Using default preferences.")
+    return conditions_data
+
+
+def main(resume: bool = False):
+    print("--- Starting Job Search Automation Agent (loop mode) ---")
+
+    # 1. Load CV and Conditions
+    cv = load_cv()
+    if "error" in cv:
+        print(cv["error"])
+        print("Please ensure cv.txt or cv.pdf exists in the project root.")
+        return
+    cv_profile = format_profile(cv)
+    print(f"CV profile: {cv['seniority']}, {cv['years']} years, {len(cv['skills'])} skills (~{len(cv_profile) // 4} tokens per prompt)")
+    conditions_data = load_conditions()
 
     job_titles = conditions_data["job_titles"]
     city = conditions_data["city"]
     print(f"Conditions loaded: {job_titles} in {city}")
 
-    # 2. Use Job Researcher Agent to find jobs based on CV
-    print("--- Researcher: Finding jobs via company career pages ---")
-    search_tool = JobSearchTool()
-    scraper_tool = WebScraperTool()
-    researcher = create_job_researcher([search_tool, scraper_tool])
-    search_task = create_search_jobs_task(researcher, cv_content, conditions_data)
-    
-    crew_search = Crew(agents=[researcher], tasks=[search_task], verbose=True)
-    out_search = crew_search.kickoff()
-    raw_search = out_search.raw if hasattr(out_search, "raw") else str(out_search)
-    
-    jobs = _parse_search_output(raw_search)
-    print(f"--- Researcher found {len(jobs)} potential jobs ---")
-    if not jobs:
-        print("No jobs found by researcher. Agent output was:")
-        print(raw_search[:500])
-        return
+    checkpoint = Checkpoint(CHECKPOINT_FILE)
+    jobs, done = [], set()
+    if resume and checkpoint.exists():
+        jobs, done = checkpoint.jobs(), checkpoint.completed()
+        print(f"--- Resuming: {len(done)}/{len(jobs)} jobs already completed in {os.path.basename(checkpoint.path)} ---")
+    elif resume:
+        print("--- Nothing to resume (no checkpoint found), starting a new run ---")
 
-    # 3. Agents (no tools needed for per-job analyze/cover letter)
-    analyst = create_match_analyst([])
-    expert = create_application_expert()
+    if not jobs:
+        # 2. Discover jobs on ATS boards and company career pages (careers.py); web search and the
+        # researcher agent only fill gaps, streaming into the scrape stage as they find jobs
+        print("--- Discovery: Reading ATS boards and company career pages ---")
+        # Spread consecutive fetches over sites up front: the streamed job list is not reordered later
+        jobs = interleave_by_site(discover_jobs(conditions_data, min_results=MIN_JOBS))
+        checkpoint.start(jobs)
+        jobs = _with_fallbacks(jobs, cv_profile, conditions_data, checkpoint)
 
-    # 4. Process each job: scrape -> analyze -> cover letter if score >= 70
-    results = []
-    for i, job in enumerate(jobs):
-        title, company, url = job.get("title", "N/A"), job.get("company", "N/A"), job.get("url", "")
-        safe_title = title.encode("ascii", "replace").decode() if isinstance(title, str) else str(title)
-        print(f"--- Job {i+1}/{len(jobs)}: {safe_title} ---")
-        desc = scrape_url(url)
-        if desc.startswith("Error"):
-            print(f"  Skip (scrape failed): {desc[:80]}")
-            results.append({
-                "Job Title": title, "Company": company, "URL": url,
-                "Summary": "Scrape failed", "Category": "N/A", "Tech Stack": "N/A", "Cover Letter": "N/A",
-            })
-            continue
+    # 3-4. Process jobs: scrape in parallel -> keyword prefilter -> analyze -> cover letter if score >= 70.
+    # Analyze and cover letter stages overlap; rows keep input order and are checkpointed as they finish.
+    _process_jobs(jobs, cv, conditions_data, checkpoint=checkpoint, skip=done)
+    if not checkpoint.jobs():
+        print("No jobs found. Add company websites or ATS board URLs to companies.txt, or widen conditions.txt.")
+        return
 
-        analyze_task = create_analyze_one_job_task(analyst, title, company, url, desc, cv_content)
-        crew_analyze = Crew(agents=[analyst], tasks=[analyze_task], verbose=False)
-        out_analyze = crew_analyze.kickoff()
-        raw_analysis = out_analyze.raw if hasattr(out_analyze, "raw") else str(out_analyze)
-        score, category, tech_stack = _parse_analysis_output(raw_analysis)
-        summary = f"Score: {score}. {category}. Tech: {tech_stack}"
-
-        cover_letter = "N/A"
-        if score >= SCORE_THRESHOLD:
-            cover_task = create_cover_letter_one_job_task(expert, title, company, desc, cv_content)
-            crew_cover = Crew(agents=[expert], tasks=[cover_task], verbose=False)
-            out_cover = crew_cover.kickoff()
-            cover_letter = out_cover.raw if hasattr(out_cover, "raw") else str(out_cover)
-            cover_letter = (cover_letter or "").strip()[:8000]
-
-        results.append({
-            "Job Title": title,
-            "Company": company,
-            "URL": url,
-            "Summary": summary,
-            "Category": category,
-            "Tech Stack": tech_stack,
-            "Cover Letter": cover_letter,
-        })
-
-    # 5. Save to Excel
-    output_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "job_applications.xlsx")
-    df = pd.DataFrame(results)
-    df.to_excel(output_file, index=False)
-    print(f"--- Results saved to {output_file} ({len(results)} rows) ---")
+    # 5. Save to Excel, streamed from the checkpoint so resumed rows are included
+    with span("export", path=OUTPUT_FILE) as s:
+        count = export_xlsx(checkpoint.rows(), OUTPUT_FILE)
+        s.set(rows=count, bytes=os.path.getsize(OUTPUT_FILE))
+    print(f"--- Results saved to {OUTPUT_FILE} ({count} rows) ---")
+    llm_cache = get_llm_cache()
+    if llm_cache is not None:
+        print(f"--- LLM cache: {llm_cache.stats()} ---")
+    llm_pool = get_llm_pool()
+    if llm_pool is not None:
+        print(f"--- LLM pool: {llm_pool.stats()} ---")
+    tracer = get_tracer()
+    if tracer is not None:
+        tracer.flush()
+        print(f"--- Trace written to {tracer.path} (run {tracer.run_id}) ---")
+        if TRACE_SUMMARY:
+            print(tracer.format_summary())
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Job Search Automation Agent")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the last run from its checkpoint, skipping jobs that already completed")
+    parser.add_argument("--trace", nargs="?", const="", metavar="FILE",
+                        help="Record timing spans as JSON lines (default file: .cache/trace.jsonl) and print a summary")
+    parser.add_argument("--profiles", metavar="DIR",
+                        help="Batch mode: one subdirectory per candidate (cv + conditions.txt); search and scrape are shared")
+    parser.add_argument("--watch", nargs="?", type=float, const=-1, metavar="MINUTES",
+                        help="Keep running: search and re-check known postings every MINUTES (default WATCH_INTERVAL_MINUTES), "
+                             "analyzing only new or changed ones")
+    args = parser.parse_args()
+    if args.trace is not None:
+        enable_tracing(args.trace or None)
+    if args.profiles:
+        from batch import run_batch
+        run_batch(args.profiles)
+    elif args.watch is not None:
+        from watch import WATCH_INTERVAL_MINUTES, run_watch
+        run_watch(interval_minutes=args.watch if args.watch > 0 else WATCH_INTERVAL_MINUTES)
+    else:
+        main(resume=args.resume)
@@ -0,0 +1,132 @@
+import queue
+import threading
+from typing import Any, Callable, Iterable
+from tracing import span
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One pipeline step: func(item) -> item, run by `workers` threads.
+    With a batch_size, func(list_of_items) -> list_of_items instead; a worker waits up
+    to batch_wait seconds for more items before running a partial batch.
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1,
+                 batch_size: int | None = None, batch_wait: float = 2.0):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.batched = batch_size is not None
+        self.batch_size = max(1, batch_size or 1)
+        self.batch_wait = batch_wait
+
+
+def run_pipeline(items: Iterable, stages: list[Stage], queue_size: int = 8,
+                 on_result: Callable[[Any, Exception | None], None] | None = None) -> list[tuple[Any, Exception | None]]:
+    """
+    Push items through stages connected by bounded queues, each stage with its own
+    worker threads. Returns [(item, error)] in input order; error is the exception
+    of the stage that failed (later stages are skipped for that item) or None.
+    on_result(item, error) is called from the calling thread as soon as each item leaves the last stage.
+    items may be a generator: the first stage starts on items while later ones are still being produced.
+    If iterating items raises, the items fed so far still finish and the exception is re-raised here.
+    """
+    queues = [queue.Queue(maxsize=max(1, queue_size)) for _ in range(len(stages) + 1)]
+    results: dict[int, tuple[Any, Exception | None]] = {}
+    feed_error: list[BaseException] = []
+
+    def feed():
+        try:
+            for idx, item in enumerate(items):
+                queues[0].put((idx, item, None))
+        except BaseException as e:
+            feed_error.append(e)
+        finally:
+            # Always release the workers, or the drain loop below would wait forever
+            for _ in range(stages[0].workers):
+                queues[0].put(_DONE)
+
+    def make_worker(k: int, stage: Stage, remaining: list, lock: threading.Lock):
+        inbox, outbox = queues[k], queues[k + 1]
+        next_workers = stages[k + 1].workers if k + 1 < len(stages) else 1
+
+        def take_batch() -> tuple[list, bool]:
+            """Collect up to batch_size entries; the bool is True once the stage's sentinel was seen."""
+            entry = inbox.get()
+            if entry is _DONE:
+                return [], True
+            batch = [entry]
+            while len(batch) < stage.batch_size:
+                try:
+                    entry = inbox.get(timeout=stage.batch_wait)
+                except queue.Empty:
+                    break
+                if entry is _DONE:
+                    return batch, True
+                batch.append(entry)
+            return batch, False
+
+        def run_batch(batch: list):
+            pending = [e for e in batch if e[2] is None]
+            done = {e[0]: e for e in batch if e[2] is not None}
+            if pending:
+                try:
+                    with span(f"stage.{stage.name}", items=len(pending)):
+                        if stage.batched:
+                            outputs = stage.func([item for _, item, _ in pending])
+                        else:
+                            outputs = [stage.func(pending[0][1])]
+                    if len(outputs) != len(pending):
+                        raise ValueError(f"stage returned {len(outputs)} items for a batch of {len(pending)}")
+                    for (idx, _, _), item in zip(pending, outputs):
+                        done[idx] = (idx, item, None)
+                except Exception as e:
+                    print(f"--- PIPELINE: {stage.name} failed for item(s) {', '.join(str(p[0] + 1) for p in pending)}: "
+                          f"{type(e).__name__}: {e} ---")
+                    for idx, item, _ in pending:
+                        done[idx] = (idx, item, e)
+            for idx, _, _ in batch:
+                outbox.put(done[idx])
+
+        def work():
+            while True:
+                batch, finished = take_batch()
+                if batch:
+                    run_batch(batch)
+                if finished:
+                    break
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                # Every worker of this stage is done: release the next stage's workers
+                for _ in range(next_workers):
+                    outbox.put(_DONE)
+
+        return work
+
+    threads = [threading.Thread(target=feed, name="pipeline-feed", daemon=True)]
+    for k, stage in enumerate(stages):
+        remaining, lock = [stage.workers], threading.Lock()
+        work = make_worker(k, stage, remaining, lock)
+        for w in range(stage.workers):
+            threads.append(threading.Thread(target=work, name=f"pipeline-{stage.name}-{w}", daemon=True))
+    for t in threads:
+        t.start()
+
+    # Drain the last queue here so output can be reassembled in input order
+    while True:
+        entry = queues[-1].get()
+        if entry is _DONE:
+            break
+        idx, item, error = entry
+        results[idx] = (item, error)
+        if on_result is not None:
+            on_result(item, error)
+    for t in threads:
+        t.join()
+    if feed_error:
+        raise feed_error[0]
+    return [results[idx] for idx in sorted(results)]
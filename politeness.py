@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from fetcher import BlockedError
+from ratelimit import TokenBucket
+from tracing import span
+
+# Page fetches per second per site, and how many may be saved up
+SCRAPE_DOMAIN_RATE = float(os.getenv("SCRAPE_DOMAIN_RATE", "1"))
+SCRAPE_DOMAIN_BURST = float(os.getenv("SCRAPE_DOMAIN_BURST", "2"))
+# Per-site overrides, e.g. "linkedin.com=0.2,indeed.com=0.25"
+SCRAPE_DOMAIN_RATES = os.getenv("SCRAPE_DOMAIN_RATES", "linkedin.com=0.2,indeed.com=0.25")
+# Page fetches in flight across all sites (pipeline, researcher tool and CLI together)
+SCRAPE_MAX_CONCURRENCY = int(os.getenv("SCRAPE_MAX_CONCURRENCY", "8"))
+# A blocked site is left alone for BASE, 2*BASE, 4*BASE ... seconds (at most MAX)
+SCRAPE_BACKOFF_BASE = float(os.getenv("SCRAPE_BACKOFF_BASE", "30"))
+SCRAPE_BACKOFF_MAX = float(os.getenv("SCRAPE_BACKOFF_MAX", "900"))
+# Longer remaining backoffs fail fast as blocked instead of holding a worker
+SCRAPE_MAX_WAIT = float(os.getenv("SCRAPE_MAX_WAIT", "60"))
+
+_SECOND_LEVEL = {"co", "com", "ac", "org", "net", "gov", "edu"}
+
+
+def site_of(url: str) -> str:
+    """Registrable part of url's host ('se.linkedin.com' -> 'linkedin.com', 'jobs.example.co.uk' -> 'example.co.uk')."""
+    host = (urlsplit(url).hostname or "").lower()
+    parts = host.split(".")
+    if host.replace(".", "").isdigit() or ":" in host:
+        return host
+    if len(parts) >= 3 and parts[-2] in _SECOND_LEVEL and len(parts[-1]) == 2:
+        return ".".join(parts[-3:])
+    return ".".join(parts[-2:])
+
+
+def interleave_by_site(items: list[dict], key: str = "url") -> list[dict]:
+    """
+    Round-robin items over their sites (a, b, c, a, b, c, ...) so parallel workers spread over
+    many sites instead of queueing behind one site's rate limit. Order within a site is kept.
+    """
+    queues: OrderedDict[str, list[dict]] = OrderedDict()
+    for item in items:
+        queues.setdefault(site_of(item.get(key, "")), []).append(item)
+    interleaved = []
+    while queues:
+        for site in list(queues):
+            interleaved.append(queues[site].pop(0))
+            if not queues[site]:
+                del queues[site]
+    return interleaved
+
+
+class _Site:
+    def __init__(self, rate: float, burst: float):
+        self.base_rate = rate
+        self.bucket = TokenBucket(rate, burst)
+        self.strikes = 0
+        self.blocked_until = 0.0
+
+
+class PolitenessScheduler:
+    """
+    Gate in front of every page fetch: a token bucket per site, a global cap on concurrent fetches,
+    and adaptive backoff. A blocked fetch (captcha, bot check, HTTP 429) halves the site's rate and
+    pauses it for an exponentially growing time; successful fetches earn the rate back.
+    """
+
+    def __init__(self, rate: float = SCRAPE_DOMAIN_RATE, burst: float = SCRAPE_DOMAIN_BURST,
+                 max_concurrency: int = SCRAPE_MAX_CONCURRENCY, overrides: str = SCRAPE_DOMAIN_RATES):
+        self.rate = rate
+        self.burst = burst
+        self.overrides = {}
+        for entry in overrides.split(","):
+            site, _, value = entry.partition("=")
+            if site.strip() and value.strip():
+                self.overrides[site.strip().lower()] = float(value)
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrency))
+        self._sites: dict[str, _Site] = {}
+        self._lock = threading.Lock()
+
+    def _site(self, site: str) -> _Site:
+        with self._lock:
+            state = self._sites.get(site)
+            if state is None:
+                state = self._sites[site] = _Site(self.overrides.get(site, self.rate), self.burst)
+            return state
+
+    @contextmanager
+    def slot(self, url: str):
+        """
+        Wait for url's site to be allowed another fetch and for a free global slot, then run the
+        body. A BlockedError raised in the body backs the site off; raises BlockedError right away
+        while the site is backing off for longer than SCRAPE_MAX_WAIT.
+        """
+        site = site_of(url)
+        state = self._site(site)
+        with span("politeness.wait", site=site) as s:
+            start = time.perf_counter()
+            remaining = state.blocked_until - time.time()
+            if remaining > SCRAPE_MAX_WAIT:
+                s.set(skipped=True)
+                raise BlockedError(url, f"{site} backing off for {remaining:.0f}s")
+            if remaining > 0:
+                time.sleep(remaining)
+            state.bucket.acquire()
+            self._slots.acquire()
+            s.set(wait_ms=round((time.perf_counter() - start) * 1000, 1))
+        try:
+            yield
+        except BlockedError as e:
+            self._blocked(site, state, e)
+            raise
+        else:
+            self._ok(state)
+        finally:
+            self._slots.release()
+
+    def _blocked(self, site: str, state: _Site, error: BlockedError):
+        with self._lock:
+            state.strikes += 1
+            delay = error.retry_after or min(SCRAPE_BACKOFF_MAX, SCRAPE_BACKOFF_BASE * 2 ** (state.strikes - 1))
+            state.blocked_until = max(state.blocked_until, time.time() + delay)
+            rate = max(state.base_rate / 16, state.bucket.rate / 2)
+        state.bucket.set_rate(rate)
+        print(f"--- POLITENESS: {site} blocked ({error.reason}); pausing {delay:.0f}s, {rate:.3g} req/s after ---")
+
+    def _ok(self, state: _Site):
+        with self._lock:
+            if state.strikes == 0 and state.bucket.rate >= state.base_rate:
+                return
+            state.strikes = max(0, state.strikes - 1)
+            rate = min(state.base_rate, state.bucket.rate * 1.25)
+        state.bucket.set_rate(rate)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> PolitenessScheduler:
+    """Return the process-wide politeness scheduler."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PolitenessScheduler()
+        return _scheduler
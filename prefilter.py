@@ -0,0 +1,92 @@
+import os
+import re
+from collections import Counter
+import numpy as np
+
+# Jobs scoring below this (0-100) skip the LLM analyst; 0 disables the prefilter
+PREFILTER_CUTOFF = float(os.getenv("PREFILTER_CUTOFF", "5"))
+
+# Relative weight of each source of query terms
+TECH_WEIGHT = 3.0
+TITLE_WEIGHT = 2.0
+CV_WEIGHT = 1.0
+CV_MAX_TERMS = 40
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+_STOPWORDS = set(
+    "a an and are as at be by for from has have i in is it of on or our the to we with you your will "
+    "or not this that their they were was been also more than into over years year work working team "
+    "experience using used use role position company job jobs senior junior lead engineer developer".split()
+)
+# Title words are generic on their own but still count inside the job_titles field
+_TITLE_KEEP = {"senior", "junior", "lead", "engineer", "developer"}
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def _terms(text: str) -> list[str]:
+    """Unigrams plus adjacent bigrams, so 'spring boot' matches as a phrase."""
+    toks = _tokens(text)
+    return toks + [f"{a} {b}" for a, b in zip(toks, toks[1:])]
+
+
+def _field_terms(text: str, keep: set[str] = frozenset()) -> set[str]:
+    """Terms from a comma/'or'-separated conditions field (each entry as a phrase and as words)."""
+    terms = set()
+    for part in re.split(r",|/|\bor\b|\band\b", (text or "").lower()):
+        toks = [t for t in _tokens(part) if t not in _STOPWORDS or t in keep]
+        if not toks:
+            continue
+        terms.update(toks)
+        if len(toks) >= 2:
+            terms.update(f"{a} {b}" for a, b in zip(toks, toks[1:]))
+    return terms
+
+
+def build_query_weights(cv_content: str, conditions: dict) -> dict[str, float]:
+    """Weighted query terms from the tech_stack and job_titles conditions and the CV's most frequent terms."""
+    weights: dict[str, float] = {}
+    cv_counts = Counter(t for t in _tokens(cv_content) if len(t) > 2 and t not in _STOPWORDS and not t.isdigit())
+    for term, _ in cv_counts.most_common(CV_MAX_TERMS):
+        weights[term] = max(weights.get(term, 0.0), CV_WEIGHT)
+    for term in _field_terms(conditions.get("job_titles", ""), keep=_TITLE_KEEP):
+        weights[term] = max(weights.get(term, 0.0), TITLE_WEIGHT)
+    for term in _field_terms(conditions.get("tech_stack", "")):
+        weights[term] = max(weights.get(term, 0.0), TECH_WEIGHT)
+    return weights
+
+
+def score_descriptions(descriptions: list[str], cv_content: str, conditions: dict) -> np.ndarray:
+    """
+    Relevance of every description to the CV/conditions, 0-100, computed for the whole batch at once.
+    Builds a sparse (COO) doc x term count matrix over the query vocabulary, applies sublinear TF
+    and batch IDF, and returns the IDF-weighted share of query terms each description covers.
+    """
+    weights = build_query_weights(cv_content, conditions)
+    n_docs = len(descriptions)
+    if n_docs == 0 or not weights:
+        return np.zeros(n_docs)
+    vocab = {term: j for j, term in enumerate(weights)}
+    rows, cols = [], []
+    for i, text in enumerate(descriptions):
+        for term in _terms(text):
+            j = vocab.get(term)
+            if j is not None:
+                rows.append(i)
+                cols.append(j)
+    if not rows:
+        return np.zeros(n_docs)
+    n_terms = len(vocab)
+    # COO triplets (doc, term, count): one entry per distinct term a description contains
+    pairs, tf = np.unique(np.asarray(rows, dtype=np.int64) * n_terms + np.asarray(cols, dtype=np.int64),
+                          return_counts=True)
+    doc, term = pairs // n_terms, pairs % n_terms
+
+    df = np.bincount(term, minlength=n_terms)
+    idf = np.log((1.0 + n_docs) / (1.0 + df)) + 1.0
+    q = np.fromiter(weights.values(), dtype=np.float64, count=n_terms) * idf
+    # Sublinear TF saturates at 1 after ~3 mentions, so one keyword-stuffed posting can't dominate
+    sat = np.minimum(1.0, np.log1p(tf) / np.log(4.0))
+    return 100.0 * np.bincount(doc, weights=sat * q[term], minlength=n_docs) / q.sum()
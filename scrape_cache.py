@@ -0,0 +1,109 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from urls import normalize_url
+
+_PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(_PROJECT_ROOT, ".cache")
+SCRAPE_CACHE_FILE = os.path.join(CACHE_DIR, "scrape_cache.sqlite")
+
+SCRAPE_CACHE_ENABLED = os.getenv("SCRAPE_CACHE", "true").lower() in ("1", "true", "yes")
+# Cached page text older than this is fetched again
+SCRAPE_CACHE_TTL_HOURS = float(os.getenv("SCRAPE_CACHE_TTL_HOURS", "72"))
+# Compressed payload size cap; least recently used pages are evicted beyond it
+SCRAPE_CACHE_MAX_MB = float(os.getenv("SCRAPE_CACHE_MAX_MB", "200"))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ScrapeCache:
+    """
+    SQLite cache of cleaned page text keyed by normalized URL.
+    Each row keeps fetch time, last access time (for LRU), a content hash and a zlib payload.
+    """
+
+    def __init__(self, path: str = SCRAPE_CACHE_FILE, ttl_hours: float = SCRAPE_CACHE_TTL_HOURS,
+                 max_mb: float = SCRAPE_CACHE_MAX_MB):
+        self.path = path
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY, fetched_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+            " content_hash TEXT NOT NULL, size INTEGER NOT NULL, payload BLOB NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_accessed ON pages(accessed_at)")
+        self._conn.commit()
+
+    def get(self, url: str) -> str | None:
+        """Return cached text for url, or None if missing or older than the TTL."""
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at, payload FROM pages WHERE url = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            fetched_at, payload = row
+            if self.ttl_seconds > 0 and now - fetched_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM pages WHERE url = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (now, key))
+            self._conn.commit()
+        return zlib.decompress(payload).decode("utf-8")
+
+    def put(self, url: str, text: str) -> str:
+        """Store text for url and return its content hash."""
+        key = normalize_url(url)
+        digest = content_hash(text)
+        payload = zlib.compress(text.encode("utf-8"), 6)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, fetched_at, accessed_at, content_hash, size, payload)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, now, now, digest, len(payload), payload),
+            )
+            self._evict()
+            self._conn.commit()
+        return digest
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._conn.execute("SELECT url, size FROM pages ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_scrape_cache() -> ScrapeCache | None:
+    """Return the process-wide scrape cache, or None when SCRAPE_CACHE is disabled."""
+    global _cache
+    if not SCRAPE_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ScrapeCache()
+        return _cache
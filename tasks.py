@@ -1,10 +1,11 @@
 import os
-from crewai import Task
 
 def create_job_automation_task(researcher, analyst, expert, cv_content, conditions):
     """
     Combines the process into a single clear instruction set to help smaller LLMs.
     """
+    from crewai import Task
+
     job_titles = conditions.get('job_titles', 'Java Developer')
     city = conditions.get('city', 'Stockholm')
     tech = conditions.get('tech_stack', 'Java')
@@ -21,14 +22,16 @@ def create_job_automation_task(researcher, analyst, expert, cv_content, conditio
         agent=researcher # We can use one agent or a crew, but let's try pushing the researcher to do the loop
     )
 
-def create_search_jobs_task(agent, cv_content, conditions):
+def create_search_jobs_task(agent, cv_profile, conditions):
+    from crewai import Task
+
     job_titles = conditions.get('job_titles', 'Java Developer')
     city = conditions.get('city', 'Stockholm')
     tech = conditions.get('tech_stack', '')
     
     return Task(
         description=(
-            f"1. Analyze the CV to understand the profile: {cv_content[:1000]}\n"
+            f"1. Use the candidate profile to understand what they are looking for:\n{cv_profile}\n"
             f"2. Search for lists of software companies, tech startups, or IT firms in '{city}'.\n"
             f"3. For the most relevant companies found, use the Web Scraper Tool to find their 'Careers' or 'Jobs' pages.\n"
             f"4. Scrape those career pages to find specific openings matching '{job_titles}'.\n"
@@ -40,6 +43,8 @@ def create_search_jobs_task(agent, cv_content, conditions):
     )
 
 def create_analyze_matches_task(agent, cv_content, conditions):
+    from crewai import Task
+
     return Task(
         description=(
             "Take the list of jobs provided. For EACH one, use the Web Scraper Tool to read the full description. "
@@ -51,6 +56,8 @@ def create_analyze_matches_task(agent, cv_content, conditions):
     )
 
 def create_generate_application_task(agent):
+    from crewai import Task
+
     return Task(
         description=(
             "For every job that scored above 70, write a tailored cover letter. "
@@ -61,26 +68,67 @@ def create_generate_application_task(agent):
     )
 
 
-def create_analyze_one_job_task(agent, job_title: str, company: str, url: str, job_description: str, cv_content: str):
+# Bump when analyst / cover-letter prompts change so cached LLM outputs are not reused
+PROMPT_VERSION = "2"
+
+ANALYSIS_LINE_FORMAT = "Score: <number> | Category: <text> | Tech Stack: <comma-separated>"
+
+
+def _job_block(job_title: str, company: str, url: str, job_description: str, max_chars: int = 3500) -> str:
+    return f"Job: {job_title} at {company}\nURL: {url}\n\nJob description:\n{job_description[:max_chars]}"
+
+
+def create_analyze_one_job_task(agent, job_title: str, company: str, url: str, job_description: str, cv_profile: str):
     """Single-job analysis: score 0-100, category, tech stack. Output must be one line: Score: N | Category: X | Tech Stack: Y"""
+    from crewai import Task
+
     return Task(
         description=(
-            f"Job: {job_title} at {company}\nURL: {url}\n\nJob description:\n{job_description[:3500]}\n\n"
-            f"Candidate CV (excerpt):\n{cv_content[:1500]}\n\n"
+            f"{_job_block(job_title, company, url, job_description)}\n\n"
+            f"Candidate profile:\n{cv_profile}\n\n"
             "Score this job fit from 0 to 100. Extract Job Category and Tech Stack. "
-            "Reply with exactly one line in this format: Score: <number> | Category: <text> | Tech Stack: <comma-separated>"
+            f"Reply with exactly one line in this format: {ANALYSIS_LINE_FORMAT}"
         ),
         expected_output="One line: Score: N | Category: X | Tech Stack: Y",
         agent=agent,
     )
 
 
-def create_cover_letter_one_job_task(agent, job_title: str, company: str, job_description: str, cv_content: str):
+def create_analyze_jobs_batch_task(agent, jobs: list[dict], cv_profile: str):
+    """
+    Batch analysis: the candidate profile is sent once and K jobs (dicts with title, company, url, desc) are scored in one call.
+    Output must be one line per job: Job <n>: Score: N | Category: X | Tech Stack: Y
+    """
+    from crewai import Task
+
+    # Cap the descriptions at about two single-job prompts in total, split across the batch
+    per_job_chars = max(1200, 3500 * 2 // max(1, len(jobs)))
+    blocks = [
+        f"=== Job {n} ===\n"
+        + _job_block(j.get("title", "N/A"), j.get("company", "N/A"), j.get("url", ""), j.get("desc", ""), per_job_chars)
+        for n, j in enumerate(jobs, 1)
+    ]
+    return Task(
+        description=(
+            f"Candidate profile:\n{cv_profile}\n\n"
+            + "\n\n".join(blocks)
+            + f"\n\nScore EACH of the {len(jobs)} jobs above for fit with this candidate from 0 to 100. "
+            "Extract Job Category and Tech Stack for each. "
+            f"Reply with exactly {len(jobs)} lines, one per job, in this format: Job <n>: {ANALYSIS_LINE_FORMAT}"
+        ),
+        expected_output=f"{len(jobs)} lines: Job n: Score: N | Category: X | Tech Stack: Y",
+        agent=agent,
+    )
+
+
+def create_cover_letter_one_job_task(agent, job_title: str, company: str, job_description: str, cv_profile: str):
     """Generate a single cover letter for one job."""
+    from crewai import Task
+
     return Task(
         description=(
             f"Job: {job_title} at {company}\n\nJob description:\n{job_description[:3500]}\n\n"
-            f"Candidate CV (excerpt):\n{cv_content[:1500]}\n\n"
+            f"Candidate profile:\n{cv_profile}\n\n"
             "Write a professional, tailored cover letter for this job (3-5 short paragraphs). Output only the cover letter text, no labels."
         ),
         expected_output="Cover letter text only.",
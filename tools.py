@@ -1,34 +1,74 @@
 import os
-import pandas as pd
-from datetime import datetime
-from crewai.tools import BaseTool
-from playwright.sync_api import sync_playwright
-from playwright_stealth import Stealth
-from duckduckgo_search import DDGS
-from pypdf import PdfReader
-from bs4 import BeautifulSoup
-
-# Resolve project root (directory where this file lives) for reliable CSV path
-_PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
-VISITED_URLS_FILE = os.path.join(_PROJECT_ROOT, "visited_urls.csv")
-
-
-def _run_job_search(max_results: int, visited_urls: set, search_query: str) -> tuple[list[dict], str | None]:
-    """Run DDGS text search. Returns (results_found, error_message)."""
-    try:
-        with DDGS() as ddgs:
-            raw_results = list(ddgs.text(search_query, max_results=20))
-    except Exception as e:
-        return [], f"Search failed: {type(e).__name__}: {e}"
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterator
+from extract import extract_job, format_job_record
+from fetcher import BlockedError, detect_block, get_fetcher
+from politeness import get_scheduler
+from ratelimit import TokenBucket, backoff_delay
+from scrape_cache import get_scrape_cache
+from tracing import span
+from url_store import get_visited_store
+from urls import normalize_url
+
+# Searches in flight at once, global DDGS request rate (per second) and retries per query
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", "4"))
+SEARCH_RATE = float(os.getenv("SEARCH_RATE", "1"))
+SEARCH_RETRIES = int(os.getenv("SEARCH_RETRIES", "3"))
+# How many tech_stack entries are combined with each title/city when expanding queries
+SEARCH_TECH_TERMS = int(os.getenv("SEARCH_TECH_TERMS", "3"))
+# scrape_url() result for captcha / bot-check / rate-limited pages (starts with "Error" like every failed scrape)
+BLOCKED_PREFIX = "Error scraping URL (blocked, retry later)"
+
+_search_limiter = TokenBucket(SEARCH_RATE, burst=max(1, SEARCH_WORKERS))
+_ddgs = None
+_ddgs_lock = threading.Lock()
+
+
+def _get_ddgs():
+    """One DDGS client shared by every search (keeps its HTTP session warm)."""
+    global _ddgs
+    with _ddgs_lock:
+        if _ddgs is None:
+            from duckduckgo_search import DDGS
+            _ddgs = DDGS()
+        return _ddgs
+
+
+def _run_job_search(max_results: int, filter_new: Callable[[list[str]], list[str]], search_query: str) -> tuple[list[dict], str | None]:
+    """
+    Run DDGS text search through the shared client and rate limiter, retrying with backoff, and keep
+    the results whose URL filter_new() returns (one call per query). Returns (results_found, error_message).
+    """
+    raw_results, error = None, None
+    with span("search", query=search_query) as s:
+        for attempt in range(SEARCH_RETRIES + 1):
+            _search_limiter.acquire()
+            try:
+                raw_results = list(_get_ddgs().text(search_query, max_results=20))
+                break
+            except Exception as e:
+                error = f"Search failed: {type(e).__name__}: {e}"
+                if attempt < SEARCH_RETRIES:
+                    time.sleep(backoff_delay(attempt))
+        s.set(attempts=attempt + 1, results=len(raw_results or []))
+        if raw_results is None:
+            s.set(error=error)
+    if raw_results is None:
+        return [], error
 
     if not raw_results:
         print(f"--- SEARCH: API returned 0 raw results for query ---")
         return [], None
 
     results_found = []
+    new_urls = set(filter_new([u for u in (r.get("href") or r.get("link") for r in raw_results) if u]))
     for r in raw_results:
         url = r.get("href") or r.get("link")
-        if url and url not in visited_urls:
+        if url in new_urls:
+            new_urls.discard(url)
             results_found.append({
                 "url": url,
                 "title": r.get("title", "Job Post"),
@@ -39,54 +79,132 @@ def _run_job_search(max_results: int, visited_urls: set, search_query: str) -> t
     return results_found, None
 
 
-class JobSearchTool(BaseTool):
-    name: str = "Job Search Tool"
-    description: str = "Searches for job postings using DuckDuckGo. Handles duplicate prevention by checking visited_urls.csv."
+def _split_field(value: str) -> list[str]:
+    """Entries of a conditions field such as 'Senior Backend Engineer or Team Lead' / 'Java, Kafka'."""
+    parts = re.split(r",|;|/|\bor\b", value or "", flags=re.I)
+    return [p.strip() for p in parts if p.strip()]
 
-    def _run(self, query: str) -> str:
-        max_results = 10
-        visited_urls = set()
-        visited_file = VISITED_URLS_FILE
 
-        if os.path.exists(visited_file):
-            try:
-                df = pd.read_csv(visited_file)
-                col = "url" if "url" in df.columns else df.columns[0]
-                visited_urls = set(df[col].dropna().astype(str).tolist())
-            except Exception:
-                pass
+def build_search_queries(conditions: dict) -> list[str]:
+    """
+    Expand conditions.txt fields into search queries: every job title x city, then the same
+    combined with the first SEARCH_TECH_TERMS tech_stack entries, plus remote variants.
+    Broad queries come first so they are searched (and scraped) first.
+    """
+    titles = _split_field(conditions.get("job_titles", "")) or ["Software Engineer"]
+    # "Stockholm, Sweden" is one city: only ';', '/' and 'or' separate cities
+    cities = [c.strip() for c in re.split(r";|/|\bor\b", conditions.get("city", ""), flags=re.I) if c.strip()]
+    cities = [c.split(",")[0].strip() for c in cities] or ["Remote"]
+    techs = _split_field(conditions.get("tech_stack", ""))[:SEARCH_TECH_TERMS]
+    remote = "remote" in (conditions.get("work_condition", "") or "").lower()
+
+    queries = []
+    for title in titles:
+        queries.extend(f"{title} {city} jobs" for city in cities)
+    for tech in techs:
+        for title in titles:
+            queries.extend(f"{title} {tech} {city} jobs" for city in cities)
+    if remote:
+        queries.extend(f"{title} remote jobs" for title in titles)
+    seen = set()
+    return [q for q in queries if not (q.lower() in seen or seen.add(q.lower()))]
 
-        search_query = query.strip().replace('"', "").strip()
-        if not search_query:
-            return "Error: empty search query. Provide a company name or search terms."
 
-        print(f"--- TOOL: Searching for: {search_query} ---")
+def _job_from_result(r: dict) -> dict:
+    title = r.get("title", "Job Post")
+    company = "N/A"
+    if " at " in title:
+        parts = title.split(" at ", 1)
+        if len(parts) == 2:
+            title, company = parts[0].strip(), parts[1].strip()
+    return {"title": title, "company": company, "url": r["url"]}
 
-        results_found, err = _run_job_search(max_results, visited_urls, search_query)
-        if err:
-            print(f"--- TOOL ERROR: {err} ---")
-            return f"No job postings found. {err} Try again or use a different query (e.g. 'Software Engineer Stockholm jobs')."
 
-        if not results_found:
-            # Search succeeded but all URLs were already visited
-            print(f"--- TOOL: Search returned results but all {len(visited_urls)} URLs already in visited_urls.csv ---")
-            return (
-                "No new job postings (all results were already in visited_urls.csv). "
-                "Try a different search query or delete visited_urls.csv to reset."
-            )
+def iter_job_search(queries: list[str], max_per_query: int = 15) -> Iterator[dict]:
+    """
+    Run all queries concurrently (SEARCH_WORKERS at a time, globally rate limited) and yield
+    {"title", "company", "url"} for each new job as soon as its query returns, deduplicated
+    across queries and against the visited URL store. Closing the generator cancels queued queries.
+    """
+    visited = get_visited_store()
+    seen_urls = set()
+    seen_lock = threading.Lock()
 
-        new_data = []
-        output_lines = []
-        for res in results_found:
-            output_lines.append(f"Title: {res['title']}\nURL: {res['url']}\nSnippet: {res['body']}\n---")
-            new_data.append({"url": res["url"], "date": datetime.now().strftime("%Y-%m-%d")})
+    def filter_new(urls: list[str]) -> list[str]:
+        with seen_lock:
+            urls = [u for u in urls if normalize_url(u) not in seen_urls]
+        return visited.filter_new(urls)
 
-        df_new = pd.DataFrame(new_data)
-        write_header = not os.path.exists(visited_file)
-        df_new.to_csv(visited_file, mode="a", header=write_header, index=False)
+    def search(q: str) -> tuple[str, list[dict], str | None]:
+        search_query = q.strip().replace('"', "").strip()
+        if not search_query or "job" not in search_query.lower():
+            search_query = f"{search_query} jobs"
+        print(f"--- SEARCH: {search_query} ---")
+        return (search_query, *_run_job_search(max_per_query, filter_new, search_query))
 
-        print(f"--- TOOL: Found {len(results_found)} new jobs, saved to {visited_file} ---")
-        return "\n".join(output_lines)
+    executor = ThreadPoolExecutor(max_workers=max(1, SEARCH_WORKERS), thread_name_prefix="search")
+    try:
+        futures = [executor.submit(search, q) for q in queries]
+        for future in as_completed(futures):
+            search_query, results_found, err = future.result()
+            if err:
+                print(f"--- SEARCH ERROR ({search_query}): {err} ---")
+                continue
+            new_jobs = []
+            with seen_lock:
+                for r in results_found:
+                    key = normalize_url(r["url"])
+                    if key not in seen_urls:
+                        seen_urls.add(key)
+                        new_jobs.append(_job_from_result(r))
+            if results_found:
+                visited.add_many([res["url"] for res in results_found])
+                print(f"--- SEARCH: Got {len(results_found)} results ({len(new_jobs)} new) for: {search_query} ---")
+            yield from new_jobs
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_search_queries(queries: list[str], max_per_query: int = 15,
+                        is_known: Callable[[str], bool] | None = None) -> Iterator[tuple[str, list[dict]]]:
+    """
+    Run every query once (SEARCH_WORKERS at a time, globally rate limited) and yield
+    (query, [{"title", "company", "url"}]) as soon as each query returns. Unlike iter_job_search,
+    a job is listed under every query that found it, so callers can tell which queries (and whose
+    conditions) it matches. URLs are only filtered against the visited URL store (or is_known, when
+    given); new ones are recorded in the store once the generator finishes or is closed, so a URL
+    found by two queries is listed under both. Closing the generator cancels queued queries.
+    """
+    visited = get_visited_store()
+    filter_new = visited.filter_new if is_known is None else (lambda urls: [u for u in urls if not is_known(u)])
+    unique = list(dict.fromkeys(q.strip().replace('"', "").strip() for q in queries if q.strip()))
+    new_urls: dict[str, None] = {}
+
+    def search(q: str) -> tuple[str, list[dict], str | None]:
+        print(f"--- SEARCH: {q} ---")
+        return (q, *_run_job_search(max_per_query, filter_new, q))
+
+    executor = ThreadPoolExecutor(max_workers=max(1, SEARCH_WORKERS), thread_name_prefix="search")
+    try:
+        futures = [executor.submit(search, q) for q in unique]
+        for future in as_completed(futures):
+            q, found, err = future.result()
+            if err:
+                print(f"--- SEARCH ERROR ({q}): {err} ---")
+            jobs = [_job_from_result(r) for r in found]
+            new_urls.update(dict.fromkeys(job["url"] for job in jobs))
+            yield q, jobs
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if new_urls:
+            visited.add_many(list(new_urls))
+        print(f"--- SEARCH: {len(unique)} queries, {len(new_urls)} unique new URLs ---")
+
+
+def search_queries(queries: list[str], max_per_query: int = 15,
+                   is_known: Callable[[str], bool] | None = None) -> dict[str, list[dict]]:
+    """{query: [{"title", "company", "url"}]} for every query once all have returned (see iter_search_queries)."""
+    return dict(iter_search_queries(queries, max_per_query=max_per_query, is_known=is_known))
 
 
 def run_job_search_loop(
@@ -95,115 +213,62 @@ def run_job_search_loop(
     max_per_query: int = 15,
 ) -> list[dict]:
     """
-    Run search for each query until we have at least min_results jobs.
-    Returns list of {"title", "company", "url"} and appends new URLs to visited_urls.csv.
+    Search all queries concurrently until we have at least min_results jobs.
+    Returns list of {"title", "company", "url"} and records new URLs in the visited URL store.
     """
-    visited_file = VISITED_URLS_FILE
-    visited_urls = set()
-    if os.path.exists(visited_file):
-        try:
-            df = pd.read_csv(visited_file)
-            col = "url" if "url" in df.columns else df.columns[0]
-            visited_urls = set(df[col].dropna().astype(str).tolist())
-        except Exception:
-            pass
-
     all_jobs = []
-    seen_urls = set(visited_urls)
-
-    for q in queries:
-        if len(all_jobs) >= min_results:
-            break
-        search_query = q.strip().replace('"', "").strip()
-        if not search_query or "job" not in search_query.lower():
-            search_query = f"{search_query} jobs"
-        print(f"--- SEARCH: {search_query} ---")
-        results_found, err = _run_job_search(max_per_query, seen_urls, search_query)
-        if err:
-            print(f"--- SEARCH ERROR: {err} ---")
-            continue
-        for r in results_found:
-            url = r["url"]
-            if url in seen_urls:
-                continue
-            seen_urls.add(url)
-            title = r.get("title", "Job Post")
-            body = r.get("body", "")
-            company = "N/A"
-            if " at " in title:
-                parts = title.split(" at ", 1)
-                if len(parts) == 2:
-                    title, company = parts[0].strip(), parts[1].strip()
-            all_jobs.append({"title": title, "company": company, "url": url})
+    results = iter_job_search(queries, max_per_query=max_per_query)
+    try:
+        for job in results:
+            all_jobs.append(job)
             if len(all_jobs) >= min_results:
                 break
+    finally:
+        results.close()
+    print(f"--- SEARCH: total jobs: {len(all_jobs)} ---")
+    return all_jobs
 
-        if results_found:
-            new_data = [{"url": res["url"], "date": datetime.now().strftime("%Y-%m-%d")} for res in results_found]
-            df_new = pd.DataFrame(new_data)
-            write_header = not os.path.exists(visited_file)
-            df_new.to_csv(visited_file, mode="a", header=write_header, index=False)
-            print(f"--- SEARCH: Got {len(results_found)} results, total jobs so far: {len(all_jobs)} ---")
 
-    return all_jobs
+def _html_to_text(content: str) -> str:
+    """Compact job text (title, company, location, main description; first 5000 chars) from a page's HTML."""
+    return format_job_record(extract_job(content), max_chars=5000)
 
 
 def scrape_url(url: str) -> str:
-    """Scrape a single URL and return text content (first 5000 chars)."""
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
-            )
-            page = context.new_page()
-            stealth = Stealth()
-            stealth.apply_stealth_sync(page)
-            page.goto(url, wait_until="domcontentloaded", timeout=30000)
-            page.wait_for_timeout(2000)
-            content = page.content()
-            browser.close()
-        soup = BeautifulSoup(content, "html.parser")
-        for tag in soup(["script", "style"]):
-            tag.decompose()
-        return soup.get_text(separator=" ", strip=True)[:5000]
-    except Exception as e:
-        return f"Error scraping URL: {str(e)}"
-
-
-class WebScraperTool(BaseTool):
-    name: str = "Web Scraper Tool"
-    description: str = "Scrapes the content of a job posting URL to extract detailed requirements."
-
-    def _run(self, url: str) -> str:
+    """
+    Scrape a single URL and return text content (first 5000 chars).
+    Reads the on-disk scrape cache first, then tries plain HTTP and falls back to the
+    shared browser for JS-rendered pages; only successful scrapes are cached. Fetches go through
+    the per-site politeness scheduler; captcha / bot-check / rate-limit pages come back as
+    BLOCKED_PREFIX text so callers can retry them later instead of analyzing them.
+    """
+    with span("scrape", url=url) as s:
+        cache = get_scrape_cache()
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                context = browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
-                )
-                page = context.new_page()
-                
-                # Apply stealth
-                stealth = Stealth()
-                stealth.apply_stealth_sync(page)
-                
-                page.goto(url, wait_until="domcontentloaded", timeout=30000)
-                
-                # Wait for main content or common job containers
-                page.wait_for_timeout(2000)
-                content = page.content()
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                # Clean up script and style elements
-                for script_or_style in soup(["script", "style"]):
-                    script_or_style.decompose()
-                
-                text = soup.get_text(separator=' ', strip=True)
-                browser.close()
-                return text[:5000] # Return first 5000 characters to avoid context overflow
+            if cache is not None:
+                cached = cache.get(url)
+                if cached is not None:
+                    s.set(cache="hit", bytes=len(cached))
+                    return cached
+                s.set(cache="miss")
+            with get_scheduler().slot(url):
+                content, tier = get_fetcher().fetch_html(url)
+                reason = detect_block(content)
+                if reason:
+                    raise BlockedError(url, reason)
+            with span("parse", bytes=len(content)):
+                text = _html_to_text(content)
+        except BlockedError as e:
+            s.set(blocked=e.reason)
+            return f"{BLOCKED_PREFIX}: {e}"
         except Exception as e:
+            s.set(error=type(e).__name__)
             return f"Error scraping URL: {str(e)}"
+        s.set(tier=tier, bytes=len(text))
+        if cache is not None and text:
+            cache.put(url, text)
+        return text
+
 
 def read_cv(file_path: str) -> str:
     if not os.path.exists(file_path):
@@ -211,11 +276,9 @@ def read_cv(file_path: str) -> str:
     
     if file_path.endswith('.pdf'):
         try:
+            from pypdf import PdfReader
             reader = PdfReader(file_path)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text()
-            return text
+            return "\n".join(page.extract_text() or "" for page in reader.pages)
         except Exception as e:
             return f"Error reading PDF: {str(e)}"
     else:
@@ -224,3 +287,11 @@ def read_cv(file_path: str) -> str:
                 return f.read()
         except Exception as e:
             return f"Error reading text file: {str(e)}"
+
+
+def __getattr__(name: str):
+    # The CrewAI tool classes live in crew_tools.py so that importing tools does not load crewai
+    if name in ("JobSearchTool", "WebScraperTool"):
+        import crew_tools
+        return getattr(crew_tools, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
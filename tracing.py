@@ -0,0 +1,184 @@
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+
+_PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Spans are only recorded when TRACE is on (or main.py --trace); otherwise span() returns a shared no-op
+TRACE_ENABLED = os.getenv("TRACE", "false").lower() in ("1", "true", "yes")
+TRACE_FILE = os.getenv("TRACE_FILE") or os.path.join(_PROJECT_ROOT, ".cache", "trace.jsonl")
+# Print a per-span summary table at the end of a traced run
+TRACE_SUMMARY = os.getenv("TRACE_SUMMARY", "true").lower() in ("1", "true", "yes")
+
+# Numeric attributes that are summed per span name in the summary table
+_SUMMED = ("bytes", "prompt_tokens", "completion_tokens")
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class _NoopSpan:
+    """Returned by span() while tracing is off: no clock reads, no allocation, no I/O."""
+
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    """One timed operation; attributes can be added with set() until it ends."""
+
+    __slots__ = ("tracer", "name", "attrs", "span_id", "parent_id", "start", "_t0", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: dict):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.span_id = next(tracer._ids)
+        self.parent_id = None
+        self.start = 0.0
+        self._t0 = 0.0
+        self._token = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.parent_id = _current_span.get()
+        self._token = _current_span.set(self.span_id)
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self._t0) * 1000
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attrs.setdefault("error", exc_type.__name__)
+        self.tracer.emit(self, duration_ms)
+        return False
+
+
+class Tracer:
+    """
+    Appends finished spans as JSON lines to path (one "run" id per process) and keeps
+    per-name aggregates for the end-of-run summary table.
+    """
+
+    def __init__(self, path: str = TRACE_FILE):
+        self.path = path
+        self.run_id = uuid.uuid4().hex[:12]
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._file = None
+        self._stats: dict[str, dict] = {}
+
+    def span(self, name: str, **attrs) -> Span:
+        return Span(self, name, attrs)
+
+    def emit(self, span: Span, duration_ms: float):
+        record = {
+            "run": self.run_id, "span": span.name, "id": span.span_id, "parent": span.parent_id,
+            "thread": threading.current_thread().name, "start": round(span.start, 6), "ms": round(duration_ms, 3),
+            **span.attrs,
+        }
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            stats = self._stats.setdefault(span.name, {"durations": [], "errors": 0, "hits": 0, "misses": 0,
+                                                       **{k: 0 for k in _SUMMED}})
+            stats["durations"].append(duration_ms)
+            if "error" in span.attrs:
+                stats["errors"] += 1
+            cache = span.attrs.get("cache")
+            if cache == "hit":
+                stats["hits"] += 1
+            elif cache == "miss":
+                stats["misses"] += 1
+            for key in _SUMMED:
+                value = span.attrs.get(key)
+                if isinstance(value, (int, float)):
+                    stats[key] += value
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def summary(self) -> list[dict]:
+        """Per span name: count, errors, total/p50/p90/max milliseconds, summed bytes and tokens, cache hits/misses."""
+        with self._lock:
+            stats = {name: dict(s, durations=sorted(s["durations"])) for name, s in self._stats.items()}
+        rows = []
+        for name, s in sorted(stats.items(), key=lambda item: -sum(item[1]["durations"])):
+            durations = s["durations"]
+            rows.append({
+                "span": name, "count": len(durations), "errors": s["errors"],
+                "total_ms": round(sum(durations), 1),
+                "p50_ms": round(durations[int(0.5 * (len(durations) - 1))], 1),
+                "p90_ms": round(durations[int(0.9 * (len(durations) - 1))], 1),
+                "max_ms": round(durations[-1], 1),
+                "hits": s["hits"], "misses": s["misses"],
+                **{k: s[k] for k in _SUMMED},
+            })
+        return rows
+
+    def format_summary(self) -> str:
+        header = f"{'span':<18} {'count':>6} {'err':>4} {'total s':>9} {'p50 ms':>9} {'p90 ms':>9} {'max ms':>9} {'hit/miss':>9} {'KB':>8} {'tok in/out':>13}"
+        lines = [header, "-" * len(header)]
+        for r in self.summary():
+            cache = f"{r['hits']}/{r['misses']}" if r["hits"] or r["misses"] else ""
+            tokens = f"{r['prompt_tokens']}/{r['completion_tokens']}" if r["prompt_tokens"] or r["completion_tokens"] else ""
+            kb = f"{r['bytes'] / 1024:.0f}" if r["bytes"] else ""
+            lines.append(f"{r['span']:<18} {r['count']:>6} {r['errors']:>4} {r['total_ms'] / 1000:>9.2f} {r['p50_ms']:>9.1f} "
+                         f"{r['p90_ms']:>9.1f} {r['max_ms']:>9.1f} {cache:>9} {kb:>8} {tokens:>13}")
+        return "\n".join(lines)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_tracer = Tracer(TRACE_FILE) if TRACE_ENABLED else None
+
+
+def enable_tracing(path: str | None = None) -> Tracer:
+    """Turn tracing on for the rest of the process (used by main.py --trace)."""
+    global _tracer
+    if _tracer is None or (path and os.path.abspath(path) != os.path.abspath(_tracer.path)):
+        _tracer = Tracer(path or TRACE_FILE)
+    return _tracer
+
+
+def get_tracer() -> Tracer | None:
+    """Return the process-wide tracer, or None if tracing is off."""
+    return _tracer
+
+
+def span(name: str, **attrs):
+    """
+    Context manager timing one operation: `with span("scrape", url=url) as s: ...; s.set(bytes=n)`.
+    Exceptions are recorded as the span's "error" attribute and re-raised.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NOOP
+    return tracer.span(name, **attrs)
@@ -0,0 +1,119 @@
+import csv
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from urls import normalize_url
+
+_PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+VISITED_URLS_DB = os.path.join(_PROJECT_ROOT, "visited_urls.sqlite")
+# Legacy flat file; imported once into the SQLite store and then left alone
+VISITED_URLS_CSV = os.path.join(_PROJECT_ROOT, "visited_urls.csv")
+
+
+class VisitedURLStore:
+    """
+    Indexed store of every job URL the agent has already seen, keyed by normalized URL.
+    SQLite in WAL mode so several processes/threads can record URLs at once.
+    """
+
+    def __init__(self, path: str = VISITED_URLS_DB, legacy_csv: str | None = VISITED_URLS_CSV):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS visited ("
+            " url TEXT PRIMARY KEY, raw_url TEXT NOT NULL, first_seen TEXT NOT NULL, last_seen TEXT NOT NULL)"
+            " WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+        if legacy_csv:
+            self._import_legacy_csv(legacy_csv)
+
+    def _import_legacy_csv(self, csv_path: str):
+        with self._lock:
+            done = self._conn.execute("SELECT value FROM meta WHERE key = 'csv_imported'").fetchone()
+        if done or not os.path.exists(csv_path):
+            return
+        rows = []
+        try:
+            with open(csv_path, newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                header = next(reader, None) or []
+                has_header = bool(header) and header[0].strip().lower() == "url"
+                if header and not has_header:
+                    rows.append(header)
+                rows.extend(reader)
+        except Exception as e:
+            print(f"--- URL STORE: Could not import {csv_path}: {e} ---")
+            return
+        today = datetime.now().strftime("%Y-%m-%d")
+        entries = [(r[0], r[1] if len(r) > 1 and r[1] else today) for r in rows if r and r[0].strip()]
+        self._record(entries)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('csv_imported', ?)", (today,))
+            self._conn.commit()
+        print(f"--- URL STORE: Imported {len(entries)} URLs from {os.path.basename(csv_path)} ---")
+
+    def __contains__(self, url: str) -> bool:
+        key = normalize_url(url)
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM visited WHERE url = ?", (key,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM visited").fetchone()[0]
+
+    def filter_new(self, urls: list[str]) -> list[str]:
+        """Return the urls (in order) that are not in the store, looked up in batches rather than one query per URL."""
+        keys = [normalize_url(u) for u in urls]
+        unique = list(dict.fromkeys(keys))
+        known = set()
+        with self._lock:
+            for i in range(0, len(unique), 500):
+                chunk = unique[i:i + 500]
+                known.update(r[0] for r in self._conn.execute(
+                    f"SELECT url FROM visited WHERE url IN ({', '.join('?' * len(chunk))})", chunk))
+        return [u for u, key in zip(urls, keys) if key not in known]
+
+    def add_many(self, urls: list[str], date: str | None = None):
+        """Record urls as seen in one transaction: new ones get first_seen, known ones get last_seen bumped."""
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        self._record([(u, date) for u in urls])
+
+    def _record(self, entries: list[tuple[str, str]]):
+        rows = [(normalize_url(u), u.strip(), d, d) for u, d in entries if u and u.strip()]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO visited (url, raw_url, first_seen, last_seen) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(url) DO UPDATE SET"
+                " first_seen = MIN(first_seen, excluded.first_seen),"
+                " last_seen = MAX(last_seen, excluded.last_seen)",
+                rows,
+            )
+            self._conn.commit()
+
+    def seen_dates(self, url: str) -> tuple[str, str] | None:
+        """(first_seen, last_seen) for url, or None if never seen."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT first_seen, last_seen FROM visited WHERE url = ?", (normalize_url(url),)
+            ).fetchone()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_visited_store() -> VisitedURLStore:
+    """Return the process-wide visited URL store, importing visited_urls.csv on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = VisitedURLStore()
+        return _store
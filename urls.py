@@ -0,0 +1,38 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only identify the click, not the page. Anything else may be what tells
+# one posting from another (LinkedIn's currentJobId, an ATS's src/source), so it is kept.
+TRACKING_PARAMS = {"fbclid", "gclid", "trk", "refid"}
+TRACKING_PREFIXES = ("utm_",)
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for caching and dedup: lowercase scheme/host, no default
+    port, no fragment, no tracking params, sorted query, no trailing slash. A malformed URL
+    (bad port, unbalanced brackets) is returned stripped but otherwise as given.
+    """
+    url = (url or "").strip()
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = (parts.scheme or "http").lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    netloc = host
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        netloc = f"{host}:{port}"
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/")
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query.sort()
+    return urlunsplit((scheme, netloc, path, urlencode(query), ""))
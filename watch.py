@@ -0,0 +1,270 @@
+"""
+Watch mode: keep the results file current while postings come, change and go.
+
+Every cycle re-runs the searches from conditions.txt and re-checks known postings whose last
+check is older than WATCH_RECHECK_HOURS. A re-check is a conditional request (If-None-Match /
+If-Modified-Since) when the site sent an ETag or Last-Modified, and a comparison of the extracted
+text's hash otherwise. Only new postings and postings whose text changed go through prefilter,
+analysis and cover letters; their rows replace the old ones in the watch state and the Excel file
+is rewritten from it. LLM cost per cycle follows churn, not the number of postings watched.
+Postings whose fetch, scrape or analysis failed (or hit a block page) are retried every cycle.
+
+    python main.py --watch              # a cycle every WATCH_INTERVAL_MINUTES
+    python cli.py watch --once          # a single cycle, e.g. from cron
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from corpus import get_corpus
+from politeness import interleave_by_site
+from scrape_cache import content_hash, get_scrape_cache
+from tracing import get_tracer, span
+from urls import normalize_url
+
+_PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+WATCH_STATE_FILE = os.path.join(_PROJECT_ROOT, ".cache", "watch.sqlite")
+
+WATCH_INTERVAL_MINUTES = float(os.getenv("WATCH_INTERVAL_MINUTES", "60"))
+# Known postings are fetched again at most this often; postings that failed to fetch are retried every cycle
+WATCH_RECHECK_HOURS = float(os.getenv("WATCH_RECHECK_HOURS", "24"))
+
+
+class WatchState:
+    """
+    SQLite table of every posting watch mode has seen, keyed by normalized URL: the HTTP validators
+    and text hash of its last fetch, its status ('active', 'error' or 'closed') and its Excel row.
+    """
+
+    def __init__(self, path: str = WATCH_STATE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " url TEXT PRIMARY KEY, raw_url TEXT NOT NULL, title TEXT, company TEXT,"
+            " etag TEXT, last_modified TEXT, content_hash TEXT, status TEXT NOT NULL,"
+            " first_seen REAL NOT NULL, checked_at REAL NOT NULL, changed_at REAL, row TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS postings_checked ON postings(checked_at)")
+        self._conn.commit()
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM postings WHERE url = ?", (normalize_url(url),)).fetchone() is not None
+
+    def due(self, max_age_seconds: float) -> list[dict]:
+        """Open postings not checked within max_age_seconds, plus every posting whose last fetch failed."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT raw_url, title, company, etag, last_modified, content_hash FROM postings"
+                " WHERE status = 'error' OR (status = 'active' AND checked_at < ?) ORDER BY checked_at",
+                (time.time() - max_age_seconds,),
+            ).fetchall()
+        return [{"url": r[0], "title": r[1], "company": r[2], "etag": r[3], "last_modified": r[4], "content_hash": r[5]}
+                for r in rows]
+
+    def save(self, posting: dict, status: str, row: dict | None = None):
+        """
+        Record a fetch of posting. A row replaces the stored one and marks the posting changed;
+        without one the previous row is kept. With status 'error' the validators and text hash of the
+        last good fetch are kept, so the next cycle fetches the page in full and processes it again.
+        """
+        now = time.time()
+        row_json = json.dumps(row, ensure_ascii=False) if row is not None else None
+        if status == "error":
+            validators = (None, None, None)
+        else:
+            validators = (posting.get("etag"), posting.get("last_modified"), posting.get("content_hash"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO postings (url, raw_url, title, company, etag, last_modified, content_hash, status,"
+                " first_seen, checked_at, changed_at, row) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(url) DO UPDATE SET"
+                " etag = CASE WHEN excluded.status = 'error' THEN postings.etag ELSE excluded.etag END,"
+                " last_modified = CASE WHEN excluded.status = 'error' THEN postings.last_modified ELSE excluded.last_modified END,"
+                " content_hash = COALESCE(excluded.content_hash, postings.content_hash), status = excluded.status,"
+                " checked_at = excluded.checked_at, changed_at = COALESCE(excluded.changed_at, postings.changed_at),"
+                " row = COALESCE(excluded.row, postings.row)",
+                (normalize_url(posting["url"]), posting["url"], posting.get("title"), posting.get("company"),
+                 *validators, status, now, now, now if row is not None else None, row_json),
+            )
+            self._conn.commit()
+
+    def rows(self):
+        """Rows of every posting that is not closed, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT row FROM postings WHERE status != 'closed' AND row IS NOT NULL ORDER BY first_seen, url"
+            ).fetchall()
+        for (row,) in rows:
+            yield json.loads(row)
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM postings GROUP BY status").fetchall())
+
+
+class _Results:
+    """Takes a Checkpoint's place in _process_jobs: keeps each job's (status, row) by index."""
+
+    def __init__(self):
+        self.by_index: dict[int, tuple[str, dict | None]] = {}
+
+    def record(self, index: int, url: str, status: str, row: dict | None):
+        self.by_index[index] = (status, row)
+
+
+def check_posting(posting: dict) -> dict:
+    """
+    Fetch a posting (conditionally when it has validators) and set its 'outcome': 'new' or 'changed'
+    with its 'text', 'unchanged', 'closed' (404/410) or 'error' (including captcha / rate-limit pages,
+    which are retried next cycle).
+    """
+    from fetcher import BlockedError, detect_block, get_fetcher
+    from politeness import get_scheduler
+    from tools import _html_to_text
+
+    url = posting["url"]
+    with span("watch.check", url=url) as s:
+        try:
+            with get_scheduler().slot(url):
+                html, tier, validators = get_fetcher().fetch_conditional(url, posting.get("etag"), posting.get("last_modified"))
+                reason = detect_block(html) if html is not None else None
+                if reason:
+                    raise BlockedError(url, reason)
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code in (404, 410):
+                posting["outcome"] = "closed"
+            else:
+                posting["outcome"], posting["error"] = "error", str(e)
+            s.set(outcome=posting["outcome"])
+            return posting
+        except Exception as e:
+            posting["outcome"], posting["error"] = "error", f"{type(e).__name__}: {e}"
+            s.set(outcome="error")
+            return posting
+        posting.update(etag=validators.get("etag"), last_modified=validators.get("last_modified"))
+        if html is None:
+            posting["outcome"] = "unchanged"
+        else:
+            text = _html_to_text(html)
+            digest = content_hash(text)
+            if digest == posting.get("content_hash"):
+                posting["outcome"] = "unchanged"
+            else:
+                posting["outcome"] = "changed" if posting.get("content_hash") else "new"
+                posting["text"], posting["content_hash"] = text, digest
+                cache = get_scrape_cache()
+                if cache is not None and text:
+                    cache.put(url, text)
+        s.set(outcome=posting["outcome"], tier=tier, not_modified=html is None)
+    return posting
+
+
+def watch_cycle(state: WatchState, cv: dict, conditions: dict, output_file: str, max_per_query: int = 15,
+                recheck_hours: float = WATCH_RECHECK_HOURS) -> dict[str, int]:
+    """
+    One search + re-check pass. New and changed postings are analyzed and their rows stored;
+    output_file is rewritten when any row changed. Returns counts per outcome.
+    """
+    from main import SCRAPE_WORKERS, _process_jobs
+    from tools import build_search_queries, search_queries
+
+    with span("watch.search") as s:
+        found = search_queries(build_search_queries(conditions), max_per_query=max_per_query, is_known=state.__contains__)
+        new, seen = [], set()
+        for jobs in found.values():
+            for job in jobs:
+                key = normalize_url(job["url"])
+                if key not in seen:
+                    seen.add(key)
+                    new.append(dict(job))
+        s.set(new=len(new))
+    due = state.due(recheck_hours * 3600)
+    print(f"--- WATCH: {len(new)} new postings, {len(due)} known postings to re-check ---")
+
+    with span("watch.fetch", postings=len(new) + len(due)):
+        with ThreadPoolExecutor(max_workers=max(1, SCRAPE_WORKERS), thread_name_prefix="watch") as pool:
+            checked = list(pool.map(check_posting, interleave_by_site(new + due)))
+
+    counts = {"new": 0, "changed": 0, "unchanged": 0, "closed": 0, "error": 0}
+    fresh = []
+    for posting in checked:
+        counts[posting["outcome"]] += 1
+        if posting["outcome"] in ("new", "changed"):
+            fresh.append(posting)
+        elif posting["outcome"] == "unchanged":
+            state.save(posting, "active")
+        elif posting["outcome"] == "closed":
+            state.save(posting, "closed")
+        else:
+            print(f"  Re-check failed for {posting['url']}: {posting.get('error', '')[:80]}")
+            state.save(posting, "error")
+
+    corpus = get_corpus()
+    if corpus is not None:
+        corpus.touch([p["url"] for p in checked if p["outcome"] == "unchanged"])
+    if fresh:
+        results = _Results()
+        with span("watch.process", jobs=len(fresh)):
+            _process_jobs(fresh, cv, conditions, checkpoint=results, pages={p["url"]: p["text"] for p in fresh})
+        for i, posting in enumerate(fresh):
+            status, row = results.by_index.get(i, ("failed", None))
+            if status in ("failed", "blocked"):
+                # Retried next cycle; a changed posting keeps its previous row until then
+                print(f"  Processing {status} for {posting['url']}, retrying next cycle")
+                counts[posting["outcome"]] -= 1
+                counts["error"] += 1
+                state.save(posting, "error", row if posting["outcome"] == "new" else None)
+            else:
+                state.save(posting, "active", row)
+    if fresh or counts["closed"]:
+        from checkpoint import export_xlsx
+
+        with span("export", path=output_file) as s:
+            rows = export_xlsx(state.rows(), output_file)
+            s.set(rows=rows, bytes=os.path.getsize(output_file))
+        print(f"--- WATCH: results saved to {output_file} ({rows} rows) ---")
+    return counts
+
+
+def run_watch(output_file: str | None = None, interval_minutes: float = WATCH_INTERVAL_MINUTES, once: bool = False,
+              max_per_query: int = 15, state: WatchState | None = None):
+    """Run watch cycles every interval_minutes until interrupted (or just one with once=True)."""
+    from main import OUTPUT_FILE, load_conditions, load_cv
+
+    output_file = output_file or OUTPUT_FILE
+    state = state or WatchState()
+    cycle = 0
+    while True:
+        cycle += 1
+        started = time.time()
+        # Re-read both files every cycle so edits take effect without a restart
+        cv = load_cv()
+        if "error" in cv:
+            print(cv["error"])
+            return
+        conditions = load_conditions()
+        with span("watch.cycle", cycle=cycle) as s:
+            counts = watch_cycle(state, cv, conditions, output_file, max_per_query=max_per_query)
+            s.set(**counts)
+        summary = ", ".join(f"{n} {k}" for k, n in counts.items())
+        print(f"--- WATCH: cycle {cycle} done in {time.time() - started:.1f}s: {summary} | state: {state.counts()} ---")
+        tracer = get_tracer()
+        if tracer is not None:
+            tracer.flush()
+        if once:
+            return
+        wait = max(0.0, interval_minutes * 60 - (time.time() - started))
+        print(f"--- WATCH: next cycle in {wait / 60:.1f} min (Ctrl+C to stop) ---")
+        try:
+            time.sleep(wait)
+        except KeyboardInterrupt:
+            print("--- WATCH: stopped ---")
+            return